@@ -8,6 +8,7 @@ from app.db.session import get_db
 from app.core.security import verify_token
 from app.models.user import User
 from app.models.admin import AdminUser
+from app.services.principal_cache import principal_cache
 
 security = HTTPBearer(auto_error=False)
 
@@ -48,9 +49,16 @@ async def get_current_user(
             detail="Invalid token payload",
         )
 
-    # Get user from database
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+    # Get user from cache, falling back to the database
+    cached = principal_cache.get("user", email)
+    if cached is not None:
+        user = principal_cache.attach(db, User, cached)
+    else:
+        generation = principal_cache.generation
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalar_one_or_none()
+        if user:
+            principal_cache.put("user", email, user, generation)
 
     if not user:
         raise HTTPException(
@@ -103,9 +111,16 @@ async def get_current_admin(
             detail="Invalid token payload",
         )
 
-    # Get admin from database
-    result = await db.execute(select(AdminUser).where(AdminUser.email == email))
-    admin = result.scalar_one_or_none()
+    # Get admin from cache, falling back to the database
+    cached = principal_cache.get("admin", email)
+    if cached is not None:
+        admin = principal_cache.attach(db, AdminUser, cached)
+    else:
+        generation = principal_cache.generation
+        result = await db.execute(select(AdminUser).where(AdminUser.email == email))
+        admin = result.scalar_one_or_none()
+        if admin:
+            principal_cache.put("admin", email, admin, generation)
 
     if not admin:
         raise HTTPException(
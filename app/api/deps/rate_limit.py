@@ -0,0 +1,74 @@
+from fastapi import HTTPException, Request, status
+from typing import Callable, List, Tuple
+
+from app.core.config import settings
+from app.services.rate_limit import RateLimitRule, rate_limiter
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+
+def get_client_ip(request: Request) -> str:
+    """Get client IP address from request."""
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _rules(*rules: Tuple[int, int, str]) -> List[RateLimitRule]:
+    """Build rules from (limit, window, message); limits of 0 are disabled."""
+    return [RateLimitRule(limit, window, message) for limit, window, message in rules if limit > 0]
+
+
+# Rule sets are read from settings per request
+
+def signup_rules() -> List[RateLimitRule]:
+    return _rules(
+        (settings.RATE_LIMIT_SIGNUPS_PER_HOUR, HOUR, "Too many signup attempts. Please try again later."),
+        (settings.RATE_LIMIT_SIGNUPS_PER_DAY, DAY, "Daily signup limit reached. Please try again tomorrow."),
+    )
+
+
+def login_rules() -> List[RateLimitRule]:
+    return _rules(
+        (settings.RATE_LIMIT_LOGINS_PER_MINUTE, MINUTE, "Too many login attempts. Please try again later."),
+        (settings.RATE_LIMIT_LOGINS_PER_HOUR, HOUR, "Too many login attempts. Please try again later."),
+    )
+
+
+def password_reset_rules() -> List[RateLimitRule]:
+    return _rules(
+        (settings.RATE_LIMIT_PASSWORD_RESETS_PER_HOUR, HOUR, "Too many reset requests. Please try again later."),
+    )
+
+
+def otp_rules() -> List[RateLimitRule]:
+    return _rules(
+        (settings.RATE_LIMIT_OTP_ATTEMPTS_PER_HOUR, HOUR, "Too many attempts. Please try again later."),
+    )
+
+
+def otp_email_rules() -> List[RateLimitRule]:
+    return _rules(
+        (settings.RATE_LIMIT_OTP_ATTEMPTS_PER_EMAIL, 15 * MINUTE, "Too many attempts. Please request a new code later."),
+    )
+
+
+async def enforce_rate_limit(scope: str, identifier: str, rules: List[RateLimitRule]):
+    """Count a hit, raising 429 with Retry-After when a rule is exhausted."""
+    result = await rate_limiter.hit(scope, identifier, rules)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=result.rule.message if result.rule else "Too many requests. Please try again later.",
+            headers={"Retry-After": str(result.retry_after)},
+        )
+
+
+def rate_limit(scope: str, rules: Callable[[], List[RateLimitRule]]):
+    """Dependency limiting requests per client IP under `scope`."""
+    async def dependency(request: Request):
+        await enforce_rate_limit(scope, get_client_ip(request), rules())
+    return dependency
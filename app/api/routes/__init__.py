@@ -2,7 +2,8 @@ from fastapi import APIRouter
 from app.api.routes import auth, users, admin, admin_users, admin_groups, admin_aliases
 from app.api.routes import admin_announcements, admin_support, admin_domains
 from app.api.routes import admin_templates, admin_scheduled, admin_sending, admin_storage
-from app.api.routes import admin_activity, admin_audit, admin_mailcow
+from app.api.routes import admin_activity, admin_audit, admin_mailcow, admin_mail_queue
+from app.api.routes import admin_jobs, admin_diagnostics
 
 # Public API router (matches /api endpoint from frontend)
 api_router = APIRouter()
@@ -45,3 +46,12 @@ admin_router.include_router(admin.stats_router, tags=["Admin - Stats"])
 
 # Mailcow management routes
 admin_router.include_router(admin_mailcow.router, prefix="/mailcow", tags=["Admin - Mailcow"])
+
+# Outbound mail queue
+admin_router.include_router(admin_mail_queue.router, prefix="/mail-queue", tags=["Admin - Mail Queue"])
+
+# Background bulk jobs
+admin_router.include_router(admin_jobs.router, prefix="/jobs", tags=["Admin - Jobs"])
+
+# Per-worker diagnostics
+admin_router.include_router(admin_diagnostics.router, prefix="/diagnostics", tags=["Admin - Diagnostics"])
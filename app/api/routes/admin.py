@@ -1,21 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from datetime import datetime, timedelta
+from sqlalchemy import select
+from datetime import datetime
 
 from app.db.session import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import averify_password, ahash_password, create_access_token
 from app.models.admin import AdminUser, AdminRole
-from app.models.user import User
-from app.models.mailbox import MailboxMetadata
-from app.models.support import SupportTicket
-from app.models.audit import AuditLog
 from app.schemas.auth import AdminLoginRequest, TokenResponse
 from app.schemas.admin import (
     AdminUserCreate, AdminUserUpdate, AdminUserResponse,
     AdminRoleCreate, AdminRoleResponse, AdminStatsResponse
 )
 from app.api.deps.auth import get_current_admin
+from app.services import stats as stats_service
+from app.services.log_sink import log_sink
 
 router = APIRouter()
 admins_router = APIRouter()
@@ -68,7 +66,7 @@ async def admin_login(
         )
 
     # Verify password
-    if not verify_password(data.password, admin.password_hash):
+    if not await averify_password(data.password, admin.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -95,66 +93,11 @@ async def admin_login(
 
 @stats_router.get("/stats", response_model=AdminStatsResponse)
 async def get_admin_stats(
-    current_admin: AdminUser = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db)
+    current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Get admin dashboard statistics."""
-    # Total users
-    total_result = await db.execute(select(func.count(User.id)))
-    total_users = total_result.scalar() or 0
-
-    # Active users (not suspended)
-    active_result = await db.execute(
-        select(func.count(User.id)).where(User.is_suspended == False)
-    )
-    active_users = active_result.scalar() or 0
-
-    # Suspended users
-    suspended_users = total_users - active_users
-
-    # New users today
-    today = datetime.utcnow().date()
-    today_start = datetime.combine(today, datetime.min.time())
-    new_today_result = await db.execute(
-        select(func.count(User.id)).where(User.created_at >= today_start)
-    )
-    new_users_today = new_today_result.scalar() or 0
-
-    # New users this week
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    new_week_result = await db.execute(
-        select(func.count(User.id)).where(User.created_at >= week_ago)
-    )
-    new_users_this_week = new_week_result.scalar() or 0
-
-    # Storage stats
-    storage_result = await db.execute(
-        select(
-            func.coalesce(func.sum(MailboxMetadata.usage_bytes), 0),
-            func.coalesce(func.sum(MailboxMetadata.quota_bytes), 0)
-        )
-    )
-    storage_row = storage_result.first()
-    total_storage_used = storage_row[0] if storage_row else 0
-    total_storage_allocated = storage_row[1] if storage_row else 0
-
-    # Pending support tickets
-    pending_result = await db.execute(
-        select(func.count(SupportTicket.id))
-        .where(SupportTicket.status == "pending")
-    )
-    pending_tickets = pending_result.scalar() or 0
-
-    return AdminStatsResponse(
-        total_users=total_users,
-        active_users=active_users,
-        suspended_users=suspended_users,
-        new_users_today=new_users_today,
-        new_users_this_week=new_users_this_week,
-        total_storage_used=total_storage_used,
-        total_storage_allocated=total_storage_allocated,
-        pending_tickets=pending_tickets
-    )
+    stats = await stats_service.get_admin_stats()
+    return AdminStatsResponse(**stats)
 
 
 # Admin Users Management
@@ -203,7 +146,7 @@ async def create_admin(
     admin = AdminUser(
         email=data.email.lower(),
         name=data.name,
-        password_hash=get_password_hash(data.password),
+        password_hash=await ahash_password(data.password),
         role_id=data.role_id,
         is_active=data.is_active,
         created_by=current_admin.id
@@ -211,13 +154,13 @@ async def create_admin(
     db.add(admin)
 
     # Log action
-    log = AuditLog(
+    log_sink.audit(
+        db,
         action_type="admin_created",
         admin_email=current_admin.email,
         target_user_email=data.email,
         details={"name": data.name}
     )
-    db.add(log)
 
     await db.commit()
     await db.refresh(admin)
@@ -255,7 +198,7 @@ async def update_admin(
     if data.name is not None:
         admin.name = data.name
     if data.password is not None:
-        admin.password_hash = get_password_hash(data.password)
+        admin.password_hash = await ahash_password(data.password)
     if data.role_id is not None:
         admin.role_id = data.role_id
     if data.is_active is not None:
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from datetime import datetime, timedelta
+from sqlalchemy import select
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from app.db.session import get_db
@@ -9,6 +9,7 @@ from app.models.admin import AdminUser
 from app.models.user import User
 from app.models.audit import LoginActivity
 from app.api.deps.auth import get_current_admin
+from app.services import stats as stats_service
 
 router = APIRouter()
 
@@ -16,12 +17,29 @@ router = APIRouter()
 @router.get("")
 async def get_login_activity(
     limit: int = Query(100, le=500),
+    days: int = Query(30, ge=1, le=366),
+    user_email: Optional[str] = None,
+    success: Optional[bool] = None,
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get recent login activity."""
-    result = await db.execute(
+    """
+    Get recent login activity.
+
+    Only the last `days` days are searched; the login_time bound lets
+    Postgres skip older monthly partitions.
+    """
+    query = (
         select(LoginActivity)
+        .where(LoginActivity.login_time >= datetime.now(timezone.utc) - timedelta(days=days))
+    )
+    if user_email:
+        query = query.where(LoginActivity.user_email == user_email.lower().strip())
+    if success is not None:
+        query = query.where(LoginActivity.success == success)
+
+    result = await db.execute(
+        query
         .order_by(LoginActivity.login_time.desc())
         .limit(limit)
     )
@@ -44,73 +62,10 @@ async def get_login_activity(
 
 @router.get("/stats")
 async def get_activity_stats(
-    current_admin: AdminUser = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db)
+    current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Get user activity statistics."""
-    now = datetime.utcnow()
-    seven_days_ago = now - timedelta(days=7)
-    thirty_days_ago = now - timedelta(days=30)
-    sixty_days_ago = now - timedelta(days=60)
-    ninety_days_ago = now - timedelta(days=90)
-
-    # Total users
-    total = await db.execute(select(func.count(User.id)))
-    total_users = total.scalar() or 0
-
-    # Active in last 7 days
-    active_7 = await db.execute(
-        select(func.count(User.id))
-        .where(User.last_login >= seven_days_ago)
-    )
-    active_last_7_days = active_7.scalar() or 0
-
-    # Active in last 30 days
-    active_30 = await db.execute(
-        select(func.count(User.id))
-        .where(User.last_login >= thirty_days_ago)
-    )
-    active_last_30_days = active_30.scalar() or 0
-
-    # Inactive 30+ days
-    inactive_30 = await db.execute(
-        select(func.count(User.id))
-        .where(User.last_login < thirty_days_ago)
-        .where(User.last_login >= sixty_days_ago)
-    )
-    inactive_30_days = inactive_30.scalar() or 0
-
-    # Inactive 60+ days
-    inactive_60 = await db.execute(
-        select(func.count(User.id))
-        .where(User.last_login < sixty_days_ago)
-        .where(User.last_login >= ninety_days_ago)
-    )
-    inactive_60_days = inactive_60.scalar() or 0
-
-    # Inactive 90+ days
-    inactive_90 = await db.execute(
-        select(func.count(User.id))
-        .where(User.last_login < ninety_days_ago)
-    )
-    inactive_90_days = inactive_90.scalar() or 0
-
-    # Never logged in
-    never = await db.execute(
-        select(func.count(User.id))
-        .where(User.last_login == None)
-    )
-    never_logged_in = never.scalar() or 0
-
-    return {
-        "total_users": total_users,
-        "active_last_7_days": active_last_7_days,
-        "active_last_30_days": active_last_30_days,
-        "inactive_30_days": inactive_30_days,
-        "inactive_60_days": inactive_60_days,
-        "inactive_90_days": inactive_90_days,
-        "never_logged_in": never_logged_in
-    }
+    return await stats_service.get_activity_stats()
 
 
 @router.get("/inactive")
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, Query
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, text, tuple_
+from datetime import datetime
 from typing import Optional
 
 from app.db.session import get_db
+from app.core.pagination import encode_cursor, decode_cursor
 from app.models.admin import AdminUser
-from app.models.audit import AuditLog
+from app.models.audit import AuditLog, AUDIT_LOG_SEARCH_VECTOR
 from app.api.deps.auth import get_current_admin
 
 router = APIRouter()
@@ -13,15 +17,36 @@ router = APIRouter()
 
 @router.get("")
 async def get_audit_logs(
+    response: Response,
     action_type: Optional[str] = None,
     admin_email: Optional[str] = None,
     target_email: Optional[str] = None,
-    limit: int = Query(100, le=500),
+    since: Optional[datetime] = Query(None, description="Only entries at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only entries before this time"),
+    details: Optional[str] = Query(
+        None, description='JSON object the details must contain, e.g. {"job_id": "..."}'
+    ),
+    q: Optional[str] = Query(
+        None, min_length=1, max_length=200,
+        description="Full-text search over action, target and details (web search syntax)"
+    ),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    limit: int = Query(100, ge=1, le=500),
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get audit logs with optional filtering."""
-    query = select(AuditLog).order_by(AuditLog.timestamp.desc())
+    """
+    Get audit logs with optional filtering, newest first.
+
+    Uses keyset pagination on (timestamp, id): the X-Next-Cursor response
+    header carries the cursor for the next page and is absent on the last one.
+    `details` containment and `q` search are served by GIN indexes.
+    """
+    query = (
+        select(AuditLog)
+        .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+        .limit(limit + 1)
+    )
 
     if action_type:
         query = query.where(AuditLog.action_type == action_type)
@@ -29,12 +54,41 @@ async def get_audit_logs(
         query = query.where(AuditLog.admin_email == admin_email)
     if target_email:
         query = query.where(AuditLog.target_user_email == target_email)
+    if since:
+        query = query.where(AuditLog.timestamp >= since)
+    if until:
+        query = query.where(AuditLog.timestamp < until)
+
+    if details:
+        try:
+            contained = json.loads(details)
+        except json.JSONDecodeError:
+            contained = None
+        if not isinstance(contained, dict):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="details must be a JSON object"
+            )
+        query = query.where(AuditLog.details.contains(contained))
 
-    query = query.limit(limit)
+    if q:
+        query = query.where(AUDIT_LOG_SEARCH_VECTOR.op("@@")(
+            func.websearch_to_tsquery(text("'simple'::regconfig"), q)
+        ))
+
+    if cursor:
+        cursor_timestamp, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(cursor_timestamp, cursor_id)
+        )
 
     result = await db.execute(query)
     logs = result.scalars().all()
 
+    if len(logs) > limit:
+        logs = logs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(logs[-1].timestamp, logs[-1].id)
+
     return [
         {
             "id": str(l.id),
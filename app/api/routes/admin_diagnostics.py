@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.models.admin import AdminUser
+from app.api.deps.auth import get_current_admin
+from app.db.query_monitor import query_monitor
+from app.services.partitions import partition_maintenance_worker
+from app.services.log_sink import log_sink
+
+router = APIRouter()
+
+
+@router.get("/queries")
+async def get_query_diagnostics(
+    limit: int = Query(50, ge=1, le=500),
+    current_admin: AdminUser = Depends(get_current_admin)
+):
+    """
+    Get slow statements, probable N+1 requests and per-route statement counts.
+
+    Collected per worker process when QUERY_MONITOR_ENABLED is set; each call
+    reports the worker that served it.
+    """
+    return query_monitor.report(limit)
+
+
+@router.post("/queries/reset")
+async def reset_query_diagnostics(
+    current_admin: AdminUser = Depends(get_current_admin)
+):
+    """Clear this worker's collected query diagnostics."""
+    query_monitor.reset()
+    return {"success": True, "message": "Query diagnostics cleared"}
+
+
+@router.get("/partitions")
+async def get_partition_diagnostics(
+    current_admin: AdminUser = Depends(get_current_admin)
+):
+    """Get login_activity partitions, retention settings and maintenance status."""
+    return await partition_maintenance_worker.report()
+
+
+@router.get("/log-sink")
+async def get_log_sink_diagnostics(
+    current_admin: AdminUser = Depends(get_current_admin)
+):
+    """Get this worker's buffered log writer counters."""
+    return log_sink.status()
@@ -10,6 +10,8 @@ from app.models.admin import AdminUser
 from app.models.user import User
 from app.models.group import UserGroup, UserGroupMember
 from app.api.deps.auth import get_current_admin
+from app.services.jobs import enqueue_job, job_worker
+from app.services.bulk_jobs import GROUPS_ADD_MEMBERS
 
 router = APIRouter()
 
@@ -293,45 +295,36 @@ async def add_group_members(
     return {"success": True, "message": f"{added} members added successfully"}
 
 
-@router.post("/{group_id}/bulk-add")
+@router.post("/{group_id}/bulk-add", status_code=status.HTTP_202_ACCEPTED)
 async def bulk_add_members(
     group_id: str,
     user_ids: List[str],
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Bulk add users to a group."""
+    """Bulk add users to a group (runs as a background job)."""
     # Verify group exists
     group_result = await db.execute(
         select(UserGroup).where(UserGroup.id == group_id)
     )
-    if not group_result.scalar_one_or_none():
+    group = group_result.scalar_one_or_none()
+    if not group:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Group not found"
         )
 
-    # Get existing members
-    existing_result = await db.execute(
-        select(UserGroupMember.user_id)
-        .where(UserGroupMember.group_id == group_id)
-    )
-    existing_user_ids = {str(r[0]) for r in existing_result.all()}
-
-    added = 0
-    for user_id in user_ids:
-        if user_id not in existing_user_ids:
-            member = UserGroupMember(
-                user_id=user_id,
-                group_id=group_id,
-                added_by=current_admin.id
-            )
-            db.add(member)
-            added += 1
-
+    job = enqueue_job(db, GROUPS_ADD_MEMBERS, user_ids, current_admin, params={"group_id": str(group.id)})
     await db.commit()
+    job_worker.wake()
 
-    return {"success": True, "message": f"{added} members added successfully"}
+    return {
+        "success": True,
+        "job_id": str(job.id),
+        "status": job.status,
+        "total": job.total,
+        "message": f"Queued {job.total} users for {group.name}"
+    }
 
 
 @router.delete("/{group_id}/members/{user_id}")
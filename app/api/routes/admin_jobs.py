@@ -0,0 +1,174 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import get_db, AsyncSessionLocal
+from app.models.admin import AdminUser
+from app.models.job import BulkJob
+from app.api.deps.auth import get_current_admin
+from app.services.jobs import JOB_HANDLERS, TERMINAL_STATUSES, job_progress
+from app.services.log_sink import log_sink
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_jobs(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    job_type: Optional[str] = None,
+    limit: int = Query(50, le=200),
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get recent bulk jobs, newest first."""
+    query = select(BulkJob).order_by(BulkJob.created_at.desc()).limit(limit)
+
+    if status_filter:
+        query = query.where(BulkJob.status == status_filter)
+    if job_type:
+        query = query.where(BulkJob.job_type == job_type)
+
+    result = await db.execute(query)
+    return [job_progress(job) for job in result.scalars().all()]
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: UUID,
+    errors_limit: int = Query(100, ge=0, le=1000),
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a bulk job's progress and its first failures."""
+    job = await db.get(BulkJob, job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    return {
+        **job_progress(job),
+        "errors": (job.errors or [])[:errors_limit]
+    }
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: UUID,
+    request: Request,
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream a bulk job's progress as server-sent events until it finishes."""
+    if not await db.get(BulkJob, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    # Don't hold the request's connection for the life of the stream
+    await db.close()
+
+    async def events():
+        last = None
+        idle = 0.0
+        while not await request.is_disconnected():
+            async with AsyncSessionLocal() as session:
+                job = await session.get(BulkJob, job_id)
+            if job is None:
+                yield "event: gone\ndata: {}\n\n"
+                return
+
+            payload = job_progress(job)
+            # Throughput/ETA change every tick; only report real progress
+            marker = (payload["status"], payload["processed"], payload["failed"])
+            if marker != last:
+                last = marker
+                idle = 0.0
+                yield f"event: progress\ndata: {json.dumps(payload)}\n\n"
+            elif idle >= 15:
+                idle = 0.0
+                yield ": keepalive\n\n"
+
+            if job.status in TERMINAL_STATUSES:
+                yield f"event: done\ndata: {json.dumps(payload)}\n\n"
+                return
+
+            await asyncio.sleep(settings.JOBS_SSE_INTERVAL)
+            idle += settings.JOBS_SSE_INTERVAL
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(
+    job_id: UUID,
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cancel a queued or running job.
+
+    A queued job is cancelled straight away. A running job is only flagged:
+    its worker commits the chunk in flight, stops at the next chunk boundary
+    and finishes the job as cancelled. Chunks already committed stay applied.
+    """
+    job = await db.get(BulkJob, job_id, with_for_update=True)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    if job.status not in ("pending", "running"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only queued or running jobs can be cancelled (status: {job.status})"
+        )
+
+    if job.status == "running":
+        if job.cancel_requested:
+            return {"success": True, "message": "Cancellation already requested"}
+        # The worker owns the job (and its Mailcow calls) until it finishes it
+        job.cancel_requested = True
+        job.updated_at = func.now()
+        message = "Cancellation requested; the job stops after its current chunk"
+    else:
+        job.status = "cancelled"
+        job.cancel_requested = True
+        job.finished_at = func.now()
+        job.updated_at = func.now()
+        # No worker will finish it; drop sensitive items (e.g. import passwords) here
+        handler = JOB_HANDLERS.get(job.job_type)
+        if handler and handler.sensitive:
+            job.params = {k: v for k, v in (job.params or {}).items() if k != "items"}
+        message = "Job cancelled"
+
+    log_sink.audit(
+        db,
+        action_type="bulk_job_cancelled",
+        admin_email=current_admin.email,
+        details={
+            "job_id": str(job.id),
+            "job_type": job.job_type,
+            "processed": job.processed,
+            "was_running": job.status == "running",
+        }
+    )
+
+    await db.commit()
+
+    return {"success": True, "message": message}
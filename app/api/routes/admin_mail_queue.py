@@ -0,0 +1,95 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from uuid import UUID
+
+from app.db.session import get_db
+from app.models.admin import AdminUser
+from app.models.mail_queue import OutboundEmail
+from app.api.deps.auth import get_current_admin
+from app.services.mail_queue import mail_queue_worker, queue_depth
+from app.services.log_sink import log_sink
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_mail_queue_status(
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get outbound queue depth and this worker's delivery metrics."""
+    return {
+        "queue": await queue_depth(db),
+        "worker": mail_queue_worker.metrics()
+    }
+
+
+@router.get("/dead")
+async def get_dead_letters(
+    limit: int = Query(100, le=500),
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get dead-lettered emails, most recent first."""
+    result = await db.execute(
+        select(OutboundEmail)
+        .where(OutboundEmail.status == "dead")
+        .order_by(OutboundEmail.created_at.desc())
+        .limit(limit)
+    )
+    jobs = result.scalars().all()
+
+    return [
+        {
+            "id": str(j.id),
+            "kind": j.kind,
+            "to_email": j.to_email,
+            "subject": j.subject,
+            "attempts": j.attempts,
+            "max_attempts": j.max_attempts,
+            "last_error": j.last_error,
+            "created_at": j.created_at.isoformat() if j.created_at else None
+        }
+        for j in jobs
+    ]
+
+
+@router.post("/{job_id}/retry")
+async def retry_dead_letter(
+    job_id: UUID,
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Put a dead-lettered email back on the queue with a fresh attempt budget."""
+    result = await db.execute(select(OutboundEmail).where(OutboundEmail.id == job_id))
+    job = result.scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Queued email not found"
+        )
+
+    if job.status != "dead":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only dead-lettered emails can be retried (status: {job.status})"
+        )
+
+    job.status = "pending"
+    job.attempts = 0
+    job.next_attempt_at = func.now()
+
+    log_sink.audit(
+        db,
+        action_type="mail_queue_retry",
+        admin_email=current_admin.email,
+        target_user_email=job.to_email,
+        details={"job_id": str(job.id), "kind": job.kind}
+    )
+
+    await db.commit()
+    mail_queue_worker.wake()
+
+    return {"success": True, "message": "Email requeued"}
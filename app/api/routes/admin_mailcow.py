@@ -22,6 +22,10 @@ from app.models.user import User
 from app.models.mailbox import MailboxMetadata
 from app.api.deps.auth import get_current_admin
 from app.services.mailcow import mailcow_service, MailcowError
+from app.services.mailbox_sync import sync_mailboxes_from_mailcow
+from app.services.quota_sync import quota_sync_worker
+from app.services.jobs import enqueue_job, job_worker
+from app.services.bulk_jobs import MAILBOXES_ACTIVATE, MAILBOXES_DEACTIVATE, MAILBOXES_DELETE
 
 router = APIRouter()
 
@@ -71,13 +75,17 @@ async def mailcow_health_check(
         return {
             "status": "healthy" if is_healthy else "unhealthy",
             "api_url": mailcow_service.api_url,
-            "connected": is_healthy
+            "connected": is_healthy,
+            "circuit_breaker": mailcow_service.breaker.snapshot(),
+            "cache": mailcow_service.cache.stats(),
+            "quota_sync": quota_sync_worker.status()
         }
     except Exception as e:
         return {
             "status": "error",
             "message": str(e),
-            "connected": False
+            "connected": False,
+            "circuit_breaker": mailcow_service.breaker.snapshot()
         }
 
 
@@ -412,50 +420,40 @@ async def update_mailbox_quota(
         )
 
 
-@router.post("/mailboxes/bulk")
+@router.post("/mailboxes/bulk", status_code=status.HTTP_202_ACCEPTED)
 async def bulk_mailbox_action(
     data: BulkMailboxAction,
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Perform bulk actions on mailboxes."""
+    """Perform bulk actions on mailboxes (runs as a background job)."""
     if not mailcow_service.is_configured:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Mailcow API is not configured"
         )
 
-    results = {"success": [], "failed": []}
-
-    for email in data.emails:
-        try:
-            if data.action == "activate":
-                await mailcow_service.activate_mailbox(email)
-            elif data.action == "deactivate":
-                await mailcow_service.deactivate_mailbox(email)
-            elif data.action == "delete":
-                await mailcow_service.delete_mailbox(email)
-                # Delete local metadata
-                result = await db.execute(
-                    select(MailboxMetadata).where(MailboxMetadata.email == email)
-                )
-                mailbox_meta = result.scalar_one_or_none()
-                if mailbox_meta:
-                    await db.delete(mailbox_meta)
-            else:
-                results["failed"].append({"email": email, "error": "Unknown action"})
-                continue
-
-            results["success"].append(email)
-        except MailcowError as e:
-            results["failed"].append({"email": email, "error": e.message})
+    job_types = {
+        "activate": MAILBOXES_ACTIVATE,
+        "deactivate": MAILBOXES_DEACTIVATE,
+        "delete": MAILBOXES_DELETE,
+    }
+    if data.action not in job_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown action: {data.action}"
+        )
 
+    job = enqueue_job(db, job_types[data.action], data.emails, current_admin)
     await db.commit()
+    job_worker.wake()
 
     return {
         "success": True,
         "action": data.action,
-        "results": results
+        "job_id": str(job.id),
+        "status": job.status,
+        "total": job.total
     }
 
 
@@ -463,6 +461,8 @@ async def bulk_mailbox_action(
 
 @router.post("/sync/mailboxes")
 async def sync_all_mailboxes(
+    batch_size: Optional[int] = Query(None, ge=1, le=10000),
+    domain: Optional[str] = None,
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
@@ -474,37 +474,18 @@ async def sync_all_mailboxes(
         )
 
     try:
-        mailboxes = await mailcow_service.get_mailboxes()
-        synced = 0
-        created = 0
-
-        for mb in mailboxes:
-            result = await db.execute(
-                select(MailboxMetadata).where(MailboxMetadata.email == mb.email)
-            )
-            metadata = result.scalar_one_or_none()
-
-            if metadata:
-                metadata.quota_bytes = mb.quota
-                metadata.usage_bytes = mb.quota_used
-                synced += 1
-            else:
-                metadata = MailboxMetadata(
-                    email=mb.email,
-                    quota_bytes=mb.quota,
-                    usage_bytes=mb.quota_used
-                )
-                db.add(metadata)
-                created += 1
-
-        await db.commit()
+        result = await sync_mailboxes_from_mailcow(db, batch_size=batch_size, domain=domain)
 
         return {
             "success": True,
-            "message": f"Synced {synced} mailboxes, created {created} new records",
-            "total_mailboxes": len(mailboxes),
-            "synced": synced,
-            "created": created
+            "message": (
+                f"Synced {result.total} mailboxes: {result.inserted} created, "
+                f"{result.updated} updated, {result.unchanged} unchanged"
+            ),
+            "total_mailboxes": result.total,
+            "synced": result.updated + result.unchanged,
+            "created": result.inserted,
+            **result.to_dict()
         }
     except MailcowError as e:
         raise HTTPException(
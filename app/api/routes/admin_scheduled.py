@@ -9,6 +9,7 @@ from app.db.session import get_db
 from app.models.admin import AdminUser
 from app.models.scheduled import ScheduledAction
 from app.api.deps.auth import get_current_admin
+from app.services.scheduler import normalize_action_type, validate_action_data
 
 router = APIRouter()
 
@@ -46,12 +47,61 @@ async def get_scheduled_actions(
             "status": a.status,
             "action_data": a.action_data,
             "executed_at": a.executed_at.isoformat() if a.executed_at else None,
-            "created_at": a.created_at.isoformat() if a.created_at else None
+            "created_at": a.created_at.isoformat() if a.created_at else None,
+            "started_at": a.started_at.isoformat() if a.started_at else None,
+            "processed": len(a.results or {}),
+            "error": a.error
         }
         for a in actions
     ]
 
 
+@router.get("/{action_id}")
+async def get_scheduled_action(
+    action_id: str,
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a scheduled action with its per-target results."""
+    result = await db.execute(
+        select(ScheduledAction).where(ScheduledAction.id == action_id)
+    )
+    action = result.scalar_one_or_none()
+
+    if not action:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scheduled action not found"
+        )
+
+    results = action.results or {}
+    succeeded = sum(1 for r in results.values() if r.get("status") == "succeeded")
+
+    return {
+        "id": str(action.id),
+        "action_type": action.action_type,
+        "target_type": action.target_type,
+        "target_ids": action.target_ids,
+        "scheduled_for": action.scheduled_for.isoformat() if action.scheduled_for else None,
+        "status": action.status,
+        "action_data": action.action_data,
+        "attempts": action.attempts or 0,
+        "locked_by": action.locked_by,
+        "lease_expires_at": action.lease_expires_at.isoformat() if action.lease_expires_at else None,
+        "started_at": action.started_at.isoformat() if action.started_at else None,
+        "executed_at": action.executed_at.isoformat() if action.executed_at else None,
+        "created_at": action.created_at.isoformat() if action.created_at else None,
+        "error": action.error,
+        "summary": {
+            "total": len(action.target_ids or []),
+            "processed": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded
+        },
+        "results": results
+    }
+
+
 @router.post("")
 async def create_scheduled_action(
     data: ScheduledActionCreate,
@@ -59,8 +109,28 @@ async def create_scheduled_action(
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new scheduled action."""
+    action_type = normalize_action_type(data.action_type)
+    if action_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported action type: {data.action_type}"
+        )
+
+    error = validate_action_data(action_type, data.action_data)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+
+    if not data.target_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one target is required"
+        )
+
     action = ScheduledAction(
-        action_type=data.action_type,
+        action_type=action_type,
         target_type=data.target_type,
         target_ids=data.target_ids,
         scheduled_for=data.scheduled_for,
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from pydantic import BaseModel
 from typing import Optional
 
@@ -11,6 +11,8 @@ from app.models.sending import (
     SendingTier, EmailSendingLimit, SendingLimitViolation
 )
 from app.api.deps.auth import get_current_admin
+from app.services import stats as stats_service
+from app.services.sending_limits import sending_limit_engine
 
 router = APIRouter()
 
@@ -25,59 +27,18 @@ class LimitUpdate(BaseModel):
 
 @router.get("/stats")
 async def get_sending_stats(
-    current_admin: AdminUser = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db)
+    current_admin: AdminUser = Depends(get_current_admin)
 ):
     """Get sending limits statistics."""
-    # Total sent today
-    total_sent = await db.execute(
-        select(func.sum(EmailSendingLimit.emails_sent_today))
-    )
-    total_sent_today = total_sent.scalar() or 0
+    return await stats_service.get_sending_stats()
 
-    # Users at limit
-    at_limit = await db.execute(
-        select(func.count(EmailSendingLimit.id))
-        .where(EmailSendingLimit.emails_sent_today >= EmailSendingLimit.daily_limit)
-    )
-    users_at_limit = at_limit.scalar() or 0
 
-    # Users near limit (>80%)
-    near_limit = await db.execute(
-        select(func.count(EmailSendingLimit.id))
-        .where(EmailSendingLimit.emails_sent_today >= EmailSendingLimit.daily_limit * 0.8)
-        .where(EmailSendingLimit.emails_sent_today < EmailSendingLimit.daily_limit)
-    )
-    users_near_limit = near_limit.scalar() or 0
-
-    # Active violations
-    violations = await db.execute(
-        select(func.count(SendingLimitViolation.id))
-        .where(SendingLimitViolation.is_resolved == False)
-    )
-    active_violations = violations.scalar() or 0
-
-    # Total users with limits
-    total = await db.execute(
-        select(func.count(EmailSendingLimit.id))
-    )
-    total_users = total.scalar() or 0
-
-    # Free tier users (revenue opportunity)
-    free_tier = await db.execute(
-        select(func.count(EmailSendingLimit.id))
-        .where(EmailSendingLimit.tier_name == "free")
-    )
-    revenue_opportunity = free_tier.scalar() or 0
-
-    return {
-        "total_sent_today": total_sent_today,
-        "users_at_limit": users_at_limit,
-        "users_near_limit": users_near_limit,
-        "active_violations": active_violations,
-        "total_users": total_users,
-        "revenue_opportunity_count": revenue_opportunity
-    }
+@router.get("/engine")
+async def get_sending_engine_status(
+    current_admin: AdminUser = Depends(get_current_admin)
+):
+    """Get this worker's in-memory sending quota engine status."""
+    return sending_limit_engine.status()
 
 
 @router.get("/users")
@@ -149,6 +110,7 @@ async def update_sending_limit(
 
     await db.commit()
     await db.refresh(limit)
+    sending_limit_engine.forget(limit.user_id)
 
     return {"success": True, "message": "Sending limit updated"}
 
@@ -174,6 +136,7 @@ async def unblock_user(
     limit.is_sending_enabled = True
     limit.custom_limit_reason = None
     await db.commit()
+    sending_limit_engine.forget(limit.user_id)
 
     return {"success": True, "message": "User unblocked"}
 
@@ -268,6 +231,7 @@ async def reset_user_sending_limit(
     limit.emails_sent_today = 0
     limit.emails_sent_this_hour = 0
     await db.commit()
+    sending_limit_engine.forget(user_id)
 
     return {"success": True, "message": "Sending counts reset"}
 
@@ -298,6 +262,7 @@ async def suspend_user_sending(
     limit.is_sending_enabled = False
     limit.custom_limit_reason = data.reason
     await db.commit()
+    sending_limit_engine.forget(user_id)
 
     return {"success": True, "message": "Sending suspended"}
 
@@ -323,6 +288,7 @@ async def resume_user_sending(
     limit.is_sending_enabled = True
     limit.custom_limit_reason = None
     await db.commit()
+    sending_limit_engine.forget(user_id)
 
     return {"success": True, "message": "Sending resumed"}
 
@@ -357,5 +323,6 @@ async def update_user_sending_limit(
         limit.hourly_limit = data.hourly_limit
 
     await db.commit()
+    sending_limit_engine.forget(user_id)
 
     return {"success": True, "message": "Limits updated"}
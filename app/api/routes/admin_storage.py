@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case, cast, and_, Float, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from app.db.session import get_db
 from app.models.admin import AdminUser
@@ -34,55 +35,113 @@ async def get_storage_overview(
     ]
 
 
+HISTOGRAM_BUCKETS = [f"{low}-{low + 10}" for low in range(0, 100, 10)] + ["over_quota"]
+
+
+def _storage_stats_query(include_histogram: bool):
+    """
+    Build the single-statement storage stats query.
+
+    Totals, averages and counts are aggregated in one pass over
+    mailbox_metadata; the top 10 comes from an uncorrelated subquery that
+    walks idx_mailbox_metadata_usage_bytes and is folded into the same row.
+    """
+    quota = MailboxMetadata.quota_bytes
+    usage = func.coalesce(MailboxMetadata.usage_bytes, 0)
+    has_quota = quota > 0
+
+    usage_percent = case(
+        (has_quota, cast(usage, Float) / quota * 100),
+        else_=0.0
+    )
+
+    top = (
+        select(
+            MailboxMetadata.email,
+            usage.label("usage_bytes"),
+            func.coalesce(quota, 0).label("quota_bytes"),
+            usage_percent.label("usage_percent"),
+        )
+        .order_by(MailboxMetadata.usage_bytes.desc().nullslast())
+        .limit(10)
+        .subquery()
+    )
+    top_users = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object(
+                            "email", top.c.email,
+                            "usage_bytes", top.c.usage_bytes,
+                            "quota_bytes", top.c.quota_bytes,
+                            "usage_percent", top.c.usage_percent,
+                        ),
+                        top.c.usage_bytes.desc()
+                    )
+                ),
+                literal_column("'[]'::json")
+            )
+        )
+        .scalar_subquery()
+        .label("top_users")
+    )
+
+    columns = [
+        func.coalesce(func.sum(quota), 0).label("total_allocated"),
+        func.coalesce(func.sum(usage), 0).label("total_used"),
+        func.coalesce(func.avg(usage_percent), 0).label("average_usage_percent"),
+        func.count().filter(and_(has_quota, usage >= quota * 0.9)).label("users_over_90_percent"),
+        func.count().label("total_mailboxes"),
+        top_users,
+    ]
+
+    if include_histogram:
+        # Decile of quota used; 100% exactly lands in the 90-100 bucket.
+        # The CASE guards the division itself (NULL without a quota): the
+        # planner may evaluate the FILTER's AND terms in any order.
+        decile = case((has_quota, func.least(usage * 10 // quota, 9)))
+        for index, label in enumerate(HISTOGRAM_BUCKETS[:-1]):
+            columns.append(
+                func.count().filter(and_(has_quota, usage <= quota, decile == index)).label(f"bucket_{index}")
+            )
+        columns.append(func.count().filter(and_(has_quota, usage > quota)).label("bucket_over"))
+
+    return select(*columns).select_from(MailboxMetadata)
+
+
 @router.get("/stats")
 async def get_storage_stats(
+    include_histogram: bool = Query(False, description="Add a usage histogram in 10% buckets"),
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get storage statistics."""
+    """Get storage statistics, aggregated in the database in a single query."""
     try:
-        # Get all mailboxes for calculation
-        result = await db.execute(select(MailboxMetadata))
-        mailboxes = result.scalars().all()
-
-        # Calculate stats from results
-        total_allocated = sum(m.quota_bytes or 0 for m in mailboxes)
-        total_used = sum(m.usage_bytes or 0 for m in mailboxes)
-
-        # Calculate average usage percent
-        usage_percents = [
-            (m.usage_bytes / m.quota_bytes * 100) if m.quota_bytes and m.quota_bytes > 0 else 0
-            for m in mailboxes
-        ]
-        average_usage_percent = sum(usage_percents) / len(usage_percents) if usage_percents else 0
-
-        # Users over 90%
-        users_over_90_percent = sum(
-            1 for m in mailboxes
-            if m.quota_bytes and m.quota_bytes > 0 and m.usage_bytes >= m.quota_bytes * 0.9
-        )
+        result = await db.execute(_storage_stats_query(include_histogram))
+        row = result.one()
+
+        stats = {
+            "total_allocated": int(row.total_allocated),
+            "total_used": int(row.total_used),
+            "average_usage_percent": float(row.average_usage_percent),
+            "users_over_90_percent": row.users_over_90_percent,
+            "total_mailboxes": row.total_mailboxes,
+            "top_users": row.top_users or []
+        }
 
-        # Top users by usage (sort and take top 10)
-        sorted_mailboxes = sorted(mailboxes, key=lambda m: m.usage_bytes or 0, reverse=True)[:10]
-        top_users = [
-            {
-                "email": m.email,
-                "usage_bytes": m.usage_bytes or 0,
-                "quota_bytes": m.quota_bytes or 0,
-                "usage_percent": (m.usage_bytes / m.quota_bytes * 100) if m.quota_bytes and m.quota_bytes > 0 else 0
-            }
-            for m in sorted_mailboxes
-        ]
+        if include_histogram:
+            counts = [getattr(row, f"bucket_{index}") for index in range(len(HISTOGRAM_BUCKETS) - 1)]
+            counts.append(row.bucket_over)
+            stats["histogram"] = [
+                {"bucket": label, "count": count}
+                for label, count in zip(HISTOGRAM_BUCKETS, counts)
+            ]
 
-        return {
-            "total_allocated": total_allocated,
-            "total_used": total_used,
-            "average_usage_percent": average_usage_percent,
-            "users_over_90_percent": users_over_90_percent,
-            "top_users": top_users
-        }
+        return stats
     except Exception as e:
         # Return empty stats if there's an error (e.g., table doesn't exist yet)
+        print(f"Error computing storage stats: {e}")
         return {
             "total_allocated": 0,
             "total_used": 0,
@@ -1,38 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, or_, tuple_
 from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel
+import csv
+import io
 
+from app.core.config import settings
 from app.db.session import get_db
-from app.core.security import get_password_hash
+from app.core.security import ahash_password
+from app.core.pagination import encode_cursor, decode_cursor, cached_count, estimate_table_rows
 from app.models.admin import AdminUser
 from app.models.user import User
 from app.models.mailbox import MailboxMetadata
-from app.models.audit import AuditLog
 from app.api.deps.auth import get_current_admin
 from app.services.mailcow import mailcow_service, MailcowError
+from app.services.user_search import search_users
+from app.services.log_sink import log_sink
+from app.services.encryption import encryption_service
+from app.services.user_export import EXPORT_FORMATS, parse_columns, stream_user_export
+from app.services.jobs import enqueue_job, job_worker
+from app.services.bulk_jobs import (
+    USERS_SUSPEND, USERS_UNSUSPEND, USERS_DELETE, USERS_QUOTA, USERS_IMPORT
+)
 
 router = APIRouter()
 
 
 @router.get("")
 async def get_users(
+    response: Response,
     search: Optional[str] = None,
     status_filter: Optional[str] = Query(None, alias="status"),
-    page: int = 1,
-    page_size: int = 50,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    page: int = Query(1, ge=1, description="Legacy offset paging, ignored when cursor is set"),
+    page_size: int = Query(50, ge=1, le=500),
+    include_total: bool = Query(False, description="Return an (estimated) total in X-Total-Count"),
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all users with optional filtering."""
-    query = select(User)
+    """
+    Get users with optional filtering, newest first.
+
+    Uses keyset pagination on (created_at, id): the X-Next-Cursor response
+    header carries the cursor for the next page and is absent on the last one.
+    """
+    filters = []
 
     # Apply search filter
     if search:
         search_term = f"%{search}%"
-        query = query.where(
+        filters.append(
             or_(
                 User.email.ilike(search_term),
                 User.first_name.ilike(search_term),
@@ -42,22 +63,49 @@ async def get_users(
 
     # Apply status filter
     if status_filter == "active":
-        query = query.where(User.is_suspended == False)
+        filters.append(User.is_suspended == False)
     elif status_filter == "suspended":
-        query = query.where(User.is_suspended == True)
+        filters.append(User.is_suspended == True)
+
+    # Quota/usage come from the same query via a join on email
+    query = (
+        select(User, MailboxMetadata.quota_bytes, MailboxMetadata.usage_bytes)
+        .outerjoin(MailboxMetadata, MailboxMetadata.email == User.email)
+        .where(*filters)
+        .order_by(User.created_at.desc(), User.id.desc())
+        .limit(page_size + 1)
+    )
 
-    # Order by created_at desc
-    query = query.order_by(User.created_at.desc())
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(User.created_at, User.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    elif page > 1:
+        query = query.offset((page - 1) * page_size)
 
     result = await db.execute(query)
-    users = result.scalars().all()
+    rows = result.all()
 
-    # Get mailbox metadata for quota info
-    user_emails = [u.email for u in users]
-    mailbox_result = await db.execute(
-        select(MailboxMetadata).where(MailboxMetadata.email.in_(user_emails))
-    )
-    mailboxes = {m.email: m for m in mailbox_result.scalars().all()}
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if has_more:
+        last_user = rows[-1].User
+        response.headers["X-Next-Cursor"] = encode_cursor(last_user.created_at, last_user.id)
+
+    if include_total:
+        if filters:
+            async def _count() -> int:
+                count_result = await db.execute(
+                    select(func.count(User.id)).where(*filters)
+                )
+                return count_result.scalar() or 0
+
+            total = await cached_count(("users", search, status_filter), _count)
+        else:
+            total = await estimate_table_rows(db, User.__tablename__)
+        response.headers["X-Total-Count"] = str(total)
 
     return [
         {
@@ -75,13 +123,24 @@ async def get_users(
             "locked_until": u.locked_until.isoformat() if u.locked_until else None,
             "created_at": u.created_at.isoformat() if u.created_at else None,
             "updated_at": u.updated_at.isoformat() if u.updated_at else None,
-            "quota_bytes": mailboxes.get(u.email, MailboxMetadata(quota_bytes=0)).quota_bytes,
-            "usage_bytes": mailboxes.get(u.email, MailboxMetadata(usage_bytes=0)).usage_bytes
+            "quota_bytes": quota_bytes or 0,
+            "usage_bytes": usage_bytes or 0
         }
-        for u in users
+        for u, quota_bytes, usage_bytes in rows
     ]
 
 
+@router.get("/search")
+async def search_users_ranked(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Fuzzy search users by email or name, best matches first."""
+    return await search_users(db, q, limit)
+
+
 @router.get("/{email}")
 async def get_user(
     email: str,
@@ -151,12 +210,12 @@ async def suspend_user(
     user.is_suspended = True
 
     # Log action
-    log = AuditLog(
+    log_sink.audit(
+        db,
         action_type="user_suspended",
         admin_email=current_admin.email,
         target_user_email=email
     )
-    db.add(log)
 
     await db.commit()
 
@@ -190,12 +249,12 @@ async def unsuspend_user(
     user.is_suspended = False
 
     # Log action
-    log = AuditLog(
+    log_sink.audit(
+        db,
         action_type="user_unsuspended",
         admin_email=current_admin.email,
         target_user_email=email
     )
-    db.add(log)
 
     await db.commit()
 
@@ -222,12 +281,12 @@ async def unlock_user(
     user.locked_until = None
 
     # Log action
-    log = AuditLog(
+    log_sink.audit(
+        db,
         action_type="user_unlocked",
         admin_email=current_admin.email,
         target_user_email=email
     )
-    db.add(log)
 
     await db.commit()
 
@@ -264,17 +323,17 @@ async def reset_user_password(
             print(f"Failed to update password in Mailcow: {e.message}")
             # Continue with local update even if Mailcow fails
 
-    user.password_hash = get_password_hash(new_password)
+    user.password_hash = await ahash_password(new_password)
     user.failed_login_attempts = 0
     user.locked_until = None
 
     # Log action
-    log = AuditLog(
+    log_sink.audit(
+        db,
         action_type="password_reset_by_admin",
         admin_email=current_admin.email,
         target_user_email=email
     )
-    db.add(log)
 
     await db.commit()
 
@@ -339,13 +398,13 @@ async def update_user_quota(
         mailbox.quota_bytes = quota_bytes
 
     # Log action
-    log = AuditLog(
+    log_sink.audit(
+        db,
         action_type="quota_updated",
         admin_email=current_admin.email,
         target_user_email=email,
         details={"quota_gb": quota_gb, "quota_bytes": quota_bytes}
     )
-    db.add(log)
 
     await db.commit()
 
@@ -369,13 +428,13 @@ async def delete_user(
         )
 
     # Log action before deletion
-    log = AuditLog(
+    log_sink.audit(
+        db,
         action_type="user_deleted",
         admin_email=current_admin.email,
         target_user_email=email,
         details={"user_id": str(user.id), "first_name": user.first_name, "last_name": user.last_name}
     )
-    db.add(log)
 
     await db.delete(user)
     await db.commit()
@@ -387,99 +446,47 @@ class BulkUserIdsRequest(BaseModel):
     user_ids: list[str]
 
 
-@router.post("/bulk/suspend")
+async def _queue_bulk_job(db: AsyncSession, job_type: str, items: list, admin: AdminUser, **params) -> dict:
+    job = enqueue_job(db, job_type, items, admin, params=params)
+    await db.commit()
+    job_worker.wake()
+    return {
+        "success": True,
+        "job_id": str(job.id),
+        "status": job.status,
+        "total": job.total,
+        "message": f"Queued {job.total} items; track progress at /admin/jobs/{job.id}"
+    }
+
+
+@router.post("/bulk/suspend", status_code=status.HTTP_202_ACCEPTED)
 async def bulk_suspend_users(
     data: BulkUserIdsRequest,
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Bulk suspend users."""
-    result = await db.execute(
-        select(User).where(User.id.in_(data.user_ids))
-    )
-    users = result.scalars().all()
-
-    for user in users:
-        # Deactivate mailbox in Mailcow
-        if mailcow_service.is_configured:
-            try:
-                await mailcow_service.deactivate_mailbox(user.email)
-            except MailcowError as e:
-                print(f"Failed to deactivate mailbox in Mailcow for {user.email}: {e.message}")
-
-        user.is_suspended = True
-        log = AuditLog(
-            action_type="user_suspended",
-            admin_email=current_admin.email,
-            target_user_email=user.email,
-            details={"bulk_action": True}
-        )
-        db.add(log)
-
-    await db.commit()
-
-    return {"success": True, "message": f"{len(users)} users suspended"}
+    """Bulk suspend users (runs as a background job)."""
+    return await _queue_bulk_job(db, USERS_SUSPEND, data.user_ids, current_admin)
 
 
-@router.post("/bulk/unsuspend")
+@router.post("/bulk/unsuspend", status_code=status.HTTP_202_ACCEPTED)
 async def bulk_unsuspend_users(
     data: BulkUserIdsRequest,
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Bulk unsuspend users."""
-    result = await db.execute(
-        select(User).where(User.id.in_(data.user_ids))
-    )
-    users = result.scalars().all()
-
-    for user in users:
-        # Activate mailbox in Mailcow
-        if mailcow_service.is_configured:
-            try:
-                await mailcow_service.activate_mailbox(user.email)
-            except MailcowError as e:
-                print(f"Failed to activate mailbox in Mailcow for {user.email}: {e.message}")
-
-        user.is_suspended = False
-        log = AuditLog(
-            action_type="user_unsuspended",
-            admin_email=current_admin.email,
-            target_user_email=user.email,
-            details={"bulk_action": True}
-        )
-        db.add(log)
-
-    await db.commit()
+    """Bulk unsuspend users (runs as a background job)."""
+    return await _queue_bulk_job(db, USERS_UNSUSPEND, data.user_ids, current_admin)
 
-    return {"success": True, "message": f"{len(users)} users unsuspended"}
 
-
-@router.post("/bulk/delete")
+@router.post("/bulk/delete", status_code=status.HTTP_202_ACCEPTED)
 async def bulk_delete_users(
     data: BulkUserIdsRequest,
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Bulk delete users."""
-    result = await db.execute(
-        select(User).where(User.id.in_(data.user_ids))
-    )
-    users = result.scalars().all()
-
-    for user in users:
-        log = AuditLog(
-            action_type="user_deleted",
-            admin_email=current_admin.email,
-            target_user_email=user.email,
-            details={"bulk_action": True, "user_id": str(user.id)}
-        )
-        db.add(log)
-        await db.delete(user)
-
-    await db.commit()
-
-    return {"success": True, "message": f"{len(users)} users deleted"}
+    """Bulk delete users (runs as a background job)."""
+    return await _queue_bulk_job(db, USERS_DELETE, data.user_ids, current_admin)
 
 
 class BulkQuotaRequest(BaseModel):
@@ -487,168 +494,144 @@ class BulkQuotaRequest(BaseModel):
     quota_bytes: int
 
 
-@router.post("/bulk/quota")
+@router.post("/bulk/quota", status_code=status.HTTP_202_ACCEPTED)
 async def bulk_update_quota(
     data: BulkQuotaRequest,
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Bulk update user quotas."""
-    result = await db.execute(
-        select(User).where(User.id.in_(data.user_ids))
+    """Bulk update user quotas (runs as a background job)."""
+    return await _queue_bulk_job(
+        db, USERS_QUOTA, data.user_ids, current_admin, quota_bytes=data.quota_bytes
     )
-    users = result.scalars().all()
-
-    quota_bytes = data.quota_bytes
-    quota_gb = quota_bytes / 1073741824
-
-    for user in users:
-        # Update quota in Mailcow
-        if mailcow_service.is_configured:
-            try:
-                await mailcow_service.update_mailbox_quota(user.email, quota_bytes)
-            except MailcowError as e:
-                print(f"Failed to update quota in Mailcow for {user.email}: {e.message}")
-
-        # Get or create mailbox
-        mailbox_result = await db.execute(
-            select(MailboxMetadata).where(MailboxMetadata.email == user.email)
-        )
-        mailbox = mailbox_result.scalar_one_or_none()
-
-        if not mailbox:
-            mailbox = MailboxMetadata(
-                email=user.email,
-                user_id=user.id,
-                quota_bytes=quota_bytes,
-                usage_bytes=0
-            )
-            db.add(mailbox)
-        else:
-            mailbox.quota_bytes = quota_bytes
-
-        log = AuditLog(
-            action_type="quota_updated",
-            admin_email=current_admin.email,
-            target_user_email=user.email,
-            details={"bulk_action": True, "quota_gb": quota_gb}
-        )
-        db.add(log)
-
-    await db.commit()
-
-    return {"success": True, "message": f"Quota updated for {len(users)} users"}
 
 
 @router.get("/export/users")
 async def export_users(
-    current_admin: AdminUser = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db)
+    export_format: str = Query("csv", alias="format", description="csv or ndjson"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns; default all"),
+    compress: bool = Query(False, description="gzip the export"),
+    current_admin: AdminUser = Depends(get_current_admin)
 ):
-    """Export users to CSV format."""
-    from fastapi.responses import PlainTextResponse
-
-    result = await db.execute(select(User).order_by(User.created_at.desc()))
-    users = result.scalars().all()
-
-    # Get mailbox data
-    mailbox_result = await db.execute(select(MailboxMetadata))
-    mailboxes = {m.email: m for m in mailbox_result.scalars().all()}
-
-    # Build CSV
-    csv_lines = ["email,first_name,last_name,recovery_email,recovery_phone,is_suspended,quota_bytes,usage_bytes,last_login,created_at"]
+    """Export users as a streamed CSV or NDJSON download."""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {export_format}"
+        )
 
-    for user in users:
-        mailbox = mailboxes.get(user.email)
-        line = f'"{user.email}","{user.first_name}","{user.last_name}","{user.recovery_email or ""}","{user.recovery_phone or ""}",{user.is_suspended},{mailbox.quota_bytes if mailbox else 0},{mailbox.usage_bytes if mailbox else 0},"{user.last_login or ""}","{user.created_at or ""}"'
-        csv_lines.append(line)
+    try:
+        selected = parse_columns(columns)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
-    csv_content = "\n".join(csv_lines)
+    filename = f"users-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
 
-    return PlainTextResponse(content=csv_content, media_type="text/csv")
+    return StreamingResponse(
+        stream_user_export(selected, export_format, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 class CSVImportRequest(BaseModel):
     filename: str
     rows: list[dict]
+    provision_mailcow: bool = False
+
+
+def _require_password_encryption(rows: list):
+    """Queued import passwords sit in the job row; never store them in plaintext."""
+    if not encryption_service.is_configured and any(row.get("password") for row in rows):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Importing passwords requires ENCRYPTION_KEY to be configured"
+        )
 
 
-@router.post("/import/csv")
+@router.post("/import/csv", status_code=status.HTTP_202_ACCEPTED)
 async def import_users_csv(
     data: CSVImportRequest,
     current_admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Import users from CSV."""
-    successful = 0
-    failed = 0
-    errors = []
-
-    for row in data.rows:
-        try:
-            email = row.get("email", "").strip()
-            if not email:
-                errors.append({"email": "N/A", "error": "Email is required"})
-                failed += 1
-                continue
-
-            # Check if user exists
-            existing = await db.execute(select(User).where(User.email == email))
-            if existing.scalar_one_or_none():
-                errors.append({"email": email, "error": "User already exists"})
-                failed += 1
-                continue
-
-            # Parse name
-            name = row.get("name", "").strip()
-            name_parts = name.split(" ", 1) if name else ["User", ""]
-            first_name = name_parts[0] if name_parts else "User"
-            last_name = name_parts[1] if len(name_parts) > 1 else ""
-
-            # Get password
-            password = row.get("password", "changeme123")
-
-            # Create user
-            user = User(
-                email=email,
-                first_name=first_name,
-                last_name=last_name,
-                password_hash=get_password_hash(password),
-                is_suspended=False
-            )
-            db.add(user)
-            await db.flush()
-
-            # Create mailbox
-            quota_bytes = int(row.get("quota_bytes", 5368709120))
-            mailbox = MailboxMetadata(
-                email=email,
-                user_id=user.id,
-                quota_bytes=quota_bytes,
-                usage_bytes=0
-            )
-            db.add(mailbox)
+    """Import users from pre-parsed CSV rows (runs as a background job)."""
+    _require_password_encryption(data.rows)
+    # Passwords wait in the job row until it finishes; keep them encrypted there
+    rows = [
+        {**row, "password": encryption_service.encrypt_if_needed(row.get("password"))}
+        for row in data.rows
+    ]
+    return await _queue_bulk_job(
+        db, USERS_IMPORT, rows, current_admin,
+        filename=data.filename, provision_mailcow=data.provision_mailcow
+    )
 
-            successful += 1
 
-        except Exception as e:
-            errors.append({"email": row.get("email", "N/A"), "error": str(e)})
-            failed += 1
+def _parse_import_csv(raw, max_rows: int) -> list:
+    """
+    Read an uploaded CSV row by row into import items.
+
+    Columns (case-insensitive): email, name or first_name/last_name,
+    password, quota_bytes. Passwords are encrypted as they are read.
+    """
+    text_stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text_stream)
+        columns = {(c or "").strip().lower() for c in (reader.fieldnames or [])}
+        if "email" not in columns:
+            raise ValueError("CSV must have an 'email' column")
+
+        items = []
+        for line in reader:
+            if len(items) >= max_rows:
+                raise ValueError(f"CSV has more than {max_rows} rows")
+            row = {(k or "").strip().lower(): (v or "").strip() for k, v in line.items() if k}
+            name = row.get("name") or f"{row.get('first_name', '')} {row.get('last_name', '')}".strip()
+            items.append({
+                "email": row.get("email", ""),
+                "name": name,
+                "password": encryption_service.encrypt_if_needed(row.get("password")),
+                "quota_bytes": row.get("quota_bytes") or None,
+            })
+        return items
+    finally:
+        # Leave closing the upload to FastAPI
+        text_stream.detach()
+
+
+@router.post("/import/csv/upload", status_code=status.HTTP_202_ACCEPTED)
+async def upload_users_csv(
+    file: UploadFile = File(...),
+    provision_mailcow: bool = Form(False),
+    current_admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import users from an uploaded CSV file (runs as a background job)."""
+    try:
+        # The upload is spooled to disk; parse it off the event loop
+        rows = await run_in_threadpool(_parse_import_csv, file.file, settings.IMPORT_MAX_ROWS)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid CSV: {e}"
+        )
 
-    await db.commit()
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV has no rows"
+        )
+    _require_password_encryption(rows)
 
-    # Log action
-    log = AuditLog(
-        action_type="users_imported",
-        admin_email=current_admin.email,
-        details={"filename": data.filename, "successful": successful, "failed": failed}
+    return await _queue_bulk_job(
+        db, USERS_IMPORT, rows, current_admin,
+        filename=file.filename or "upload.csv", provision_mailcow=provision_mailcow
     )
-    db.add(log)
-    await db.commit()
-
-    return {
-        "total": successful + failed,
-        "successful": successful,
-        "failed": failed,
-        "errors": errors
-    }
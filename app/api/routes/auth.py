@@ -1,16 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from datetime import datetime, timedelta
 import secrets
 import httpx
 
 from app.db.session import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import averify_password, ahash_password, create_access_token
 from app.core.config import settings
 from app.models.user import User
-from app.models.audit import LoginActivity
-from app.models.signup import SignupAttempt, PasswordReset
+from app.models.signup import PasswordReset
 from app.models.mailbox import MailboxMetadata
 from app.schemas.auth import (
     LoginRequest, SignupRequest, TokenResponse,
@@ -18,8 +17,14 @@ from app.schemas.auth import (
 )
 from app.schemas.user import UserResponse
 from app.api.deps.auth import get_current_user
+from app.api.deps.rate_limit import (
+    get_client_ip, rate_limit, enforce_rate_limit,
+    signup_rules, login_rules, password_reset_rules, otp_rules, otp_email_rules
+)
 from app.services.mailcow import mailcow_service, MailcowError
 from app.services.email import email_service
+from app.services.mail_queue import enqueue_email, mail_queue_worker
+from app.services.log_sink import log_sink
 
 router = APIRouter()
 
@@ -49,15 +54,11 @@ async def verify_hcaptcha(token: str, client_ip: str) -> bool:
         return False
 
 
-def get_client_ip(request: Request) -> str:
-    """Get client IP address from request."""
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
-
-
-@router.post("/signup", response_model=TokenResponse)
+@router.post(
+    "/signup",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("signup", signup_rules))]
+)
 async def signup(
     request: Request,
     data: SignupRequest,
@@ -70,7 +71,7 @@ async def signup(
     # Check honeypot (should be empty)
     if data.honeypot:
         # Log as bot attempt
-        attempt = SignupAttempt(
+        await log_sink.signup_attempt(
             ip_address=ip_address,
             email_attempted=data.email,
             honeypot_filled=True,
@@ -78,8 +79,6 @@ async def signup(
             failure_reason="Honeypot filled",
             user_agent=user_agent
         )
-        db.add(attempt)
-        await db.commit()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid request"
@@ -88,15 +87,13 @@ async def signup(
     # Verify hCaptcha token
     if settings.HCAPTCHA_SECRET_KEY:
         if not data.hcaptcha_token:
-            attempt = SignupAttempt(
+            await log_sink.signup_attempt(
                 ip_address=ip_address,
                 email_attempted=data.email,
                 success=False,
                 failure_reason="Missing captcha token",
                 user_agent=user_agent
             )
-            db.add(attempt)
-            await db.commit()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Please complete the captcha verification"
@@ -104,50 +101,18 @@ async def signup(
 
         is_valid_captcha = await verify_hcaptcha(data.hcaptcha_token, ip_address)
         if not is_valid_captcha:
-            attempt = SignupAttempt(
+            await log_sink.signup_attempt(
                 ip_address=ip_address,
                 email_attempted=data.email,
                 success=False,
                 failure_reason="Invalid captcha",
                 user_agent=user_agent
             )
-            db.add(attempt)
-            await db.commit()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Captcha verification failed. Please try again."
             )
 
-    # Check rate limiting
-    one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-    one_day_ago = datetime.utcnow() - timedelta(days=1)
-
-    hourly_count = await db.execute(
-        select(func.count(SignupAttempt.id))
-        .where(SignupAttempt.ip_address == ip_address)
-        .where(SignupAttempt.created_at > one_hour_ago)
-    )
-    hourly_attempts = hourly_count.scalar() or 0
-
-    daily_count = await db.execute(
-        select(func.count(SignupAttempt.id))
-        .where(SignupAttempt.ip_address == ip_address)
-        .where(SignupAttempt.created_at > one_day_ago)
-    )
-    daily_attempts = daily_count.scalar() or 0
-
-    if hourly_attempts >= settings.RATE_LIMIT_SIGNUPS_PER_HOUR:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Too many signup attempts. Please try again later."
-        )
-
-    if daily_attempts >= settings.RATE_LIMIT_SIGNUPS_PER_DAY:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Daily signup limit reached. Please try again tomorrow."
-        )
-
     # Normalize email (add @afrimail.com if no domain)
     email = data.email.lower().strip()
     if "@" not in email:
@@ -156,15 +121,13 @@ async def signup(
     # Check if user already exists
     existing = await db.execute(select(User).where(User.email == email))
     if existing.scalar_one_or_none():
-        attempt = SignupAttempt(
+        await log_sink.signup_attempt(
             ip_address=ip_address,
             email_attempted=email,
             success=False,
             failure_reason="Email already exists",
             user_agent=user_agent
         )
-        db.add(attempt)
-        await db.commit()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="An account with this email already exists"
@@ -201,15 +164,13 @@ async def signup(
         except MailcowError as e:
             # Log the error but don't expose internal details
             print(f"Mailcow mailbox creation failed for {email}: {e.message}")
-            attempt = SignupAttempt(
+            await log_sink.signup_attempt(
                 ip_address=ip_address,
                 email_attempted=email,
                 success=False,
                 failure_reason=f"Mailcow error: {e.message}",
                 user_agent=user_agent
             )
-            db.add(attempt)
-            await db.commit()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create email account. Please try again later."
@@ -224,7 +185,7 @@ async def signup(
         gender=data.gender,
         recovery_email=str(data.recovery_email) if data.recovery_email else None,
         recovery_phone=data.recovery_phone,
-        password_hash=get_password_hash(data.password),
+        password_hash=await ahash_password(data.password),
         is_suspended=False,
         failed_login_attempts=0
     )
@@ -238,17 +199,16 @@ async def signup(
     )
     db.add(mailbox)
 
+    await db.commit()
+    await db.refresh(user)
+
     # Log successful signup
-    attempt = SignupAttempt(
+    await log_sink.signup_attempt(
         ip_address=ip_address,
         email_attempted=email,
         success=True,
         user_agent=user_agent
     )
-    db.add(attempt)
-
-    await db.commit()
-    await db.refresh(user)
 
     # Generate token
     token = create_access_token(data={"sub": user.email}, is_admin=False)
@@ -267,7 +227,11 @@ async def signup(
     )
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("login", login_rules))]
+)
 async def login(
     request: Request,
     data: LoginRequest,
@@ -288,15 +252,13 @@ async def login(
 
     if not user:
         # Log failed attempt
-        activity = LoginActivity(
+        await log_sink.login_activity(
             user_email=email,
             ip_address=ip_address,
             user_agent=user_agent,
             success=False,
             failure_reason="User not found"
         )
-        db.add(activity)
-        await db.commit()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -317,7 +279,7 @@ async def login(
         )
 
     # Verify password
-    if not user.password_hash or not verify_password(data.password, user.password_hash):
+    if not user.password_hash or not await averify_password(data.password, user.password_hash):
         # Increment failed attempts
         user.failed_login_attempts += 1
 
@@ -325,14 +287,13 @@ async def login(
         if user.failed_login_attempts >= 5:
             user.locked_until = datetime.utcnow() + timedelta(minutes=15)
 
-        activity = LoginActivity(
+        await log_sink.login_activity(
             user_email=email,
             ip_address=ip_address,
             user_agent=user_agent,
             success=False,
             failure_reason="Invalid password"
         )
-        db.add(activity)
         await db.commit()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -343,16 +304,15 @@ async def login(
     user.failed_login_attempts = 0
     user.locked_until = None
     user.last_login = datetime.utcnow()
+    await db.commit()
 
     # Log successful login
-    activity = LoginActivity(
+    await log_sink.login_activity(
         user_email=email,
         ip_address=ip_address,
         user_agent=user_agent,
         success=True
     )
-    db.add(activity)
-    await db.commit()
 
     # Generate token
     token = create_access_token(data={"sub": user.email}, is_admin=False)
@@ -410,7 +370,7 @@ async def check_username(
     }
 
 
-@router.post("/forgot-password")
+@router.post("/forgot-password", dependencies=[Depends(rate_limit("forgot_password", password_reset_rules))])
 async def forgot_password(
     data: PasswordResetRequest,
     db: AsyncSession = Depends(get_db)
@@ -439,10 +399,26 @@ async def forgot_password(
         expires_at=datetime.utcnow() + timedelta(minutes=15)
     )
     db.add(reset)
+
+    queued = False
+    if data.method == "email" and email_service.is_configured and settings.MAIL_QUEUE_ENABLED:
+        # Send to recovery email if available, otherwise to the main email;
+        # queued in the same transaction as the OTP so neither exists alone
+        target_email = user.recovery_email if user.recovery_email else email
+        user_name = f"{user.first_name} {user.last_name}".strip()
+        subject, body_text, body_html = email_service.render_otp_email(otp_code, user_name)
+        enqueue_email(
+            db, target_email, subject, body_text, body_html,
+            kind="otp", max_attempts=settings.MAIL_QUEUE_OTP_MAX_ATTEMPTS
+        )
+        queued = True
+
     await db.commit()
 
     # Send OTP based on method
-    if data.method == "email":
+    if queued:
+        mail_queue_worker.wake()
+    elif data.method == "email":
         # Send to recovery email if available, otherwise to the main email
         target_email = user.recovery_email if user.recovery_email else email
         user_name = f"{user.first_name} {user.last_name}".strip()
@@ -465,7 +441,7 @@ async def forgot_password(
     return {"success": True, "message": "If the account exists, a reset code has been sent."}
 
 
-@router.post("/verify-otp")
+@router.post("/verify-otp", dependencies=[Depends(rate_limit("otp", otp_rules))])
 async def verify_otp(
     data: VerifyOTPRequest,
     db: AsyncSession = Depends(get_db)
@@ -475,6 +451,9 @@ async def verify_otp(
     if "@" not in email:
         email = f"{email}@afrimail.com"
 
+    # Per account as well, so a code can't be guessed from many addresses
+    await enforce_rate_limit("otp_email", email, otp_email_rules())
+
     # Find valid OTP
     result = await db.execute(
         select(PasswordReset)
@@ -495,7 +474,7 @@ async def verify_otp(
     return {"success": True, "message": "Code verified successfully"}
 
 
-@router.post("/reset-password")
+@router.post("/reset-password", dependencies=[Depends(rate_limit("otp", otp_rules))])
 async def reset_password(
     data: ResetPasswordRequest,
     db: AsyncSession = Depends(get_db)
@@ -505,6 +484,9 @@ async def reset_password(
     if "@" not in email:
         email = f"{email}@afrimail.com"
 
+    # Per account as well, so a code can't be guessed from many addresses
+    await enforce_rate_limit("otp_email", email, otp_email_rules())
+
     # Find valid OTP
     result = await db.execute(
         select(PasswordReset)
@@ -544,7 +526,7 @@ async def reset_password(
             )
 
     # Update password in local database
-    user.password_hash = get_password_hash(data.new_password)
+    user.password_hash = await ahash_password(data.new_password)
     user.failed_login_attempts = 0
     user.locked_until = None
 
@@ -1,16 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
+from datetime import datetime, timezone
 
 from app.db.session import get_db
-from app.core.security import verify_password, get_password_hash
+from app.core.config import settings
+from app.core.security import averify_password, ahash_password
 from app.models.user import User
-from app.models.mailbox import MailboxMetadata
+from app.models.mailbox import MailboxMetadata, MailboxSyncState
 from app.models.support import SupportTicket
 from app.schemas.auth import ChangePasswordRequest
 from app.schemas.user import UserUpdate, MailboxInfoResponse
 from app.api.deps.auth import get_current_user
 from app.services.mailcow import mailcow_service, MailcowError
+from app.services.mailbox_sync import upsert_mailbox_batch
 
 router = APIRouter()
 
@@ -79,7 +82,7 @@ async def change_password(
 ):
     """Change current user's password."""
     # Verify old password
-    if not current_user.password_hash or not verify_password(data.old_password, current_user.password_hash):
+    if not current_user.password_hash or not await averify_password(data.old_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -97,7 +100,7 @@ async def change_password(
             )
 
     # Update password in local database
-    current_user.password_hash = get_password_hash(data.new_password)
+    current_user.password_hash = await ahash_password(data.new_password)
     await db.commit()
 
     return {"success": True, "message": "Password changed successfully"}
@@ -111,7 +114,7 @@ async def change_password_alt(
 ):
     """Change current user's password (alternative endpoint)."""
     # Verify old password
-    if not current_user.password_hash or not verify_password(data.old_password, current_user.password_hash):
+    if not current_user.password_hash or not await averify_password(data.old_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -129,7 +132,7 @@ async def change_password_alt(
             )
 
     # Update password in local database
-    current_user.password_hash = get_password_hash(data.new_password)
+    current_user.password_hash = await ahash_password(data.new_password)
     await db.commit()
 
     return {"success": True, "message": "Password changed successfully"}
@@ -171,51 +174,63 @@ async def get_mailbox_info(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get current user's mailbox information, synced from Mailcow."""
-    quota_bytes = 5368709120  # 5GB default
-    usage_bytes = 0
-    messages = 0
+    """
+    Get current user's mailbox information.
+
+    Served from mailbox_metadata, which the background quota sync keeps
+    fresh; last_synced tells the client how current the numbers are: the
+    later of the row's last change and its domain's last sync. Mailcow is
+    only called inline when there is no local row yet or background sync is
+    disabled.
+    """
+    query = (
+        select(MailboxMetadata, MailboxSyncState.synced_at)
+        .outerjoin(
+            MailboxSyncState,
+            MailboxSyncState.domain == func.split_part(MailboxMetadata.email, "@", 2)
+        )
+        .where(MailboxMetadata.email == current_user.email)
+    )
+    row = (await db.execute(query)).first()
+    mailbox, domain_synced_at = row if row else (None, None)
 
-    # Try to get real-time data from Mailcow
-    if mailcow_service.is_configured:
+    needs_refresh = mailbox is None or not settings.QUOTA_SYNC_ENABLED
+    if needs_refresh and mailcow_service.is_configured:
         try:
+            read_at = datetime.now(timezone.utc)
             mailcow_mailbox = await mailcow_service.get_mailbox(current_user.email)
             if mailcow_mailbox:
-                quota_bytes = mailcow_mailbox.quota
-                usage_bytes = mailcow_mailbox.quota_used
-                messages = mailcow_mailbox.messages
+                await upsert_mailbox_batch(db, [mailcow_mailbox])
+                await db.commit()
+                if mailbox is not None:
+                    await db.refresh(mailbox)
+                else:
+                    result = await db.execute(
+                        select(MailboxMetadata).where(MailboxMetadata.email == current_user.email)
+                    )
+                    mailbox = result.scalar_one_or_none()
+                # Just read from Mailcow, even if nothing changed
+                domain_synced_at = read_at
         except MailcowError as e:
             # Log but continue with cached/default data
             print(f"Failed to fetch mailbox info from Mailcow: {e.message}")
 
-    # Update local cache
-    result = await db.execute(
-        select(MailboxMetadata).where(MailboxMetadata.email == current_user.email)
-    )
-    mailbox = result.scalar_one_or_none()
-
-    if mailbox:
-        # Update with latest data from Mailcow
-        mailbox.quota_bytes = quota_bytes
-        mailbox.usage_bytes = usage_bytes
-        await db.commit()
-        await db.refresh(mailbox)
-    else:
-        # Create mailbox metadata record
-        mailbox = MailboxMetadata(
+    if mailbox is None:
+        quota_bytes = 5368709120  # 5GB default
+        return MailboxInfoResponse(
             email=current_user.email,
             quota_bytes=quota_bytes,
-            usage_bytes=usage_bytes
+            usage_bytes=0,
+            quota_used_percentage=0.0,
+            last_synced=None
         )
-        db.add(mailbox)
-        await db.commit()
-        await db.refresh(mailbox)
 
     return MailboxInfoResponse(
         email=mailbox.email,
-        quota_bytes=mailbox.quota_bytes,
-        usage_bytes=mailbox.usage_bytes,
-        quota_used_percentage=mailbox.quota_used_percentage
+        quota_bytes=mailbox.quota_bytes or 0,
+        usage_bytes=mailbox.usage_bytes or 0,
+        quota_used_percentage=mailbox.quota_used_percentage,
+        last_synced=max(filter(None, (mailbox.last_synced, domain_synced_at)), default=None)
     )
 
 
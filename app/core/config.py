@@ -21,9 +21,18 @@ class Settings(BaseSettings):
     HCAPTCHA_SITE_KEY: str = ""
     HCAPTCHA_SECRET_KEY: str = ""
 
-    # Rate Limiting
+    # Rate Limiting (sliding window per client IP unless noted; 0 disables a limit)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "postgres"  # postgres (shared) or memory (per worker)
+    RATE_LIMIT_MAX_KEYS: int = 100000  # live counters kept per worker
+    RATE_LIMIT_CLEANUP_INTERVAL: float = 300.0  # seconds between expired counter sweeps
     RATE_LIMIT_SIGNUPS_PER_HOUR: int = 5
     RATE_LIMIT_SIGNUPS_PER_DAY: int = 10
+    RATE_LIMIT_LOGINS_PER_MINUTE: int = 10
+    RATE_LIMIT_LOGINS_PER_HOUR: int = 100
+    RATE_LIMIT_PASSWORD_RESETS_PER_HOUR: int = 5
+    RATE_LIMIT_OTP_ATTEMPTS_PER_HOUR: int = 20
+    RATE_LIMIT_OTP_ATTEMPTS_PER_EMAIL: int = 10  # per account per 15 minutes
 
     # CORS
     CORS_ORIGINS: str = '["http://localhost:5173"]'
@@ -31,6 +40,89 @@ class Settings(BaseSettings):
     # Mailcow
     MAILCOW_API_URL: str = ""
     MAILCOW_API_KEY: str = ""
+    MAILCOW_MAX_CONNECTIONS: int = 20
+    MAILCOW_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    MAILCOW_KEEPALIVE_EXPIRY: float = 30.0  # seconds
+    MAILCOW_HTTP2: bool = False  # Requires the h2 package
+    MAILCOW_CONNECT_TIMEOUT: float = 5.0  # seconds
+    MAILCOW_READ_TIMEOUT: float = 10.0  # seconds, GET requests
+    MAILCOW_WRITE_TIMEOUT: float = 30.0  # seconds, add/edit/delete requests
+    MAILCOW_RETRIES: int = 2  # Extra attempts for idempotent GETs
+    MAILCOW_RETRY_BACKOFF: float = 0.25  # seconds, base for jittered backoff
+    MAILCOW_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures before opening
+    MAILCOW_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds before a half-open probe
+    MAILCOW_CACHE_ENABLED: bool = True
+    MAILCOW_CACHE_MAX_ENTRIES: int = 2048
+    MAILCOW_CACHE_TTL_MAILBOXES: float = 30.0  # seconds, mailbox listings
+    MAILCOW_CACHE_TTL_MAILBOX: float = 15.0  # seconds, single mailbox lookups
+    MAILCOW_CACHE_TTL_DOMAINS: float = 60.0  # seconds
+    MAILCOW_CACHE_TTL_ALIASES: float = 60.0  # seconds
+    MAILCOW_BULK_CHUNK_SIZE: int = 100  # mailboxes per array edit/delete request
+    MAILCOW_BULK_CONCURRENCY: int = 4  # concurrent requests per bulk operation
+    MAILBOX_SYNC_BATCH_SIZE: int = 1000  # rows per INSERT ... ON CONFLICT statement
+
+    # Background quota sync (one leader per deployment via advisory lock)
+    QUOTA_SYNC_ENABLED: bool = True
+    QUOTA_SYNC_INTERVAL: float = 300.0  # seconds between sync cycles
+    QUOTA_SYNC_LOCK_KEY: int = 7240101  # pg advisory lock id
+
+    # login_activity monthly partitions (created ahead, dropped after retention)
+    PARTITION_MAINTENANCE_ENABLED: bool = True
+    PARTITION_MAINTENANCE_INTERVAL: float = 21600.0  # seconds between maintenance cycles
+    PARTITION_MAINTENANCE_LOCK_KEY: int = 7240102  # pg advisory lock id
+    LOGIN_ACTIVITY_PARTITIONS_AHEAD: int = 3  # future months kept created
+    LOGIN_ACTIVITY_RETENTION_MONTHS: int = 0  # whole months kept before dropping; 0 keeps all
+
+    # Scheduled action runner (every app worker claims due actions with SKIP LOCKED)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_POLL_INTERVAL: float = 15.0  # seconds
+    SCHEDULER_BATCH_SIZE: int = 100  # targets committed per transaction
+    SCHEDULER_LEASE_TIMEOUT: float = 120.0  # seconds before another worker takes over
+    SCHEDULER_MAX_ATTEMPTS: int = 3  # claims before an interrupted action is failed
+
+    # Background bulk jobs (every app worker claims queued jobs with SKIP LOCKED)
+    JOBS_ENABLED: bool = True
+    JOBS_CONCURRENCY: int = 2  # jobs run at once per app worker
+    JOBS_POLL_INTERVAL: float = 2.0  # seconds
+    JOBS_CHUNK_SIZE: int = 500  # items committed per transaction
+    JOBS_LEASE_TIMEOUT: float = 120.0  # seconds before another worker resumes a job
+    JOBS_MAX_ATTEMPTS: int = 3  # claims before an interrupted job is failed
+    JOBS_MAX_ERRORS: int = 1000  # per-item errors kept on a job
+    JOBS_RETENTION_DAYS: int = 30  # finished jobs kept this long
+    JOBS_SSE_INTERVAL: float = 1.0  # seconds between progress polls on the event stream
+    IMPORT_MAX_ROWS: int = 200000  # rows accepted per CSV upload
+
+    # Admin dashboard stats cache (per process)
+    STATS_CACHE_TTL: float = 30.0  # seconds served fresh
+    STATS_CACHE_STALE_TTL: float = 300.0  # further seconds served stale while refreshing
+
+    # Per-user sending quotas (in-memory token buckets, reconciled to the database)
+    SENDING_LIMITS_ENABLED: bool = True
+    SENDING_LIMITS_RECONCILE_INTERVAL: float = 5.0  # seconds between reconcile cycles
+    SENDING_LIMITS_BATCH_SIZE: int = 1000  # users per reconcile statement
+    SENDING_LIMITS_IDLE_TTL: float = 900.0  # seconds before an idle user is dropped from memory
+    SENDING_LIMITS_LOCK_KEY: int = 7240103  # pg advisory lock id for the window reset
+
+    # Buffered audit/login/signup log writer (per process, flushed on shutdown)
+    LOG_SINK_ENABLED: bool = True
+    LOG_SINK_BATCH_SIZE: int = 500  # rows per flush; a full batch flushes early
+    LOG_SINK_FLUSH_INTERVAL: float = 1.0  # seconds
+    LOG_SINK_MAX_BUFFER: int = 10000  # events held before writing through
+
+    # Authenticated principal cache (per process, invalidated via LISTEN/NOTIFY)
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_TTL: float = 30.0  # seconds a cached user/admin row is trusted
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Prometheus metrics at /metrics (needs prometheus-client)
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""  # if set, scrapes must send "Authorization: Bearer <token>"
+
+    # SQL diagnostics: slow query log and N+1 detection (adds per-statement overhead)
+    QUERY_MONITOR_ENABLED: bool = False
+    QUERY_SLOW_THRESHOLD_MS: float = 200.0
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 30  # statements per request
+    QUERY_MONITOR_HISTORY: int = 200  # slow queries / N+1 requests kept per worker
 
     # Encryption key for sensitive data (recovery email/phone)
     # Generate with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
@@ -44,6 +136,30 @@ class Settings(BaseSettings):
     SMTP_FROM_EMAIL: str = ""
     SMTP_FROM_NAME: str = "Afrimail"
     SMTP_USE_TLS: bool = True
+    SMTP_TIMEOUT: float = 15.0  # seconds
+    SMTP_POOL_SIZE: int = 4  # reusable authenticated connections per worker
+    SMTP_POOL_IDLE_TIMEOUT: float = 60.0  # close connections idle longer than this
+    SMTP_POOL_HEALTHCHECK_AFTER: float = 5.0  # NOOP before reusing a connection idle this long
+    SMTP_POOL_MAX_MESSAGES: int = 100  # reconnect after this many messages
+
+    # Outbound mail queue (every app worker runs a queue worker)
+    MAIL_QUEUE_ENABLED: bool = True
+    MAIL_QUEUE_CONCURRENCY: int = 4  # concurrent sends per app worker
+    MAIL_QUEUE_DOMAIN_CONCURRENCY: int = 2  # concurrent sends per recipient domain per app worker
+    MAIL_QUEUE_POLL_INTERVAL: float = 1.0  # seconds
+    MAIL_QUEUE_MAX_ATTEMPTS: int = 6
+    MAIL_QUEUE_OTP_MAX_ATTEMPTS: int = 4  # OTPs expire after 15 minutes
+    MAIL_QUEUE_RETRY_BASE: float = 30.0  # seconds, doubled per attempt
+    MAIL_QUEUE_RETRY_MAX: float = 3600.0  # seconds
+    MAIL_QUEUE_LEASE_TIMEOUT: float = 300.0  # seconds before a stuck 'sending' job is requeued
+    MAIL_QUEUE_RETENTION_DAYS: int = 7  # sent rows kept this long
+
+    # Password hashing pool (bcrypt runs off the event loop)
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread or process
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Requests allowed to wait for a worker
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0  # Seconds to wait before rejecting
+    PASSWORD_HASH_BULK_WORKERS: int = 0  # Processes for bulk import hashing (0 = CPU count)
 
     # App
     DEBUG: bool = False
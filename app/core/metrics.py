@@ -0,0 +1,171 @@
+"""
+Prometheus instrumentation.
+
+prometheus_client is optional: without it (or with METRICS_ENABLED off) every
+metric here is a no-op and /metrics is not mounted. Under gunicorn,
+gunicorn.conf.py points PROMETHEUS_MULTIPROC_DIR at a directory shared by
+the workers; each worker writes its samples there and /metrics aggregates
+all of them, whichever worker serves the scrape.
+"""
+
+import os
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+METRICS_ENABLED = prometheus_client is not None and settings.METRICS_ENABLED
+
+
+class _NoopMetric:
+    """Stands in for a metric when metrics are disabled."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, value=1):
+        pass
+
+    def dec(self, value=1):
+        pass
+
+    def set(self, value):
+        pass
+
+
+def _histogram(name: str, documentation: str, labelnames=(), **kwargs):
+    if not METRICS_ENABLED:
+        return _NoopMetric()
+    return prometheus_client.Histogram(name, documentation, labelnames, **kwargs)
+
+
+def _counter(name: str, documentation: str, labelnames=()):
+    if not METRICS_ENABLED:
+        return _NoopMetric()
+    return prometheus_client.Counter(name, documentation, labelnames)
+
+
+def _gauge(name: str, documentation: str, labelnames=()):
+    if not METRICS_ENABLED:
+        return _NoopMetric()
+    # Summed over live workers; gunicorn.conf.py drops dead workers' files
+    return prometheus_client.Gauge(name, documentation, labelnames, multiprocess_mode="livesum")
+
+
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# ==================== Metrics ====================
+
+HTTP_REQUEST_DURATION = _histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = _gauge(
+    "http_requests_in_flight", "HTTP requests currently being served",
+)
+
+DB_POOL_CHECKOUT_WAIT = _histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a database connection",
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = _gauge(
+    "db_pool_checked_out_connections", "Database connections currently checked out",
+)
+DB_POOL_CAPACITY = _gauge(
+    "db_pool_capacity_connections", "Database connections the pool may open (pool_size + max_overflow)",
+)
+
+MAILCOW_REQUEST_DURATION = _histogram(
+    "mailcow_request_duration_seconds", "Mailcow API call latency by endpoint",
+    ["method", "endpoint"], buckets=SLOW_BUCKETS,
+)
+MAILCOW_REQUEST_ERRORS = _counter(
+    "mailcow_request_errors_total", "Failed Mailcow API calls by endpoint and error",
+    ["method", "endpoint", "error"],
+)
+
+SMTP_SEND_DURATION = _histogram(
+    "smtp_send_duration_seconds", "SMTP message send latency",
+    ["outcome"], buckets=SLOW_BUCKETS,
+)
+
+PASSWORD_HASH_IN_FLIGHT = _gauge(
+    "password_hash_in_flight", "Password hash/verify calls admitted to the pool",
+)
+PASSWORD_HASH_QUEUED = _gauge(
+    "password_hash_queued", "Password hash/verify calls waiting for a pool worker",
+)
+
+
+def mailcow_endpoint_label(endpoint: str) -> str:
+    """Collapse a Mailcow endpoint to action/object (drops ids and addresses)."""
+    return "/".join(endpoint.strip("/").split("/")[:2])
+
+
+def observe_mailcow_call(method: str, endpoint: str, started: float, error: Optional[str] = None):
+    label = mailcow_endpoint_label(endpoint)
+    MAILCOW_REQUEST_DURATION.labels(method, label).observe(time.perf_counter() - started)
+    if error:
+        MAILCOW_REQUEST_ERRORS.labels(method, label, error).inc()
+
+
+# ==================== HTTP Middleware ====================
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency per route template and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Set by the router on match; the template keeps label cardinality bounded
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+# ==================== Exposition ====================
+
+def render_metrics() -> bytes:
+    """Render all metrics, aggregated across workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry)
+
+
+CONTENT_TYPE = prometheus_client.CONTENT_TYPE_LATEST if prometheus_client else "text/plain"
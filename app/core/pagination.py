@@ -0,0 +1,79 @@
+"""
+Keyset pagination helpers.
+
+Cursors are opaque, URL-safe tokens wrapping the sort key of the last row on
+a page, e.g. (created_at, id). Clients pass the token back unchanged to get
+the next page, so deep pages cost the same as the first one.
+"""
+
+import base64
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Cached row counts: key -> (expires_at, value)
+_count_cache: Dict[Any, Tuple[float, int]] = {}
+
+COUNT_CACHE_TTL_SECONDS = 60
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    """Encode a (timestamp, id) sort key as an opaque cursor."""
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], UUID]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (
+            datetime.fromisoformat(sort_value) if sort_value else None,
+            UUID(row_id),
+        )
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def estimate_table_rows(db: AsyncSession, table_name: str) -> int:
+    """
+    Get the planner's row estimate for a table.
+
+    Reads pg_class.reltuples (kept current by autovacuum/ANALYZE) instead of
+    running COUNT(*), and caches the value for COUNT_CACHE_TTL_SECONDS.
+    """
+    async def _estimate() -> int:
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table_name}
+        )
+        value = result.scalar()
+        # reltuples is -1 for tables that have never been analyzed
+        return max(int(value or 0), 0)
+
+    return await cached_count(("estimate", table_name), _estimate)
+
+
+async def cached_count(key: Any, compute) -> int:
+    """Return a cached count for key, recomputing it once the TTL expires."""
+    now = time.monotonic()
+    cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    value = await compute()
+    if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    _count_cache[key] = (now + COUNT_CACHE_TTL_SECONDS, value)
+    return value
@@ -1,12 +1,21 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import List, Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from .config import settings
+from .metrics import PASSWORD_HASH_IN_FLIGHT, PASSWORD_HASH_QUEUED
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHashQueueFull(Exception):
+    """Raised when the password hashing pool cannot accept more work."""
+    pass
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -17,6 +26,144 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords (one pool task, less IPC per hash)."""
+    return [pwd_context.hash(p) for p in passwords]
+
+
+# ==================== Async Password Hashing ====================
+# bcrypt takes ~250ms of CPU per call, so the async variants below run it in
+# a bounded worker pool instead of on the event loop. At most
+# PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE calls may be in flight per
+# process; callers beyond that wait up to PASSWORD_HASH_QUEUE_TIMEOUT seconds
+# and then get PasswordHashQueueFull (mapped to 503 in app.main).
+
+_hash_executor: Optional[Executor] = None
+_hash_slots: Optional[asyncio.Semaphore] = None
+_hash_in_flight = 0
+
+# Bulk imports hash in their own process pool so logins and signups keep the
+# request pool to themselves.
+_bulk_hash_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_hash_executor() -> Executor:
+    """Get or create the password hashing worker pool."""
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS
+            )
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash"
+            )
+    return _hash_executor
+
+
+def _get_hash_slots() -> asyncio.Semaphore:
+    """Get or create the semaphore bounding in-flight hashing work."""
+    global _hash_slots
+    if _hash_slots is None:
+        _hash_slots = asyncio.Semaphore(
+            settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+        )
+    return _hash_slots
+
+
+async def _run_hash_job(func, *args):
+    """Run a hashing function in the pool, applying backpressure."""
+    global _hash_in_flight
+    slots = _get_hash_slots()
+
+    try:
+        await asyncio.wait_for(
+            slots.acquire(),
+            timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        raise PasswordHashQueueFull("Password hashing queue is full")
+
+    _hash_in_flight += 1
+    _report_hash_queue()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_in_flight -= 1
+        _report_hash_queue()
+        slots.release()
+
+
+def _report_hash_queue():
+    PASSWORD_HASH_IN_FLIGHT.set(_hash_in_flight)
+    PASSWORD_HASH_QUEUED.set(max(0, _hash_in_flight - settings.PASSWORD_HASH_WORKERS))
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop."""
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+
+async def ahash_password(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await _run_hash_job(get_password_hash, password)
+
+
+def _get_bulk_hash_executor() -> ProcessPoolExecutor:
+    """Get or create the process pool for bulk hashing."""
+    global _bulk_hash_executor
+    if _bulk_hash_executor is None:
+        _bulk_hash_executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_BULK_WORKERS or os.cpu_count() or 1
+        )
+    return _bulk_hash_executor
+
+
+async def ahash_passwords(passwords: List[str], batch_size: int = 16) -> List[str]:
+    """
+    Hash many passwords in parallel on the bulk process pool.
+
+    Passwords are sent in batches of `batch_size` per task; results keep the
+    input order.
+    """
+    if not passwords:
+        return []
+    loop = asyncio.get_running_loop()
+    executor = _get_bulk_hash_executor()
+    batches = await asyncio.gather(*(
+        loop.run_in_executor(executor, get_password_hashes, passwords[i:i + batch_size])
+        for i in range(0, len(passwords), batch_size)
+    ))
+    return [h for batch in batches for h in batch]
+
+
+def password_hash_pool_stats() -> dict:
+    """Get current utilisation of the password hashing pool."""
+    workers = settings.PASSWORD_HASH_WORKERS
+    return {
+        "executor": settings.PASSWORD_HASH_EXECUTOR,
+        "workers": workers,
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "in_flight": _hash_in_flight,
+        "queued": max(0, _hash_in_flight - workers),
+    }
+
+
+def shutdown_password_hasher():
+    """Shut down the password hashing pools."""
+    global _hash_executor, _hash_slots, _bulk_hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+    if _bulk_hash_executor is not None:
+        _bulk_hash_executor.shutdown(wait=False, cancel_futures=True)
+        _bulk_hash_executor = None
+    _hash_slots = None
+
+
 def create_access_token(
     data: dict,
     expires_delta: Optional[timedelta] = None,
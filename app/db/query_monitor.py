@@ -0,0 +1,209 @@
+"""
+Opt-in SQL statement instrumentation (QUERY_MONITOR_ENABLED).
+
+Engine cursor events time every statement. QueryMonitorMiddleware gives each
+request a RequestQueries record through a context variable, which SQLAlchemy
+carries into the greenlet that runs the statement, so statements are
+attributed to the route that issued them. Per process it keeps:
+
+- slow statements (over QUERY_SLOW_THRESHOLD_MS), logged with their route
+- requests that ran more than QUERY_N_PLUS_ONE_THRESHOLD statements, logged
+  as probable N+1s with their most repeated statements
+- per-route totals
+
+Responses carry X-DB-Query-Count and X-DB-Query-Time-Ms headers.
+"""
+
+import contextvars
+import logging
+import os
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_PREVIEW = 500  # characters of SQL kept per statement
+
+
+class RequestQueries:
+    """Statements run on behalf of one request."""
+
+    __slots__ = ("scope", "count", "total_time", "statements")
+
+    def __init__(self, scope: Dict[str, Any]):
+        self.scope = scope
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def route(self) -> Optional[str]:
+        # Set by the router once the request is matched
+        return getattr(self.scope.get("route"), "path", None)
+
+
+_current: contextvars.ContextVar[Optional[RequestQueries]] = contextvars.ContextVar(
+    "request_queries", default=None
+)
+
+
+def _preview(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= STATEMENT_PREVIEW else statement[:STATEMENT_PREVIEW] + "..."
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class QueryMonitor:
+    """Per-process record of slow statements, N+1 suspects and route totals."""
+
+    def __init__(self, history: int):
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.n_plus_one: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.routes: Dict[str, Dict[str, float]] = {}
+        self._installed = False
+
+    # ==================== Engine Events ====================
+
+    def install(self):
+        """Attach the cursor event listeners to the engine (idempotent)."""
+        if self._installed:
+            return
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_execute)
+        self._installed = True
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_monitor_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_monitor_start
+        request = _current.get()
+        if request is not None:
+            request.count += 1
+            request.total_time += elapsed
+            request.statements[statement] += 1
+
+        if elapsed * 1000 >= settings.QUERY_SLOW_THRESHOLD_MS:
+            route = request.route if request and request.route else "(background)"
+            logger.warning(f"Slow query ({elapsed * 1000:.1f} ms) in {route}: {_preview(statement)}")
+            self.slow_queries.append({
+                "at": _now(),
+                "route": route,
+                "duration_ms": round(elapsed * 1000, 2),
+                "statement": _preview(statement),
+            })
+
+    # ==================== Requests ====================
+
+    def start_request(self, scope: Dict[str, Any]) -> contextvars.Token:
+        return _current.set(RequestQueries(scope))
+
+    def finish_request(self, token: contextvars.Token, method: str, status_code: int):
+        request = _current.get()
+        _current.reset(token)
+        if request is None:
+            return
+        route = f"{method} {request.route or 'unmatched'}"
+
+        totals = self.routes.setdefault(route, {
+            "requests": 0, "statements": 0, "max_statements": 0, "total_ms": 0.0, "n_plus_one": 0
+        })
+        totals["requests"] += 1
+        totals["statements"] += request.count
+        totals["max_statements"] = max(totals["max_statements"], request.count)
+        totals["total_ms"] += request.total_time * 1000
+
+        if request.count > settings.QUERY_N_PLUS_ONE_THRESHOLD:
+            totals["n_plus_one"] += 1
+            repeated = [
+                {"statement": _preview(statement), "count": count}
+                for statement, count in request.statements.most_common(3)
+            ]
+            logger.warning(
+                f"Probable N+1: {route} ran {request.count} statements "
+                f"({request.total_time * 1000:.1f} ms); most repeated x{repeated[0]['count']}: "
+                f"{repeated[0]['statement']}"
+            )
+            self.n_plus_one.append({
+                "at": _now(),
+                "route": route,
+                "status": status_code,
+                "statements": request.count,
+                "duration_ms": round(request.total_time * 1000, 2),
+                "top_statements": repeated,
+            })
+
+    def report(self, limit: int = 50) -> Dict[str, Any]:
+        """Snapshot for the diagnostics endpoint (this worker only)."""
+        routes: List[Dict[str, Any]] = [
+            {
+                "route": route,
+                "requests": int(t["requests"]),
+                "avg_statements": round(t["statements"] / t["requests"], 2),
+                "max_statements": int(t["max_statements"]),
+                "avg_db_ms": round(t["total_ms"] / t["requests"], 2),
+                "n_plus_one": int(t["n_plus_one"]),
+            }
+            for route, t in self.routes.items()
+        ]
+        routes.sort(key=lambda r: r["avg_statements"], reverse=True)
+        return {
+            "enabled": self._installed,
+            "worker_pid": os.getpid(),
+            "slow_threshold_ms": settings.QUERY_SLOW_THRESHOLD_MS,
+            "n_plus_one_threshold": settings.QUERY_N_PLUS_ONE_THRESHOLD,
+            "routes": routes[:limit],
+            "slow_queries": list(reversed(self.slow_queries))[:limit],
+            "n_plus_one": list(reversed(self.n_plus_one))[:limit],
+        }
+
+    def reset(self):
+        self.slow_queries.clear()
+        self.n_plus_one.clear()
+        self.routes.clear()
+
+
+# Global monitor instance
+query_monitor = QueryMonitor(history=settings.QUERY_MONITOR_HISTORY)
+
+
+class QueryMonitorMiddleware:
+    """ASGI middleware attributing statements to requests and adding debug headers."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_headers(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(request.count).encode()))
+                headers.append((b"x-db-query-time-ms", f"{request.total_time * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = query_monitor.start_request(scope)
+        request = _current.get()
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            query_monitor.finish_request(token, scope["method"], status_code)
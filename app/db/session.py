@@ -1,16 +1,42 @@
+import time
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT, DB_POOL_CHECKED_OUT, DB_POOL_CAPACITY
+
+POOL_SIZE = 10
+MAX_OVERFLOW = 20
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool that reports checkout wait time and saturation."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+            DB_POOL_CHECKED_OUT.set(self.checkedout())
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        DB_POOL_CHECKED_OUT.set(self.checkedout())
+
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     future=True,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
 )
+DB_POOL_CAPACITY.set(POOL_SIZE + MAX_OVERFLOW)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -42,9 +68,19 @@ async def init_db():
         SupportTicket, Announcement, EmailAlias, MailDomain, CustomDomain,
         UserGroup, UserGroupMember, UserTemplate, ScheduledAction, BulkImportLog,
         SendingTier, EmailSendingLimit, EmailSendLog, SendingLimitViolation,
-        SignupAttempt, PasswordReset, SystemSettings
+        SignupAttempt, PasswordReset, RateLimitCounter, SystemSettings, OutboundEmail,
+        BulkJob
     )
 
     async with engine.begin() as conn:
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+
+    # login_activity needs its current and upcoming monthly partitions; rows
+    # land in its default partition until they exist, so don't fail startup
+    from app.services.partitions import maintain_partitions
+    try:
+        async with engine.begin() as conn:
+            await maintain_partitions(conn)
+    except Exception as e:
+        print(f"login_activity partition maintenance: ERROR - {e}")
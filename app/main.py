@@ -1,11 +1,24 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
+from app.core.metrics import METRICS_ENABLED, CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.db.query_monitor import QueryMonitorMiddleware, query_monitor
+from app.core.security import PasswordHashQueueFull, shutdown_password_hasher
 from app.api.routes import api_router, admin_router
 from app.db.session import init_db, engine
 from app.services.mailcow import mailcow_service
+from app.services.email import email_service
+from app.services.mail_queue import mail_queue_worker
+from app.services.quota_sync import quota_sync_worker
+from app.services.partitions import partition_maintenance_worker
+from app.services.scheduler import scheduled_action_runner
+from app.services.jobs import job_worker
+from app.services.principal_cache import principal_cache
+from app.services.log_sink import log_sink
+from app.services.sending_limits import sending_limit_engine
 
 
 @asynccontextmanager
@@ -32,11 +45,66 @@ async def lifespan(app: FastAPI):
     else:
         print("Mailcow API: Not configured")
 
+    # Buffer audit/login/signup log rows and write them in batches
+    if settings.LOG_SINK_ENABLED:
+        log_sink.start()
+        print(f"Log sink: batches of {settings.LOG_SINK_BATCH_SIZE} every {settings.LOG_SINK_FLUSH_INTERVAL:g}s")
+
+    # Reconcile in-memory sending quotas with email_sending_limits
+    if settings.SENDING_LIMITS_ENABLED:
+        sending_limit_engine.start()
+        print(f"Sending limits: reconciled every {settings.SENDING_LIMITS_RECONCILE_INTERVAL:g}s")
+
+    # Start background quota sync (only the advisory lock holder syncs)
+    if settings.QUOTA_SYNC_ENABLED and mailcow_service.is_configured:
+        quota_sync_worker.start()
+        print(f"Quota sync: every {settings.QUOTA_SYNC_INTERVAL:.0f}s")
+
+    # Keep login_activity partitions ahead of time and apply retention
+    if settings.PARTITION_MAINTENANCE_ENABLED:
+        partition_maintenance_worker.start()
+        print(f"Partition maintenance: every {settings.PARTITION_MAINTENANCE_INTERVAL:.0f}s")
+
+    # Start outbound mail queue worker (jobs are claimed with SKIP LOCKED)
+    if settings.MAIL_QUEUE_ENABLED and email_service.is_configured:
+        mail_queue_worker.start()
+        print(f"Mail queue worker: {mail_queue_worker.worker_id}")
+
+    # Start scheduled action runner (actions are leased with SKIP LOCKED)
+    if settings.SCHEDULER_ENABLED:
+        scheduled_action_runner.start()
+        print(f"Scheduled action runner: every {settings.SCHEDULER_POLL_INTERVAL:.0f}s")
+
+    # Start bulk job worker (jobs are leased with SKIP LOCKED)
+    if settings.JOBS_ENABLED:
+        job_worker.start()
+        print(f"Bulk job worker: {job_worker.worker_id}")
+
+    # Listen for Mailcow cache invalidations from other workers (reads bypass the cache until connected)
+    if settings.MAILCOW_CACHE_ENABLED and mailcow_service.is_configured:
+        mailcow_service.cache.start()
+
+    # Listen for principal changes (auth lookups bypass the cache until connected)
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal_cache.start()
+        print(f"Principal cache: {settings.PRINCIPAL_CACHE_TTL:.0f}s TTL")
+
     yield
 
     # Shutdown
     print("Shutting down...")
+    await principal_cache.stop()
+    await job_worker.stop()
+    await scheduled_action_runner.stop()
+    await mail_queue_worker.stop()
+    await partition_maintenance_worker.stop()
+    await quota_sync_worker.stop()
+    await sending_limit_engine.stop()
+    # After the workers, so the events they logged are flushed too
+    await log_sink.stop()
     await mailcow_service.close()
+    await email_service.close()
+    shutdown_password_hasher()
     await engine.dispose()
 
 
@@ -59,6 +127,25 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Attribute SQL statements to requests (opt-in)
+if settings.QUERY_MONITOR_ENABLED:
+    query_monitor.install()
+    app.add_middleware(QueryMonitorMiddleware)
+
+# Outermost, so latency covers CORS handling too
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(PasswordHashQueueFull)
+async def password_hash_queue_full_handler(request: Request, exc: PasswordHashQueueFull):
+    """Shed load when the password hashing pool is saturated."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy. Please try again shortly."},
+        headers={"Retry-After": "1"},
+    )
+
 
 # Health check endpoint
 @app.get("/health")
@@ -67,6 +154,17 @@ async def health_check():
     return {"status": "healthy", "version": settings.APP_VERSION}
 
 
+# Prometheus scrape endpoint
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        """Metrics for all workers in Prometheus text format."""
+        if settings.METRICS_TOKEN:
+            if request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}":
+                raise HTTPException(status_code=401, detail="Not authenticated")
+        return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
 # Include routers
 # API routes (for user endpoints)
 app.include_router(api_router, prefix="/api")
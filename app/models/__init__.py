@@ -1,6 +1,6 @@
 from app.models.user import User
 from app.models.admin import AdminUser, AdminRole
-from app.models.mailbox import MailboxMetadata
+from app.models.mailbox import MailboxMetadata, MailboxSyncState
 from app.models.audit import AuditLog, LoginActivity
 from app.models.support import SupportTicket, Announcement
 from app.models.alias import EmailAlias
@@ -9,14 +9,17 @@ from app.models.group import UserGroup, UserGroupMember
 from app.models.template import UserTemplate
 from app.models.scheduled import ScheduledAction, BulkImportLog
 from app.models.sending import SendingTier, EmailSendingLimit, EmailSendLog, SendingLimitViolation
-from app.models.signup import SignupAttempt, PasswordReset
+from app.models.signup import SignupAttempt, PasswordReset, RateLimitCounter
 from app.models.settings import SystemSettings
+from app.models.mail_queue import OutboundEmail
+from app.models.job import BulkJob
 
 __all__ = [
     "User",
     "AdminUser",
     "AdminRole",
     "MailboxMetadata",
+    "MailboxSyncState",
     "AuditLog",
     "LoginActivity",
     "SupportTicket",
@@ -35,5 +38,8 @@ __all__ = [
     "SendingLimitViolation",
     "SignupAttempt",
     "PasswordReset",
+    "RateLimitCounter",
     "SystemSettings",
+    "OutboundEmail",
+    "BulkJob",
 ]
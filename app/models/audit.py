@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 import uuid
@@ -22,13 +22,45 @@ class AuditLog(Base):
         return f"<AuditLog {self.action_type} by {self.admin_email}>"
 
 
+def _simple_tsvector(document):
+    return func.to_tsvector(text("'simple'::regconfig"), document)
+
+
+# Full-text document for audit search: action, target and the string values
+# in details. Queries must use this exact expression to hit its GIN index, so
+# constants are inlined rather than bound.
+AUDIT_LOG_SEARCH_VECTOR = _simple_tsvector(
+    func.coalesce(AuditLog.action_type, text("''"))
+    + text("' '")
+    + func.coalesce(AuditLog.target_user_email, text("''"))
+).op("||")(
+    _simple_tsvector(func.coalesce(AuditLog.details, text("'{}'::jsonb")))
+)
+
+Index("idx_audit_logs_timestamp_id", AuditLog.timestamp, AuditLog.id)
+Index(
+    "idx_audit_logs_details", AuditLog.details,
+    postgresql_using="gin", postgresql_ops={"details": "jsonb_path_ops"},
+)
+Index("idx_audit_logs_search", AUDIT_LOG_SEARCH_VECTOR, postgresql_using="gin")
+
+
 class LoginActivity(Base):
-    """User login tracking and security."""
+    """
+    User login tracking and security.
+
+    Partitioned by month on login_time (see app.services.partitions), so the
+    partition key is part of the primary key; filter on login_time to let
+    queries skip old partitions.
+    """
     __tablename__ = "login_activity"
+    __table_args__ = {"postgresql_partition_by": "RANGE (login_time)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_email = Column(String, nullable=False, index=True)
-    login_time = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    login_time = Column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now(), index=True
+    )
     ip_address = Column(String, nullable=True)
     user_agent = Column(Text, nullable=True)
     success = Column(Boolean, nullable=False, index=True)
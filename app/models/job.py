@@ -0,0 +1,48 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text, Boolean, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func, text
+import uuid
+
+from app.db.session import Base
+
+
+class BulkJob(Base):
+    """Background bulk operation, run by app.services.jobs."""
+    __tablename__ = "bulk_jobs"
+    __table_args__ = (
+        # Claim scans: queued jobs in order, and running ones whose lease expired
+        Index(
+            "idx_bulk_jobs_due", "created_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+        Index(
+            "idx_bulk_jobs_lease", "lease_expires_at",
+            postgresql_where=text("status = 'running'")
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_type = Column(String, nullable=False, index=True)  # e.g. users.suspend, users.import
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, running, completed, partial, failed, cancelled
+    cancel_requested = Column(Boolean, nullable=False, default=False)  # running job stops at its next chunk boundary
+    params = Column(JSONB, default={})  # {"items": [...], ...handler options}
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    next_index = Column(Integer, nullable=False, default=0)  # first item not yet committed
+    errors = Column(JSONB, default=[])  # capped at JOBS_MAX_ERRORS entries
+    summary = Column(JSONB, default={})  # handler-specific counters
+    admin_email = Column(String, nullable=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("admin_users.id", ondelete="SET NULL"), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    locked_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<BulkJob {self.job_type} - {self.status}>"
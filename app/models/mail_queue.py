@@ -0,0 +1,43 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func, text
+import uuid
+
+from app.db.session import Base
+
+
+class OutboundEmail(Base):
+    """Durable outbound mail queue, drained by app.services.mail_queue."""
+    __tablename__ = "outbound_emails"
+    __table_args__ = (
+        # Claim scan: due pending jobs in order
+        Index(
+            "idx_outbound_emails_due", "next_attempt_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+        # Lease reaper: jobs stuck in sending
+        Index(
+            "idx_outbound_emails_sending_locked_at", "locked_at",
+            postgresql_where=text("status = 'sending'")
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False, default="generic")  # otp, welcome, announcement, generic
+    to_email = Column(String, nullable=False)
+    recipient_domain = Column(String, nullable=False, index=True)
+    subject = Column(String, nullable=False)
+    body_text = Column(Text, nullable=False)
+    body_html = Column(Text, nullable=True)
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, sending, sent, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=6)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<OutboundEmail {self.kind} to {self.to_email} - {self.status}>"
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import uuid
 
 from app.db.session import Base
@@ -9,6 +9,10 @@ from app.db.session import Base
 class MailboxMetadata(Base):
     """Cached mailbox quota information from Mailcow."""
     __tablename__ = "mailbox_metadata"
+    __table_args__ = (
+        # Top-N by usage for storage stats
+        Index("idx_mailbox_metadata_usage_bytes", text("usage_bytes DESC NULLS LAST")),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
@@ -26,3 +30,15 @@ class MailboxMetadata(Base):
         if self.quota_bytes == 0:
             return 0.0
         return (self.usage_bytes / self.quota_bytes) * 100
+
+
+class MailboxSyncState(Base):
+    """When each domain's mailboxes were last read from Mailcow."""
+    __tablename__ = "mailbox_sync_state"
+
+    domain = Column(String, primary_key=True)
+    # The sync only rewrites changed mailbox rows; this confirms the rest
+    synced_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<MailboxSyncState {self.domain}>"
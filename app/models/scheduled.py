@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import uuid
 
 from app.db.session import Base
@@ -9,18 +9,37 @@ from app.db.session import Base
 class ScheduledAction(Base):
     """Automated task queue."""
     __tablename__ = "scheduled_actions"
+    __table_args__ = (
+        # Runner claim scans: due pending actions, and running ones whose lease expired
+        Index(
+            "idx_scheduled_actions_due", "scheduled_for",
+            postgresql_where=text("status = 'pending'")
+        ),
+        Index(
+            "idx_scheduled_actions_lease", "lease_expires_at",
+            postgresql_where=text("status = 'running'")
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     action_type = Column(String, nullable=False, index=True)
     target_type = Column(String, nullable=False)
     target_ids = Column(JSONB, default=[])
     scheduled_for = Column(DateTime(timezone=True), nullable=False, index=True)
-    status = Column(String, default="pending", index=True)  # pending, completed, failed, cancelled
+    status = Column(String, default="pending", index=True)  # pending, running, completed, partial, failed, cancelled
     action_data = Column(JSONB, default={})
     created_by = Column(UUID(as_uuid=True), ForeignKey("admin_users.id"), nullable=True)
     executed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Execution state (see app.services.scheduler)
+    results = Column(JSONB, default={})  # target id -> {"status": ..., "error"/"warning": ...}
+    attempts = Column(Integer, default=0)
+    locked_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+
     def __repr__(self):
         return f"<ScheduledAction {self.action_type} - {self.status}>"
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, BigInteger
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -38,3 +38,18 @@ class PasswordReset(Base):
 
     def __repr__(self):
         return f"<PasswordReset {self.email}>"
+
+
+class RateLimitCounter(Base):
+    """Shared sliding-window counters, used by app.services.rate_limit."""
+    __tablename__ = "rate_limit_counters"
+    # Counters are disposable; skip WAL for them
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key = Column(Text, primary_key=True)
+    window_start = Column(BigInteger, primary_key=True)  # epoch seconds
+    count = Column(Integer, nullable=False, default=0)
+    expires_at = Column(BigInteger, nullable=False, index=True)  # epoch seconds
+
+    def __repr__(self):
+        return f"<RateLimitCounter {self.key}@{self.window_start}>"
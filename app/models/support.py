@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import uuid
 
 from app.db.session import Base
@@ -9,6 +9,13 @@ from app.db.session import Base
 class SupportTicket(Base):
     """User support request management."""
     __tablename__ = "support_tickets"
+    __table_args__ = (
+        # Pending-ticket queue and dashboard count
+        Index(
+            "idx_support_tickets_pending_created_at", "created_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     ticket_type = Column(String, nullable=False)  # password_reset, account_unlock, quota_increase, general
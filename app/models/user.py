@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, Date, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Date, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import uuid
 
 from app.db.session import Base
@@ -9,6 +9,15 @@ from app.db.session import Base
 class User(Base):
     """Extended user information table."""
     __tablename__ = "users_extended"
+    __table_args__ = (
+        # Keyset pagination for the admin user list
+        Index("idx_users_extended_created_at_id", "created_at", "id"),
+        # Login-recency buckets for activity stats; never-logged-in users excluded
+        Index(
+            "idx_users_extended_last_login", "last_login",
+            postgresql_where=text("last_login IS NOT NULL")
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
@@ -68,3 +77,8 @@ class User(Base):
 
     def __repr__(self):
         return f"<User {self.email}>"
+
+
+# Short prefix searches (lower(email) LIKE 'jo%'), which trigram indexes can't
+# serve; C collation lets one btree answer both the LIKE and the ORDER BY
+Index("idx_users_extended_email_lower_c", func.lower(User.email).collate("C"))
@@ -63,6 +63,7 @@ class MailboxInfoResponse(BaseModel):
     quota_bytes: int
     usage_bytes: int
     quota_used_percentage: float
+    last_synced: Optional[datetime] = None
 
     class Config:
         from_attributes = True
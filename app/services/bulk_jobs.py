@@ -0,0 +1,374 @@
+"""
+Bulk job handlers.
+
+Each handler processes one chunk of a job queued by the bulk admin endpoints
+(see app.services.jobs for the execution model). Handlers stage their changes
+and audit logs on the session they are given; the worker commits them
+together with the job's progress.
+"""
+
+import uuid
+from typing import Any, Dict, List
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.security import ahash_passwords
+from app.models.group import UserGroupMember
+from app.models.job import BulkJob
+from app.models.mailbox import MailboxMetadata
+from app.models.scheduled import BulkImportLog
+from app.models.user import User
+from app.services.encryption import encryption_service
+from app.services.jobs import ChunkOutcome, job_handler
+from app.services.log_sink import log_sink
+from app.services.mailcow import mailcow_service
+
+USERS_SUSPEND = "users.suspend"
+USERS_UNSUSPEND = "users.unsuspend"
+USERS_DELETE = "users.delete"
+USERS_QUOTA = "users.quota"
+USERS_IMPORT = "users.import"
+MAILBOXES_ACTIVATE = "mailboxes.activate"
+MAILBOXES_DEACTIVATE = "mailboxes.deactivate"
+MAILBOXES_DELETE = "mailboxes.delete"
+GROUPS_ADD_MEMBERS = "groups.add_members"
+
+
+def _parse_ids(items: List[str], outcome: ChunkOutcome) -> List[uuid.UUID]:
+    ids = []
+    for item in items:
+        try:
+            ids.append(uuid.UUID(str(item)))
+        except ValueError:
+            outcome.fail(item, "Invalid user id")
+    return ids
+
+
+async def _load_users(db, items: List[str], outcome: ChunkOutcome) -> List[User]:
+    """Load the chunk's users by id, failing ids that do not exist."""
+    ids = _parse_ids(items, outcome)
+    if not ids:
+        return []
+    result = await db.execute(select(User).where(User.id.in_(ids)))
+    users = result.scalars().all()
+    found = {u.id for u in users}
+    for user_id in ids:
+        if user_id not in found:
+            outcome.fail(str(user_id), "User not found")
+    return users
+
+
+def _details(job: Dict[str, Any], **extra) -> Dict[str, Any]:
+    return {"bulk_action": True, "job_id": str(job["id"]), **extra}
+
+
+# ==================== User Bulk Actions ====================
+
+async def _set_suspended(db, job: Dict[str, Any], items: List[str], suspended: bool) -> ChunkOutcome:
+    outcome = ChunkOutcome()
+    users = await _load_users(db, items, outcome)
+
+    # Mailcow first; the local change goes ahead even where Mailcow fails
+    if mailcow_service.is_configured and users:
+        emails = [u.email for u in users]
+        if suspended:
+            report = await mailcow_service.bulk_deactivate_mailboxes(emails)
+        else:
+            report = await mailcow_service.bulk_activate_mailboxes(emails)
+        for failure in report.failed:
+            outcome.warn(failure.item, f"Mailcow: {failure.error}")
+        outcome.count("mailcow_failed", len(report.failed))
+
+    for user in users:
+        user.is_suspended = suspended
+        log_sink.audit(
+            db,
+            action_type="user_suspended" if suspended else "user_unsuspended",
+            admin_email=job["admin_email"],
+            target_user_email=user.email,
+            details=_details(job)
+        )
+    outcome.succeeded = len(users)
+    return outcome
+
+
+@job_handler(USERS_SUSPEND)
+async def suspend_users(db, job: Dict[str, Any], items: List[str]) -> ChunkOutcome:
+    return await _set_suspended(db, job, items, True)
+
+
+@job_handler(USERS_UNSUSPEND)
+async def unsuspend_users(db, job: Dict[str, Any], items: List[str]) -> ChunkOutcome:
+    return await _set_suspended(db, job, items, False)
+
+
+@job_handler(USERS_DELETE)
+async def delete_users(db, job: Dict[str, Any], items: List[str]) -> ChunkOutcome:
+    outcome = ChunkOutcome()
+    users = await _load_users(db, items, outcome)
+
+    for user in users:
+        log_sink.audit(
+            db,
+            action_type="user_deleted",
+            admin_email=job["admin_email"],
+            target_user_email=user.email,
+            details=_details(job, user_id=str(user.id))
+        )
+        await db.delete(user)
+    outcome.succeeded = len(users)
+    return outcome
+
+
+@job_handler(USERS_QUOTA)
+async def update_users_quota(db, job: Dict[str, Any], items: List[str]) -> ChunkOutcome:
+    outcome = ChunkOutcome()
+    users = await _load_users(db, items, outcome)
+    quota_bytes = job["params"]["quota_bytes"]
+    quota_gb = quota_bytes / 1073741824
+
+    if mailcow_service.is_configured and users:
+        report = await mailcow_service.bulk_update_mailbox_quota([u.email for u in users], quota_bytes)
+        for failure in report.failed:
+            outcome.warn(failure.item, f"Mailcow: {failure.error}")
+        outcome.count("mailcow_failed", len(report.failed))
+
+    mailbox_result = await db.execute(
+        select(MailboxMetadata).where(MailboxMetadata.email.in_([u.email for u in users]))
+    )
+    mailboxes = {m.email: m for m in mailbox_result.scalars().all()}
+
+    for user in users:
+        mailbox = mailboxes.get(user.email)
+        if not mailbox:
+            db.add(MailboxMetadata(
+                email=user.email,
+                user_id=user.id,
+                quota_bytes=quota_bytes,
+                usage_bytes=0
+            ))
+        else:
+            mailbox.quota_bytes = quota_bytes
+
+        log_sink.audit(
+            db,
+            action_type="quota_updated",
+            admin_email=job["admin_email"],
+            target_user_email=user.email,
+            details=_details(job, quota_gb=quota_gb)
+        )
+    outcome.succeeded = len(users)
+    return outcome
+
+
+# ==================== CSV Import ====================
+
+DEFAULT_IMPORT_PASSWORD = "changeme123"
+DEFAULT_IMPORT_QUOTA = 5368709120  # 5GB
+
+
+def _describe_row(row: Dict[str, Any]) -> str:
+    return (row.get("email") or "N/A") if isinstance(row, dict) else "N/A"
+
+
+async def _log_import(db, job: Dict[str, Any], status: str):
+    result = await db.get(BulkJob, job["id"])
+    db.add(BulkImportLog(
+        filename=job["params"].get("filename") or "import.csv",
+        total_rows=result.total,
+        successful_imports=result.succeeded,
+        failed_imports=result.failed,
+        error_details=result.errors or [],
+        imported_by=job["created_by"]
+    ))
+    log_sink.audit(
+        db,
+        action_type="users_imported",
+        admin_email=job["admin_email"],
+        details={
+            "filename": job["params"].get("filename"),
+            "successful": result.succeeded,
+            "failed": result.failed,
+            "job_id": str(job["id"]),
+            "status": status
+        }
+    )
+
+
+@job_handler(USERS_IMPORT, describe=_describe_row, sensitive=True, on_finish=_log_import)
+async def import_users(db, job: Dict[str, Any], rows: List[Dict[str, Any]]) -> ChunkOutcome:
+    outcome = ChunkOutcome()
+
+    # Validate and drop duplicates within the chunk
+    valid: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        email = (row.get("email") or "").strip()
+        if not email:
+            outcome.fail("N/A", "Email is required")
+            continue
+        if email in valid:
+            outcome.fail(email, "Duplicate email in import")
+            continue
+        try:
+            quota_bytes = int(row.get("quota_bytes") or DEFAULT_IMPORT_QUOTA)
+        except (TypeError, ValueError):
+            outcome.fail(email, "Invalid quota_bytes")
+            continue
+        name = (row.get("name") or "").strip()
+        name_parts = name.split(" ", 1) if name else ["User", ""]
+        valid[email] = {
+            "email": email,
+            "first_name": name_parts[0] or "User",
+            "last_name": name_parts[1] if len(name_parts) > 1 else "",
+            "password": encryption_service.decrypt_if_needed(row.get("password")) or None,
+            "quota_bytes": quota_bytes,
+        }
+
+    # One existence check for the whole chunk
+    if valid:
+        existing_result = await db.execute(select(User.email).where(User.email.in_(list(valid))))
+        for email in existing_result.scalars().all():
+            outcome.fail(email, "User already exists")
+            del valid[email]
+
+    if not valid:
+        return outcome
+
+    # bcrypt dominates the import: hash in the bulk process pool, and only
+    # once per chunk for rows using the default password
+    explicit = [r for r in valid.values() if r["password"]]
+    hashes = await ahash_passwords([r["password"] for r in explicit])
+    for r, password_hash in zip(explicit, hashes):
+        r["password_hash"] = password_hash
+    if len(explicit) < len(valid):
+        default_hash = (await ahash_passwords([DEFAULT_IMPORT_PASSWORD]))[0]
+        for r in valid.values():
+            r.setdefault("password_hash", default_hash)
+
+    # Multi-row inserts; a concurrent signup for the same email loses nothing
+    inserted = await db.execute(
+        pg_insert(User)
+        .values([
+            {
+                "id": uuid.uuid4(),
+                "email": r["email"],
+                "first_name": r["first_name"],
+                "last_name": r["last_name"],
+                "password_hash": r["password_hash"],
+                "is_suspended": False,
+                "failed_login_attempts": 0,
+            }
+            for r in valid.values()
+        ])
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id, User.email)
+    )
+    created = {email: user_id for user_id, email in inserted.all()}
+    for email in valid:
+        if email not in created:
+            outcome.fail(email, "User already exists")
+
+    if created:
+        stmt = pg_insert(MailboxMetadata).values([
+            {
+                "id": uuid.uuid4(),
+                "email": email,
+                "user_id": user_id,
+                "quota_bytes": valid[email]["quota_bytes"],
+                "usage_bytes": 0,
+            }
+            for email, user_id in created.items()
+        ])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[MailboxMetadata.email],
+            set_={"user_id": stmt.excluded.user_id, "quota_bytes": stmt.excluded.quota_bytes}
+        ))
+
+    # Provision only the users this chunk created, after inserting them. If
+    # the chunk is rolled back or resumed elsewhere, the retry finds those
+    # mailboxes already in Mailcow and exists_ok counts them as provisioned.
+    if created and job["params"].get("provision_mailcow") and mailcow_service.is_configured:
+        report = await mailcow_service.bulk_create_mailboxes([
+            {
+                "email": email,
+                "password": valid[email]["password"] or DEFAULT_IMPORT_PASSWORD,
+                "name": f"{valid[email]['first_name']} {valid[email]['last_name']}".strip(),
+                "quota": valid[email]["quota_bytes"],
+            }
+            for email in created
+        ], exists_ok=True)
+        for failure in report.failed:
+            outcome.warn(failure.item, f"User created but Mailcow provisioning failed: {failure.error}")
+        outcome.count("mailboxes_provisioned", len(report.succeeded))
+        if report.failed:
+            outcome.count("mailbox_provisioning_failed", len(report.failed))
+
+    outcome.succeeded = len(created)
+    return outcome
+
+
+# ==================== Mailcow Mailbox Actions ====================
+
+async def _mailbox_action(job: Dict[str, Any], items: List[str], call) -> ChunkOutcome:
+    outcome = ChunkOutcome()
+    report = await call(items)
+    for failure in report.failed:
+        outcome.fail(failure.item, failure.error)
+    outcome.succeeded = len(report.succeeded)
+    return outcome
+
+
+@job_handler(MAILBOXES_ACTIVATE)
+async def activate_mailboxes(db, job: Dict[str, Any], items: List[str]) -> ChunkOutcome:
+    return await _mailbox_action(job, items, mailcow_service.bulk_activate_mailboxes)
+
+
+@job_handler(MAILBOXES_DEACTIVATE)
+async def deactivate_mailboxes(db, job: Dict[str, Any], items: List[str]) -> ChunkOutcome:
+    return await _mailbox_action(job, items, mailcow_service.bulk_deactivate_mailboxes)
+
+
+@job_handler(MAILBOXES_DELETE)
+async def delete_mailboxes(db, job: Dict[str, Any], items: List[str]) -> ChunkOutcome:
+    outcome = ChunkOutcome()
+    report = await mailcow_service.bulk_delete_mailboxes(items)
+    for failure in report.failed:
+        outcome.fail(failure.item, failure.error)
+    if report.succeeded:
+        # Delete local metadata for the mailboxes Mailcow removed
+        await db.execute(
+            delete(MailboxMetadata).where(MailboxMetadata.email.in_(report.succeeded))
+        )
+    outcome.succeeded = len(report.succeeded)
+    return outcome
+
+
+# ==================== Groups ====================
+
+@job_handler(GROUPS_ADD_MEMBERS)
+async def add_group_members(db, job: Dict[str, Any], items: List[str]) -> ChunkOutcome:
+    outcome = ChunkOutcome()
+    group_id = uuid.UUID(job["params"]["group_id"])
+    users = await _load_users(db, items, outcome)
+
+    existing_result = await db.execute(
+        select(UserGroupMember.user_id).where(
+            UserGroupMember.group_id == group_id,
+            UserGroupMember.user_id.in_([u.id for u in users])
+        )
+    )
+    existing = set(existing_result.scalars().all())
+
+    for user in users:
+        if user.id in existing:
+            outcome.count("already_member")
+            continue
+        db.add(UserGroupMember(
+            user_id=user.id,
+            group_id=group_id,
+            added_by=job["created_by"]
+        ))
+        outcome.count("added")
+    outcome.succeeded = len(users)
+    return outcome
@@ -1,23 +1,183 @@
 """
 Email sending service for OTP and notifications.
 Uses SMTP to send emails.
+
+Messages go out over a small pool of authenticated aiosmtplib connections
+that are reused across sends, so a send costs one MAIL/RCPT/DATA exchange
+instead of a full TCP + TLS + AUTH handshake, and never blocks the event loop.
 """
 
-import smtplib
+import asyncio
 import ssl
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 
+import aiosmtplib
+
 from app.core.config import settings
+from app.core.metrics import SMTP_SEND_DURATION
 
 logger = logging.getLogger(__name__)
 
+# Errors after which a pooled connection can't be trusted any more
+_CONNECTION_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    OSError,
+)
+
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of reusable, authenticated SMTP connections.
+
+    At most `size` connections exist at once. Idle connections are checked
+    with NOOP before reuse once they have been idle for `healthcheck_after`
+    seconds, closed after `idle_timeout` seconds, and recycled after
+    `max_messages` sends; any connection that errors is discarded and a
+    fresh one is opened.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        start_tls: bool = False,
+        size: int = 4,
+        timeout: float = 15.0,
+        idle_timeout: float = 60.0,
+        healthcheck_after: float = 5.0,
+        max_messages: int = 100,
+        tls_context: Optional[ssl.SSLContext] = None
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.healthcheck_after = healthcheck_after
+        self.max_messages = max_messages
+        self.tls_context = tls_context
+
+        self._slots = asyncio.Semaphore(size)
+        # (connection, last_used, messages_sent); reused LIFO so warm ones stay warm
+        self._idle: List[Tuple[aiosmtplib.SMTP, float, int]] = []
+        self.connections_opened = 0
+        self.messages_sent = 0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username or None,
+            password=self.password or None,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+            tls_context=self.tls_context,
+        )
+        await client.connect()
+        self.connections_opened += 1
+        return client
+
+    async def _close(self, client: aiosmtplib.SMTP, graceful: bool = True):
+        try:
+            if graceful and client.is_connected:
+                await client.quit()
+            else:
+                client.close()
+        except Exception:
+            client.close()
+
+    async def _checkout(self) -> Tuple[aiosmtplib.SMTP, int, bool]:
+        """Return (connection, messages_sent, reused) from the idle list or a new one."""
+        now = time.monotonic()
+        while self._idle:
+            client, last_used, sent = self._idle.pop()
+            idle_for = now - last_used
+            if not client.is_connected or idle_for > self.idle_timeout:
+                await self._close(client, graceful=client.is_connected)
+                continue
+            if idle_for > self.healthcheck_after:
+                try:
+                    await client.noop()
+                except Exception:
+                    await self._close(client, graceful=False)
+                    continue
+            return client, sent, True
+        return await self._connect(), 0, False
+
+    def _checkin(self, client: aiosmtplib.SMTP, sent: int):
+        self._idle.append((client, time.monotonic(), sent))
+
+    async def send(self, sender: str, recipients: List[str], message: str):
+        """
+        Send a raw message, retrying once on a fresh connection if a reused
+        one turns out to be dead.
+        """
+        async with self._slots:
+            for attempt in range(2):
+                client, sent, reused = await self._checkout()
+                try:
+                    await client.sendmail(sender, recipients, message)
+                except _CONNECTION_ERRORS:
+                    await self._close(client, graceful=False)
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except aiosmtplib.SMTPException:
+                    # Rejections (bad recipient, etc.) leave the session usable
+                    await self._reset_or_close(client, sent)
+                    raise
+
+                self.messages_sent += 1
+                sent += 1
+                if sent >= self.max_messages:
+                    await self._close(client)
+                else:
+                    self._checkin(client, sent)
+                return
+
+    async def _reset_or_close(self, client: aiosmtplib.SMTP, sent: int):
+        try:
+            await client.rset()
+            self._checkin(client, sent)
+        except Exception:
+            await self._close(client, graceful=False)
+
+    async def close(self):
+        """Close all idle connections."""
+        idle, self._idle = self._idle, []
+        for client, _, _ in idle:
+            await self._close(client)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "messages_sent": self.messages_sent,
+        }
+
 
 class EmailService:
     """Service for sending emails via SMTP."""
 
+    def __init__(self):
+        self._pool: Optional[SMTPConnectionPool] = None
+
     @property
     def is_configured(self) -> bool:
         """Check if email service is properly configured."""
@@ -28,6 +188,79 @@ class EmailService:
             settings.SMTP_FROM_EMAIL
         )
 
+    def _get_pool(self) -> SMTPConnectionPool:
+        """Get or create the SMTP connection pool."""
+        if self._pool is None:
+            # SMTP_USE_TLS selects STARTTLS; otherwise connect with implicit TLS
+            self._pool = SMTPConnectionPool(
+                hostname=settings.SMTP_HOST,
+                port=settings.SMTP_PORT,
+                username=settings.SMTP_USER,
+                password=settings.SMTP_PASSWORD,
+                use_tls=not settings.SMTP_USE_TLS,
+                start_tls=settings.SMTP_USE_TLS,
+                size=settings.SMTP_POOL_SIZE,
+                timeout=settings.SMTP_TIMEOUT,
+                idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT,
+                healthcheck_after=settings.SMTP_POOL_HEALTHCHECK_AFTER,
+                max_messages=settings.SMTP_POOL_MAX_MESSAGES,
+                tls_context=ssl.create_default_context(),
+            )
+        return self._pool
+
+    async def close(self):
+        """Close pooled SMTP connections."""
+        if self._pool is not None:
+            await self._pool.close()
+
+    def build_message(
+        self,
+        to_email: str,
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None
+    ) -> MIMEMultipart:
+        """Build a multipart/alternative message from the configured sender."""
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_FROM_EMAIL}>"
+        message["To"] = to_email
+
+        # Add plain text part
+        message.attach(MIMEText(body_text, "plain"))
+
+        # Add HTML part if provided
+        if body_html:
+            message.attach(MIMEText(body_html, "html"))
+
+        return message
+
+    async def deliver(
+        self,
+        to_email: str,
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None
+    ):
+        """Send one message over the pool, raising aiosmtplib errors on failure."""
+        message = self.build_message(to_email, subject, body_text, body_html)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            await self._get_pool().send(
+                settings.SMTP_FROM_EMAIL,
+                [to_email],
+                message.as_string()
+            )
+            outcome = "sent"
+        except _CONNECTION_ERRORS:
+            raise
+        except aiosmtplib.SMTPException:
+            outcome = "rejected"
+            raise
+        finally:
+            SMTP_SEND_DURATION.labels(outcome).observe(time.perf_counter() - started)
+
     async def send_email(
         self,
         to_email: str,
@@ -52,52 +285,15 @@ class EmailService:
             return False
 
         try:
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_FROM_EMAIL}>"
-            message["To"] = to_email
-
-            # Add plain text part
-            part1 = MIMEText(body_text, "plain")
-            message.attach(part1)
-
-            # Add HTML part if provided
-            if body_html:
-                part2 = MIMEText(body_html, "html")
-                message.attach(part2)
-
-            # Create SSL context
-            context = ssl.create_default_context()
-
-            # Send email
-            if settings.SMTP_USE_TLS:
-                with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-                    server.ehlo()
-                    server.starttls(context=context)
-                    server.ehlo()
-                    server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                    server.sendmail(
-                        settings.SMTP_FROM_EMAIL,
-                        to_email,
-                        message.as_string()
-                    )
-            else:
-                with smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, context=context) as server:
-                    server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                    server.sendmail(
-                        settings.SMTP_FROM_EMAIL,
-                        to_email,
-                        message.as_string()
-                    )
+            await self.deliver(to_email, subject, body_text, body_html)
 
             logger.info(f"Email sent successfully to {to_email}")
             return True
 
-        except smtplib.SMTPAuthenticationError as e:
+        except aiosmtplib.SMTPAuthenticationError as e:
             logger.error(f"SMTP authentication failed: {e}")
             return False
-        except smtplib.SMTPException as e:
+        except aiosmtplib.SMTPException as e:
             logger.error(f"SMTP error sending email to {to_email}: {e}")
             return False
         except Exception as e:
@@ -116,6 +312,11 @@ class EmailService:
         Returns:
             True if email was sent successfully
         """
+        subject, body_text, body_html = self.render_otp_email(otp_code, user_name)
+        return await self.send_email(to_email, subject, body_text, body_html)
+
+    def render_otp_email(self, otp_code: str, user_name: str = "") -> Tuple[str, str, str]:
+        """Render the password reset OTP email as (subject, text, html)."""
         greeting = f"Hi {user_name}," if user_name else "Hi,"
 
         subject = "Your Afrimail Password Reset Code"
@@ -185,7 +386,7 @@ The Afrimail Team
 </html>
 """
 
-        return await self.send_email(to_email, subject, body_text, body_html)
+        return subject, body_text, body_html
 
     async def send_welcome_email(self, to_email: str, user_name: str) -> bool:
         """
@@ -198,6 +399,11 @@ The Afrimail Team
         Returns:
             True if email was sent successfully
         """
+        subject, body_text, body_html = self.render_welcome_email(user_name)
+        return await self.send_email(to_email, subject, body_text, body_html)
+
+    def render_welcome_email(self, user_name: str) -> Tuple[str, str, str]:
+        """Render the welcome email as (subject, text, html)."""
         subject = "Welcome to Afrimail!"
 
         body_text = f"""
@@ -254,7 +460,7 @@ The Afrimail Team
 </html>
 """
 
-        return await self.send_email(to_email, subject, body_text, body_html)
+        return subject, body_text, body_html
 
 
 # Global service instance
@@ -0,0 +1,463 @@
+"""
+Background bulk jobs.
+
+Bulk admin endpoints call enqueue_job() and return the job id straight away;
+every app worker runs a JobWorker (started from app.main.lifespan) that claims
+queued rows from bulk_jobs with FOR UPDATE SKIP LOCKED and works through
+their items.
+
+- Work is described by a handler registered with @job_handler. The worker
+  feeds it params["items"] one chunk at a time; each chunk's changes and the
+  job's progress counters commit in one transaction, fenced on locked_by.
+- A heartbeat extends the lease while the job runs. If the worker dies,
+  another worker resumes from next_index once the lease expires, so committed
+  chunks are never applied twice.
+- Cancelling a queued job flips its status. Cancelling a running job sets
+  cancel_requested: the owner commits the chunk in flight (whose Mailcow
+  calls have already been made), stops at the next chunk boundary and
+  finishes the job as cancelled, running on_finish like any other finish.
+- Progress (processed/failed counts, throughput and ETA) is read from the row,
+  so GET /admin/jobs/{id} and its SSE stream work from any worker.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.models.admin import AdminUser
+from app.models.job import BulkJob
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "partial", "failed", "cancelled")
+
+CLAIM_SQL = text("""
+    WITH due AS (
+        SELECT id
+        FROM bulk_jobs
+        WHERE status = 'pending'
+           OR (status = 'running' AND lease_expires_at < now())
+        ORDER BY created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE bulk_jobs j
+    SET status = 'running',
+        locked_by = :worker,
+        lease_expires_at = now() + make_interval(secs => :lease),
+        attempts = j.attempts + 1,
+        started_at = coalesce(j.started_at, now()),
+        updated_at = now()
+    FROM due
+    WHERE j.id = due.id
+    RETURNING j.id, j.job_type, j.params, j.total, j.next_index, j.attempts,
+              j.admin_email, j.created_by, j.cancel_requested,
+              jsonb_array_length(coalesce(j.errors, '[]'::jsonb)) AS error_count,
+              coalesce(j.summary, '{}'::jsonb) AS summary
+""")
+
+HEARTBEAT_SQL = text("""
+    UPDATE bulk_jobs
+    SET lease_expires_at = now() + make_interval(secs => :lease)
+    WHERE id = :id AND locked_by = :worker AND status = 'running'
+""")
+
+CHECKPOINT_SQL = text("""
+    UPDATE bulk_jobs
+    SET next_index = :next_index,
+        processed = processed + :processed,
+        succeeded = succeeded + :succeeded,
+        failed = failed + :failed,
+        errors = coalesce(errors, '[]'::jsonb) || CAST(:errors AS jsonb),
+        summary = CAST(:summary AS jsonb),
+        lease_expires_at = now() + make_interval(secs => :lease),
+        updated_at = now()
+    WHERE id = :id AND locked_by = :worker AND status = 'running'
+    RETURNING cancel_requested
+""")
+
+FINISH_SQL = text("""
+    UPDATE bulk_jobs
+    SET status = :status,
+        error = :error,
+        params = CASE WHEN :scrub THEN params - 'items' ELSE params END,
+        finished_at = now(),
+        updated_at = now(),
+        locked_by = NULL,
+        lease_expires_at = NULL
+    WHERE id = :id AND locked_by = :worker AND status = 'running'
+""")
+
+PURGE_FINISHED_SQL = text("""
+    DELETE FROM bulk_jobs
+    WHERE status IN ('completed', 'partial', 'failed', 'cancelled')
+      AND finished_at < now() - make_interval(days => :days)
+""")
+
+
+@dataclass
+class ChunkOutcome:
+    """What a handler did with one chunk of items."""
+    succeeded: int = 0
+    failures: List[Dict[str, Any]] = field(default_factory=list)  # {"item": ..., "error": ...}
+    warnings: List[Dict[str, Any]] = field(default_factory=list)  # applied, with a caveat
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def fail(self, item: Any, error: str):
+        self.failures.append({"item": item, "error": error})
+
+    def warn(self, item: Any, warning: str):
+        self.warnings.append({"item": item, "warning": warning})
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+
+ChunkRunner = Callable[[AsyncSession, Dict[str, Any], List[Any]], Awaitable[ChunkOutcome]]
+FinishHook = Callable[[AsyncSession, Dict[str, Any], str], Awaitable[None]]
+
+
+@dataclass
+class JobHandler:
+    job_type: str
+    run_chunk: ChunkRunner
+    chunk_size: int
+    describe: Callable[[Any], Any] = str
+    sensitive: bool = False  # drop params["items"] once the job finishes
+    on_finish: Optional[FinishHook] = None
+
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(
+    job_type: str,
+    chunk_size: Optional[int] = None,
+    describe: Callable[[Any], Any] = str,
+    sensitive: bool = False,
+    on_finish: Optional[FinishHook] = None
+):
+    """
+    Register a chunk runner for a job type.
+
+    The runner gets (db, job, items) and must not commit; the worker commits
+    its changes together with the job's progress. `job` carries id, params,
+    admin_email and created_by.
+    """
+    def decorator(func: ChunkRunner) -> ChunkRunner:
+        JOB_HANDLERS[job_type] = JobHandler(
+            job_type=job_type,
+            run_chunk=func,
+            chunk_size=chunk_size or settings.JOBS_CHUNK_SIZE,
+            describe=describe,
+            sensitive=sensitive,
+            on_finish=on_finish,
+        )
+        return func
+    return decorator
+
+
+def enqueue_job(
+    db: AsyncSession,
+    job_type: str,
+    items: List[Any],
+    admin: AdminUser,
+    params: Optional[Dict[str, Any]] = None
+) -> BulkJob:
+    """
+    Queue a bulk job in the caller's transaction.
+
+    The job becomes visible to workers when the caller commits; call
+    job_worker.wake() afterwards to skip the poll delay.
+    """
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+    job = BulkJob(
+        job_type=job_type,
+        status="pending",
+        params={**(params or {}), "items": items},
+        total=len(items),
+        admin_email=admin.email,
+        created_by=admin.id,
+    )
+    db.add(job)
+    return job
+
+
+def job_progress(job: BulkJob) -> Dict[str, Any]:
+    """Serialize a job with its throughput (items/s) and ETA (seconds)."""
+    throughput = None
+    eta_seconds = None
+    if job.started_at:
+        end = job.finished_at or datetime.now(timezone.utc)
+        elapsed = (end - job.started_at).total_seconds()
+        if elapsed > 0 and job.processed:
+            throughput = round(job.processed / elapsed, 2)
+            if job.status == "running":
+                eta_seconds = round((job.total - job.processed) / throughput, 1)
+
+    return {
+        "id": str(job.id),
+        "job_type": job.job_type,
+        "status": job.status,
+        "cancel_requested": job.cancel_requested,
+        "total": job.total,
+        "processed": job.processed,
+        "succeeded": job.succeeded,
+        "failed": job.failed,
+        "percent": round(job.processed / job.total * 100, 1) if job.total else 100.0,
+        "throughput": throughput,
+        "eta_seconds": eta_seconds,
+        "summary": job.summary or {},
+        "error": job.error,
+        "attempts": job.attempts,
+        "admin_email": job.admin_email,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class JobLeaseLost(Exception):
+    """The job was taken over; stop without writing anything."""
+
+
+class JobWorker:
+    """Claims queued bulk jobs and runs them chunk by chunk."""
+
+    def __init__(self, concurrency: int, poll_interval: float, lease_timeout: float, max_attempts: int):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._last_maintenance = 0.0
+
+    def start(self):
+        """Start the dispatch loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="bulk-jobs")
+
+    async def stop(self):
+        """Stop claiming and abandon running jobs; they resume elsewhere after their lease."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._in_flight):
+            task.cancel()
+        if self._in_flight:
+            await asyncio.wait(self._in_flight)
+
+    def wake(self):
+        """Claim immediately instead of waiting for the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ==================== Dispatch Loop ====================
+
+    async def _run(self):
+        while True:
+            claimed = None
+            try:
+                await self._maintenance()
+                if len(self._in_flight) < self.concurrency:
+                    claimed = await self._claim()
+                    if claimed:
+                        task = asyncio.create_task(self._process(claimed))
+                        self._in_flight.add(task)
+                        task.add_done_callback(self._in_flight.discard)
+                        task.add_done_callback(lambda _: self.wake())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Bulk job dispatch failed: {e}")
+
+            if claimed and len(self._in_flight) < self.concurrency:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        async with engine.begin() as conn:
+            result = await conn.execute(CLAIM_SQL, {
+                "worker": self.worker_id,
+                "lease": self.lease_timeout,
+            })
+            row = result.mappings().first()
+        return dict(row) if row else None
+
+    async def _finish(self, job: Dict[str, Any], status: str, error: Optional[str] = None):
+        handler = JOB_HANDLERS.get(job["job_type"])
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(FINISH_SQL, {
+                "id": job["id"],
+                "worker": self.worker_id,
+                "status": status,
+                "error": error[:1000] if error else None,
+                "scrub": bool(handler and handler.sensitive),
+            })
+            if result.rowcount and handler and handler.on_finish:
+                await handler.on_finish(db, job, status)
+            await db.commit()
+
+    async def _process(self, job: Dict[str, Any]):
+        job_id = job["id"]
+
+        if job["cancel_requested"]:
+            # Cancelled while its previous owner was running it
+            await self._finish(job, "cancelled", "Cancelled by an admin")
+            return
+
+        if job["attempts"] > self.max_attempts:
+            logger.error(f"Bulk job {job_id} abandoned after {job['attempts'] - 1} attempts")
+            await self._finish(job, "failed", f"Gave up after {job['attempts'] - 1} interrupted attempts")
+            return
+
+        handler = JOB_HANDLERS.get(job["job_type"])
+        if handler is None:
+            await self._finish(job, "failed", f"Unknown job type: {job['job_type']}")
+            return
+
+        lease_lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, lease_lost))
+        try:
+            cancelled = await self._run_chunks(job, handler, lease_lost)
+        except JobLeaseLost:
+            logger.warning(f"Bulk job {job_id} was taken over; stopping")
+            return
+        except Exception as e:
+            # Lease expiry resumes the job from its last checkpoint
+            logger.error(f"Bulk job {job_id} interrupted: {e}")
+            return
+        finally:
+            heartbeat.cancel()
+            try:
+                await heartbeat
+            except asyncio.CancelledError:
+                pass
+
+        async with AsyncSessionLocal() as db:
+            row = await db.get(BulkJob, job_id)
+            succeeded, failed, processed = row.succeeded, row.failed, row.processed
+        if cancelled:
+            await self._finish(
+                job, "cancelled", f"Cancelled by an admin after {processed} of {job['total']} items"
+            )
+            logger.info(f"Bulk job {job_id} ({job['job_type']}) cancelled after {processed} items")
+            return
+        if failed == 0:
+            status = "completed"
+        elif succeeded == 0:
+            status = "failed"
+        else:
+            status = "partial"
+        await self._finish(job, status, f"{failed} of {job['total']} items failed" if failed else None)
+        logger.info(f"Bulk job {job_id} ({job['job_type']}) {status}: {succeeded} succeeded, {failed} failed")
+
+    async def _heartbeat(self, job_id, lease_lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.lease_timeout / 3)
+            try:
+                async with engine.begin() as conn:
+                    result = await conn.execute(HEARTBEAT_SQL, {
+                        "id": job_id,
+                        "worker": self.worker_id,
+                        "lease": self.lease_timeout,
+                    })
+                if result.rowcount == 0:
+                    lease_lost.set()
+                    return
+            except Exception as e:
+                logger.warning(f"Bulk job {job_id} heartbeat failed: {e}")
+
+    async def _run_chunks(self, job: Dict[str, Any], handler: JobHandler, lease_lost: asyncio.Event) -> bool:
+        """Work through the remaining chunks; return True if stopped by a cancel request."""
+        items = (job["params"] or {}).get("items") or []
+        summary: Dict[str, int] = dict(job["summary"])
+        error_count = job["error_count"]
+
+        for start in range(job["next_index"], len(items), handler.chunk_size):
+            if lease_lost.is_set():
+                raise JobLeaseLost()
+            chunk = items[start:start + handler.chunk_size]
+
+            async with AsyncSessionLocal() as db:
+                try:
+                    outcome = await handler.run_chunk(db, job, chunk)
+                except Exception as e:
+                    # A broken chunk fails its items rather than stalling the job
+                    await db.rollback()
+                    logger.error(f"Bulk job {job['id']} chunk at {start} failed: {e}")
+                    outcome = ChunkOutcome()
+                    for item in chunk:
+                        outcome.fail(handler.describe(item), str(e)[:500])
+
+                for name, n in outcome.counters.items():
+                    summary[name] = summary.get(name, 0) + n
+                room = max(0, settings.JOBS_MAX_ERRORS - error_count)
+                entries = (outcome.failures + outcome.warnings)[:room]
+                error_count += len(entries)
+
+                result = await db.execute(CHECKPOINT_SQL, {
+                    "id": job["id"],
+                    "worker": self.worker_id,
+                    "lease": self.lease_timeout,
+                    "next_index": start + len(chunk),
+                    "processed": len(chunk),
+                    "succeeded": outcome.succeeded,
+                    "failed": len(outcome.failures),
+                    "errors": json.dumps(entries, default=str),
+                    "summary": json.dumps(summary),
+                })
+                checkpoint = result.first()
+                if checkpoint is None:
+                    await db.rollback()
+                    raise JobLeaseLost()
+                await db.commit()
+
+            # A cancel that arrives during the last chunk changes nothing
+            if checkpoint.cancel_requested and start + len(chunk) < len(items):
+                return True
+        return False
+
+    async def _maintenance(self):
+        """Purge old finished jobs, at most once an hour."""
+        now = time.monotonic()
+        if now - self._last_maintenance < 3600:
+            return
+        self._last_maintenance = now
+        async with engine.begin() as conn:
+            await conn.execute(PURGE_FINISHED_SQL, {"days": settings.JOBS_RETENTION_DAYS})
+
+
+# Global worker instance
+job_worker = JobWorker(
+    concurrency=settings.JOBS_CONCURRENCY,
+    poll_interval=settings.JOBS_POLL_INTERVAL,
+    lease_timeout=settings.JOBS_LEASE_TIMEOUT,
+    max_attempts=settings.JOBS_MAX_ATTEMPTS,
+)
@@ -0,0 +1,274 @@
+"""
+Buffered writer for audit, login activity and signup attempt rows.
+
+Routes hand events to the global log_sink instead of adding rows to their
+own session. While the sink is running (started from app.main.lifespan)
+events are buffered in memory and a background task writes them with
+multi-row INSERTs every LOG_SINK_FLUSH_INTERVAL seconds, or as soon as
+LOG_SINK_BATCH_SIZE events are waiting. lifespan flushes what is left on
+shutdown.
+
+Audit events record a change made in the caller's session, so they are held
+on that session and only buffered once it commits. Login and signup attempts
+are recorded whatever the request goes on to do.
+
+Events are written synchronously instead when:
+
+- they are security-critical audit actions (CRITICAL_AUDIT_ACTIONS, or
+  critical=True): the row is added to the caller's session and commits
+  atomically with the change it records
+- the sink is not running, or its buffer (LOG_SINK_MAX_BUFFER events) is
+  full: audit rows are added to the caller's session, other rows are
+  inserted straight away in their own transaction
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.audit import AuditLog, LoginActivity
+from app.models.signup import SignupAttempt
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "log_sink_pending"
+
+# Audit actions that must never be lost or written apart from their change
+CRITICAL_AUDIT_ACTIONS = frozenset({
+    "admin_created",
+    "password_reset_by_admin",
+    "user_deleted",
+    "user_unlocked",
+})
+
+
+class LogSink:
+    """In-process buffer flushing log rows in batches."""
+
+    def __init__(self, batch_size: int, flush_interval: float, max_buffer: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: Deque[Tuple[Table, Dict[str, Any]]] = deque()
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.written_through = 0
+        self.dropped = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start buffering and the background flush loop."""
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run(), name="log-sink")
+
+    async def stop(self):
+        """Stop buffering and write everything still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Log sink final flush failed: {e}")
+        if self._buffer:
+            self.dropped += len(self._buffer)
+            logger.error(f"Log sink lost {len(self._buffer)} buffered events at shutdown")
+            self._buffer.clear()
+
+    # ==================== Events ====================
+
+    def audit(
+        self,
+        db: AsyncSession,
+        action_type: str,
+        admin_email: str,
+        target_user_email: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        critical: Optional[bool] = None,
+    ):
+        """
+        Record an admin action taken in db's transaction.
+
+        The row is only buffered once db commits (and discarded on rollback);
+        critical actions, or any action while the sink can't buffer it, are
+        added to db and written by that commit.
+        """
+        row = {
+            "id": uuid.uuid4(),
+            "action_type": action_type,
+            "admin_email": admin_email,
+            "target_user_email": target_user_email,
+            "details": details,
+            "ip_address": ip_address,
+            "timestamp": datetime.now(timezone.utc),
+        }
+        if critical is None:
+            critical = action_type in CRITICAL_AUDIT_ACTIONS
+        if critical or not self._has_room():
+            db.add(AuditLog(**row))
+        else:
+            db.info.setdefault(_PENDING_KEY, []).append((AuditLog.__table__, row))
+
+    async def login_activity(
+        self,
+        user_email: str,
+        success: bool,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        failure_reason: Optional[str] = None,
+    ):
+        """Record a login attempt."""
+        now = datetime.now(timezone.utc)
+        await self._record(LoginActivity.__table__, {
+            "id": uuid.uuid4(),
+            "user_email": user_email,
+            "login_time": now,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "success": success,
+            "failure_reason": failure_reason,
+            "created_at": now,
+        })
+
+    async def signup_attempt(
+        self,
+        ip_address: str,
+        email_attempted: str,
+        success: bool = False,
+        failure_reason: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        hcaptcha_verified: bool = False,
+        honeypot_filled: bool = False,
+    ):
+        """Record a signup attempt."""
+        await self._record(SignupAttempt.__table__, {
+            "id": uuid.uuid4(),
+            "ip_address": ip_address,
+            "email_attempted": email_attempted,
+            "hcaptcha_verified": hcaptcha_verified,
+            "honeypot_filled": honeypot_filled,
+            "success": success,
+            "failure_reason": failure_reason,
+            "user_agent": user_agent,
+            "created_at": datetime.now(timezone.utc),
+        })
+
+    def _has_room(self) -> bool:
+        return self.is_running and len(self._buffer) < self.max_buffer
+
+    def _enqueue(self, table: Table, row: Dict[str, Any]):
+        self._buffer.append((table, row))
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def _record(self, table: Table, row: Dict[str, Any]):
+        """Buffer an event that belongs to no transaction."""
+        if self._has_room():
+            self._enqueue(table, row)
+            return
+
+        # Not buffering (or overloaded): write through rather than lose it
+        self.written_through += 1
+        async with engine.begin() as conn:
+            await conn.execute(insert(table), [row])
+
+    # ==================== Flushing ====================
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Log sink flush failed: {e}")
+
+    async def flush(self):
+        """Write buffered events in batches of up to batch_size."""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                try:
+                    await self._write(batch)
+                except BaseException:
+                    self._requeue(batch)
+                    raise
+                self.written += len(batch)
+
+    async def _write(self, batch: List[Tuple[Table, Dict[str, Any]]]):
+        rows_by_table: Dict[Table, List[Dict[str, Any]]] = {}
+        for table, row in batch:
+            rows_by_table.setdefault(table, []).append(row)
+
+        # One transaction; executemany renders multi-row VALUES per table
+        async with engine.begin() as conn:
+            for table, rows in rows_by_table.items():
+                await conn.execute(insert(table), rows)
+
+    def _requeue(self, batch: List[Tuple[Table, Dict[str, Any]]]):
+        """Put a failed batch back at the front, dropping what no longer fits."""
+        room = max(self.max_buffer - len(self._buffer), 0)
+        if len(batch) > room:
+            lost = len(batch) - room
+            self.dropped += lost
+            logger.error(f"Log sink buffer full; dropped {lost} events")
+            batch = batch[:room]
+        self._buffer.extendleft(reversed(batch))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.LOG_SINK_ENABLED,
+            "running": self.is_running,
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "written_through": self.written_through,
+            "dropped": self.dropped,
+        }
+
+
+# Global sink instance
+log_sink = LogSink(
+    batch_size=settings.LOG_SINK_BATCH_SIZE,
+    flush_interval=settings.LOG_SINK_FLUSH_INTERVAL,
+    max_buffer=settings.LOG_SINK_MAX_BUFFER,
+)
+
+
+# ==================== Session Events ====================
+
+@event.listens_for(Session, "after_commit")
+def _buffer_committed_audits(session: Session):
+    for table, row in session.info.pop(_PENDING_KEY, ()):
+        log_sink._enqueue(table, row)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_audits(session: Session, transaction):
+    # Still pending once the outermost transaction ends: it was rolled back
+    # or the session was closed without committing
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,381 @@
+"""
+Durable outbound mail queue.
+
+Request handlers call enqueue_email() inside their own transaction and return
+immediately; every app worker runs a MailQueueWorker (started from
+app.main.lifespan) that claims due rows from outbound_emails with
+FOR UPDATE SKIP LOCKED, so workers never contend for the same job.
+
+- Failed sends are retried with exponential backoff and jitter; permanent
+  SMTP rejections (5xx) and jobs out of attempts are dead-lettered.
+- A process sends to at most MAIL_QUEUE_DOMAIN_CONCURRENCY recipients of one
+  domain at a time: each claim skips domains already at that cap and takes
+  no more than each domain's remaining slots, so one slow or throttling
+  destination cannot occupy every sender.
+- Jobs whose worker died mid-send are returned to the queue once their lease
+  (MAIL_QUEUE_LEASE_TIMEOUT) expires.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import statistics
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional, Set
+
+import aiosmtplib
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.mail_queue import OutboundEmail
+from app.services.email import email_service
+
+logger = logging.getLogger(__name__)
+
+CLAIM_SQL = text("""
+    WITH due AS (
+        SELECT id, recipient_domain, next_attempt_at
+        FROM outbound_emails
+        WHERE status = 'pending'
+          AND next_attempt_at <= now()
+          AND recipient_domain <> ALL(CAST(:saturated AS text[]))
+        ORDER BY next_attempt_at
+        LIMIT :scan
+        FOR UPDATE SKIP LOCKED
+    ),
+    busy AS (
+        SELECT *
+        FROM unnest(CAST(:busy_domains AS text[]), CAST(:busy_remaining AS integer[]))
+            AS b(domain, remaining)
+    ),
+    picked AS (
+        SELECT id
+        FROM (
+            SELECT due.id, due.next_attempt_at,
+                   row_number() OVER (PARTITION BY due.recipient_domain ORDER BY due.next_attempt_at) AS rn,
+                   coalesce(busy.remaining, :per_domain) AS remaining
+            FROM due
+            LEFT JOIN busy ON busy.domain = due.recipient_domain
+        ) ranked
+        WHERE rn <= remaining
+        ORDER BY next_attempt_at
+        LIMIT :limit
+    )
+    UPDATE outbound_emails o
+    SET status = 'sending',
+        attempts = o.attempts + 1,
+        locked_by = :worker,
+        locked_at = now()
+    FROM picked
+    WHERE o.id = picked.id
+    RETURNING o.id, o.kind, o.to_email, o.recipient_domain, o.subject, o.body_text,
+              o.body_html, o.attempts, o.max_attempts, o.created_at
+""")
+
+MARK_SENT_SQL = text("""
+    UPDATE outbound_emails
+    SET status = 'sent', sent_at = now(), last_error = NULL, locked_by = NULL, locked_at = NULL
+    WHERE id = :id
+""")
+
+MARK_RETRY_SQL = text("""
+    UPDATE outbound_emails
+    SET status = 'pending',
+        next_attempt_at = now() + make_interval(secs => :delay),
+        last_error = :error,
+        locked_by = NULL,
+        locked_at = NULL
+    WHERE id = :id
+""")
+
+MARK_DEAD_SQL = text("""
+    UPDATE outbound_emails
+    SET status = 'dead', last_error = :error, locked_by = NULL, locked_at = NULL
+    WHERE id = :id
+""")
+
+REAP_EXPIRED_LEASES_SQL = text("""
+    UPDATE outbound_emails
+    SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'pending' END,
+        last_error = coalesce(last_error, 'lease expired'),
+        locked_by = NULL,
+        locked_at = NULL
+    WHERE status = 'sending'
+      AND locked_at < now() - make_interval(secs => :lease)
+""")
+
+PURGE_SENT_SQL = text("""
+    DELETE FROM outbound_emails
+    WHERE status = 'sent'
+      AND sent_at < now() - make_interval(days => :days)
+""")
+
+QUEUE_DEPTH_SQL = text("""
+    SELECT
+        count(*) FILTER (WHERE status = 'pending') AS pending,
+        count(*) FILTER (WHERE status = 'pending' AND next_attempt_at <= now()) AS due,
+        count(*) FILTER (WHERE status = 'sending') AS sending,
+        count(*) FILTER (WHERE status = 'dead') AS dead,
+        extract(epoch FROM now() - min(created_at) FILTER (WHERE status = 'pending')) AS oldest_pending_seconds
+    FROM outbound_emails
+    WHERE status <> 'sent'
+""")
+
+
+def enqueue_email(
+    db: AsyncSession,
+    to_email: str,
+    subject: str,
+    body_text: str,
+    body_html: Optional[str] = None,
+    kind: str = "generic",
+    max_attempts: Optional[int] = None
+) -> OutboundEmail:
+    """
+    Add an email to the outbound queue in the caller's transaction.
+
+    The job becomes visible to workers when the caller commits; call
+    mail_queue_worker.wake() afterwards to skip the poll delay.
+    """
+    job = OutboundEmail(
+        kind=kind,
+        to_email=to_email,
+        recipient_domain=to_email.rsplit("@", 1)[-1].lower(),
+        subject=subject,
+        body_text=body_text,
+        body_html=body_html,
+        max_attempts=max_attempts or settings.MAIL_QUEUE_MAX_ATTEMPTS,
+    )
+    db.add(job)
+    return job
+
+
+def _is_permanent_failure(error: Exception) -> bool:
+    """5xx replies mean retrying the same message will not help."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= r.code < 600 for r in error.recipients)
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return 500 <= error.code < 600
+    return False
+
+
+def _retry_delay(attempts: int) -> float:
+    """Exponential backoff with +/-20% jitter, capped at MAIL_QUEUE_RETRY_MAX."""
+    delay = min(settings.MAIL_QUEUE_RETRY_BASE * (2 ** (attempts - 1)), settings.MAIL_QUEUE_RETRY_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _percentile(values, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    if len(values) == 1:
+        return round(values[0], 3)
+    return round(statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1], 3)
+
+
+class MailQueueWorker:
+    """Claims and delivers queued emails with bounded concurrency."""
+
+    def __init__(self, concurrency: int, domain_concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.domain_concurrency = domain_concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._domain_active: Dict[str, int] = {}
+        self._last_maintenance = 0.0
+
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        self._send_seconds: Deque[float] = deque(maxlen=1000)
+        self._queue_seconds: Deque[float] = deque(maxlen=1000)
+
+    def start(self):
+        """Start the dispatch loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="mail-queue")
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop claiming and give in-flight sends a chance to finish."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._in_flight:
+            # Anything still running is released by the lease reaper later
+            await asyncio.wait(self._in_flight, timeout=timeout)
+            for task in list(self._in_flight):
+                task.cancel()
+
+    def wake(self):
+        """Claim immediately instead of waiting for the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ==================== Dispatch Loop ====================
+
+    async def _run(self):
+        while True:
+            claimed = 0
+            try:
+                await self._maintenance()
+                free = self.concurrency - len(self._in_flight)
+                if free > 0:
+                    claimed = await self._claim_and_dispatch(free)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Mail queue dispatch failed: {e}")
+
+            # Keep claiming while there is work and capacity; otherwise wait
+            if claimed and len(self._in_flight) < self.concurrency:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim_and_dispatch(self, limit: int) -> int:
+        # Slots left per domain this process is already sending to
+        remaining = {
+            domain: self.domain_concurrency - active
+            for domain, active in self._domain_active.items()
+        }
+        saturated = [domain for domain, slots in remaining.items() if slots <= 0]
+        busy = {domain: slots for domain, slots in remaining.items() if slots > 0}
+        async with engine.begin() as conn:
+            result = await conn.execute(CLAIM_SQL, {
+                "saturated": saturated,
+                "busy_domains": list(busy),
+                "busy_remaining": list(busy.values()),
+                "scan": limit * 4,
+                "per_domain": self.domain_concurrency,
+                "limit": limit,
+                "worker": self.worker_id,
+            })
+            jobs = result.mappings().all()
+
+        for job in jobs:
+            domain = job["recipient_domain"]
+            self._domain_active[domain] = self._domain_active.get(domain, 0) + 1
+            task = asyncio.create_task(self._deliver(dict(job)))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+        return len(jobs)
+
+    async def _deliver(self, job: Dict[str, Any]):
+        domain = job["recipient_domain"]
+        start = time.perf_counter()
+        try:
+            try:
+                await email_service.deliver(job["to_email"], job["subject"], job["body_text"], job["body_html"])
+            except Exception as e:
+                await self._record_failure(job, e)
+                return
+
+            async with engine.begin() as conn:
+                await conn.execute(MARK_SENT_SQL, {"id": job["id"]})
+            self.sent += 1
+            self._send_seconds.append(time.perf_counter() - start)
+            if job["created_at"] is not None:
+                self._queue_seconds.append(
+                    (datetime.now(timezone.utc) - job["created_at"]).total_seconds()
+                )
+        except Exception as e:
+            # Job stays in 'sending' and is retried once its lease expires
+            logger.error(f"Mail queue could not record result for {job['id']}: {e}")
+        finally:
+            self._domain_active[domain] -= 1
+            if self._domain_active[domain] <= 0:
+                del self._domain_active[domain]
+            # A domain slot opened up
+            self.wake()
+
+    async def _record_failure(self, job: Dict[str, Any], error: Exception):
+        message = f"{type(error).__name__}: {error}"[:1000]
+        async with engine.begin() as conn:
+            if _is_permanent_failure(error) or job["attempts"] >= job["max_attempts"]:
+                await conn.execute(MARK_DEAD_SQL, {"id": job["id"], "error": message})
+                self.dead += 1
+                logger.error(
+                    f"Dead-lettered {job['kind']} email to {job['to_email']} "
+                    f"after {job['attempts']} attempts: {message}"
+                )
+            else:
+                delay = _retry_delay(job["attempts"])
+                await conn.execute(MARK_RETRY_SQL, {"id": job["id"], "delay": delay, "error": message})
+                self.retried += 1
+                logger.warning(
+                    f"Email to {job['to_email']} failed (attempt {job['attempts']}/{job['max_attempts']}), "
+                    f"retrying in {delay:.0f}s: {message}"
+                )
+
+    async def _maintenance(self):
+        """Release expired leases and purge old sent rows, at most once a minute."""
+        now = time.monotonic()
+        if now - self._last_maintenance < 60:
+            return
+        self._last_maintenance = now
+        async with engine.begin() as conn:
+            reaped = await conn.execute(REAP_EXPIRED_LEASES_SQL, {"lease": settings.MAIL_QUEUE_LEASE_TIMEOUT})
+            await conn.execute(PURGE_SENT_SQL, {"days": settings.MAIL_QUEUE_RETENTION_DAYS})
+        if reaped.rowcount:
+            logger.warning(f"Mail queue: released {reaped.rowcount} jobs with expired leases")
+
+    # ==================== Observability ====================
+
+    def metrics(self) -> Dict[str, Any]:
+        """In-process delivery counters and latency percentiles (seconds)."""
+        send = list(self._send_seconds)
+        queued = list(self._queue_seconds)
+        return {
+            "worker_id": self.worker_id,
+            "running": self._task is not None and not self._task.done(),
+            "in_flight": len(self._in_flight),
+            "concurrency": self.concurrency,
+            "domain_concurrency": self.domain_concurrency,
+            "active_domains": dict(self._domain_active),
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead_lettered": self.dead,
+            "send_latency_p50": _percentile(send, 50),
+            "send_latency_p95": _percentile(send, 95),
+            "queue_latency_p50": _percentile(queued, 50),
+            "queue_latency_p95": _percentile(queued, 95),
+        }
+
+
+async def queue_depth(db: AsyncSession) -> Dict[str, Any]:
+    """Current queue depth by status and age of the oldest pending job."""
+    row = (await db.execute(QUEUE_DEPTH_SQL)).mappings().one()
+    oldest = row["oldest_pending_seconds"]
+    return {
+        "pending": row["pending"],
+        "due": row["due"],
+        "sending": row["sending"],
+        "dead": row["dead"],
+        "oldest_pending_seconds": round(float(oldest), 1) if oldest is not None else None,
+    }
+
+
+# Global worker instance
+mail_queue_worker = MailQueueWorker(
+    concurrency=settings.MAIL_QUEUE_CONCURRENCY,
+    domain_concurrency=settings.MAIL_QUEUE_DOMAIN_CONCURRENCY,
+    poll_interval=settings.MAIL_QUEUE_POLL_INTERVAL,
+)
@@ -0,0 +1,190 @@
+"""
+Bulk Mailcow -> mailbox_metadata sync.
+
+Mailboxes are written in batches, one INSERT ... ON CONFLICT (email) DO UPDATE
+statement per batch, with the batch passed as parallel arrays through
+unnest(). Rows whose quota and usage are unchanged are left untouched, so
+last_synced only moves when Mailcow reports a different value. Freshness is
+recorded once per domain instead, in mailbox_sync_state: a mailbox's numbers
+were current as of greatest(last_synced, its domain's synced_at).
+
+Used by POST /admin/mailcow/sync/mailboxes and scripts/sync_mailboxes.py.
+"""
+
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from dataclasses import dataclass, asdict
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.mailcow import MailboxInfo, mailcow_service
+
+logger = logging.getLogger(__name__)
+
+UPSERT_BATCH_SQL = text("""
+    WITH incoming AS (
+        SELECT *
+        FROM unnest(
+            CAST(:ids AS uuid[]),
+            CAST(:emails AS text[]),
+            CAST(:quotas AS bigint[]),
+            CAST(:usages AS bigint[])
+        ) AS t(id, email, quota_bytes, usage_bytes)
+    ),
+    upserted AS (
+        INSERT INTO mailbox_metadata (id, email, quota_bytes, usage_bytes, last_synced, last_sync)
+        SELECT id, email, quota_bytes, usage_bytes, now(), now()
+        FROM incoming
+        ON CONFLICT (email) DO UPDATE
+        SET quota_bytes = EXCLUDED.quota_bytes,
+            usage_bytes = EXCLUDED.usage_bytes,
+            last_synced = EXCLUDED.last_synced,
+            last_sync = EXCLUDED.last_sync
+        WHERE mailbox_metadata.quota_bytes IS DISTINCT FROM EXCLUDED.quota_bytes
+           OR mailbox_metadata.usage_bytes IS DISTINCT FROM EXCLUDED.usage_bytes
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT
+        count(*) FILTER (WHERE inserted) AS inserted,
+        count(*) FILTER (WHERE NOT inserted) AS updated
+    FROM upserted
+""")
+
+MARK_SYNCED_SQL = text("""
+    INSERT INTO mailbox_sync_state (domain, synced_at)
+    SELECT domain, :synced_at FROM unnest(CAST(:domains AS text[])) AS d(domain)
+    ON CONFLICT (domain) DO UPDATE SET synced_at = EXCLUDED.synced_at
+""")
+
+COUNT_ORPHANS_SQL = text("""
+    SELECT count(*)
+    FROM mailbox_metadata m
+    WHERE NOT EXISTS (
+        SELECT 1 FROM unnest(CAST(:emails AS text[])) AS seen(email)
+        WHERE seen.email = m.email
+    )
+""")
+
+COUNT_DOMAIN_ORPHANS_SQL = text("""
+    SELECT count(*)
+    FROM mailbox_metadata m
+    WHERE split_part(m.email, '@', 2) = :domain
+      AND NOT EXISTS (
+        SELECT 1 FROM unnest(CAST(:emails AS text[])) AS seen(email)
+        WHERE seen.email = m.email
+    )
+""")
+
+
+@dataclass
+class MailboxSyncResult:
+    """Counts reported by a sync run."""
+    total: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    orphaned: int = 0
+    batches: int = 0
+    duration_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _batches(mailboxes: Iterable[MailboxInfo], size: int) -> Iterator[List[MailboxInfo]]:
+    iterator = iter(mailboxes)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+async def upsert_mailbox_batch(db: AsyncSession, batch: List[MailboxInfo]) -> Dict[str, int]:
+    """Upsert one batch of mailboxes and return inserted/updated/unchanged counts."""
+    # ON CONFLICT cannot touch the same row twice in one statement
+    rows = {mb.email: mb for mb in batch}
+
+    result = await db.execute(UPSERT_BATCH_SQL, {
+        "ids": [uuid.uuid4() for _ in rows],
+        "emails": list(rows),
+        "quotas": [mb.quota for mb in rows.values()],
+        "usages": [mb.quota_used for mb in rows.values()],
+    })
+    inserted, updated = result.one()
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": len(rows) - inserted - updated,
+    }
+
+
+async def sync_mailboxes(
+    db: AsyncSession,
+    mailboxes: Iterable[MailboxInfo],
+    batch_size: Optional[int] = None,
+    domain: Optional[str] = None,
+    synced_at: Optional[datetime] = None
+) -> MailboxSyncResult:
+    """
+    Write mailboxes to mailbox_metadata in batches, committing after each one.
+
+    `domain` limits the orphan count to that domain; pass it when `mailboxes`
+    is a single domain's listing. Once every batch is written, the domain
+    (or every domain seen) is marked synced as of `synced_at`, which should
+    be when the listing was read (default: now).
+    """
+    batch_size = batch_size or settings.MAILBOX_SYNC_BATCH_SIZE
+    synced_at = synced_at or datetime.now(timezone.utc)
+    summary = MailboxSyncResult()
+    seen: set = set()
+    start = time.perf_counter()
+
+    for batch in _batches(mailboxes, batch_size):
+        counts = await upsert_mailbox_batch(db, batch)
+        await db.commit()
+
+        summary.batches += 1
+        summary.inserted += counts["inserted"]
+        summary.updated += counts["updated"]
+        summary.unchanged += counts["unchanged"]
+        seen.update(mb.email for mb in batch)
+
+    summary.total = len(seen)
+
+    domains = {domain} if domain else {email.rpartition("@")[2] for email in seen}
+    if domains:
+        await db.execute(MARK_SYNCED_SQL, {"domains": sorted(domains), "synced_at": synced_at})
+        await db.commit()
+
+    if domain:
+        result = await db.execute(COUNT_DOMAIN_ORPHANS_SQL, {"emails": list(seen), "domain": domain})
+    else:
+        result = await db.execute(COUNT_ORPHANS_SQL, {"emails": list(seen)})
+    summary.orphaned = result.scalar() or 0
+
+    summary.duration_seconds = round(time.perf_counter() - start, 3)
+    logger.info(
+        "Mailbox sync: %d mailboxes in %d batches (%d inserted, %d updated, "
+        "%d unchanged, %d orphaned) in %.2fs",
+        summary.total, summary.batches, summary.inserted, summary.updated,
+        summary.unchanged, summary.orphaned, summary.duration_seconds
+    )
+    return summary
+
+
+async def sync_mailboxes_from_mailcow(
+    db: AsyncSession,
+    batch_size: Optional[int] = None,
+    domain: Optional[str] = None
+) -> MailboxSyncResult:
+    """Fetch the current mailbox list from Mailcow (uncached) and sync it."""
+    read_at = datetime.now(timezone.utc)
+    mailboxes = await mailcow_service.get_mailboxes(domain, use_cache=False)
+    return await sync_mailboxes(db, mailboxes, batch_size=batch_size, domain=domain, synced_at=read_at)
@@ -6,15 +6,25 @@ Handles mailbox, domain, alias, and quota management operations.
 """
 
 import httpx
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Set, Tuple
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
+import asyncio
 import logging
+import random
+import time
+
+from sqlalchemy import text
 
 from app.core.config import settings
+from app.core.metrics import observe_mailcow_call
+from app.db.session import engine
 
 logger = logging.getLogger(__name__)
 
+CACHE_CHANNEL = "mailcow_cache"
+
 
 def _safe_int(value, default: int = 0) -> int:
     """Safely convert a value to int, handling strings and None."""
@@ -55,6 +65,360 @@ class MailcowNotFoundError(MailcowError):
     pass
 
 
+class MailcowCircuitOpenError(MailcowConnectionError):
+    """Raised without contacting Mailcow while the circuit breaker is open."""
+    pass
+
+
+def _raise_for_item_errors(result: Dict[str, Any]):
+    """
+    Raise if a multi-item response reports a failure.
+
+    Array responses carry one status object per item; besides "error",
+    Mailcow marks rejected items with type "danger".
+    """
+    for item in result.get("items", []) if isinstance(result, dict) else []:
+        if isinstance(item, dict) and item.get("type") in ("error", "danger"):
+            msg = item.get("msg", "Unknown error")
+            if isinstance(msg, list):
+                msg = " ".join(str(m) for m in msg)
+            raise MailcowValidationError(msg, response_data=result)
+
+
+def _item_outcomes(response_data: Any, emails: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Map a multi-item response's status objects back to the emails they name.
+
+    Returns {email: None on success, else the error message} for every
+    status object whose msg mentions one of emails; others are left out.
+    """
+    statuses = response_data.get("items", []) if isinstance(response_data, dict) else response_data
+    wanted = {email.lower(): email for email in emails}
+    outcomes: Dict[str, Optional[str]] = {}
+    for item in statuses if isinstance(statuses, list) else []:
+        if not isinstance(item, dict):
+            continue
+        msg = item.get("msg")
+        parts = [str(m) for m in msg] if isinstance(msg, list) else [str(msg or "")]
+        email = next((wanted[p.lower()] for p in parts if p.lower() in wanted), None)
+        if email is None:
+            continue
+        if item.get("type") in ("error", "danger"):
+            outcomes[email] = " ".join(parts)
+        else:
+            outcomes.setdefault(email, None)
+    return outcomes
+
+
+def _mailbox_payload(
+    local_part: str,
+    domain: str,
+    password: str,
+    name: str = "",
+    quota: int = 5368709120,
+    active: bool = True,
+    force_password_update: bool = False,
+    tls_enforce_in: bool = False,
+    tls_enforce_out: bool = False
+) -> Dict[str, Any]:
+    """Build an add/mailbox request body."""
+    return {
+        "local_part": local_part,
+        "domain": domain,
+        "name": name,
+        "password": password,
+        "password2": password,
+        "quota": quota // (1024 * 1024),  # Convert to MB
+        "active": "1" if active else "0",
+        "force_pw_update": "1" if force_password_update else "0",
+        "tls_enforce_in": "1" if tls_enforce_in else "0",
+        "tls_enforce_out": "1" if tls_enforce_out else "0",
+    }
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast. Once `reset_timeout` seconds have passed a single probe call is
+    let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Return whether a call may proceed, moving OPEN -> HALF_OPEN on timeout."""
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+
+        # Half-open: allow exactly one probe at a time
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self, error: str):
+        self.consecutive_failures += 1
+        self.last_error = error
+        self._probe_in_flight = False
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Let another probe through after one ended without an outcome (e.g. cancelled)."""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state for health reporting."""
+        retry_in = None
+        if self.state == CircuitState.OPEN and self.opened_at is not None:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout,
+            "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class ReadCache:
+    """
+    TTL + LRU cache for Mailcow reads with single-flight loading.
+
+    Keys are tuples whose first element names the resource ("mailboxes",
+    "mailbox", "domains", "aliases"). Concurrent misses for the same key share
+    one upstream call. invalidate() drops every entry of a resource and bumps
+    its generation, so a load that started before a write is not cached.
+
+    Each app worker has its own cache. invalidate() also publishes the
+    resources with pg_notify on the mailcow_cache channel, and every worker
+    LISTENs (started from app.main.lifespan) and drops them too, so other
+    workers stop serving pre-write listings as soon as the notification
+    arrives (typically milliseconds after the write). While the listener is
+    not connected the cache is bypassed rather than left to its TTLs.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Tuple, asyncio.Task] = {}
+        self._generations: Dict[str, int] = {}
+        self._listening = False
+        self._task: Optional[asyncio.Task] = None
+        self._publishing: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.MAILCOW_CACHE_ENABLED and self._listening
+
+    async def get_or_load(self, key: Tuple, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, loading it at most once concurrently."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, ttl, loader))
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+
+        # Shield so one cancelled caller does not cancel the shared load
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Tuple, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generations.get(key[0], 0)
+        try:
+            value = await loader()
+        finally:
+            if self._in_flight.get(key) is asyncio.current_task():
+                del self._in_flight[key]
+
+        if self._generations.get(key[0], 0) == generation:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *resources: str):
+        """Drop the given resources here and in every other worker."""
+        self._drop(resources)
+        if self._listening and resources:
+            task = asyncio.ensure_future(self._publish(resources))
+            self._publishing.add(task)
+            task.add_done_callback(self._publishing.discard)
+
+    def _drop(self, resources):
+        """Drop cached and in-flight entries for the given resources."""
+        for resource in resources:
+            self._generations[resource] = self._generations.get(resource, 0) + 1
+            for key in [k for k in self._entries if k[0] == resource]:
+                del self._entries[key]
+            for key in [k for k in self._in_flight if k[0] == resource]:
+                del self._in_flight[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._in_flight.clear()
+
+    # ==================== Cross-Worker Invalidation ====================
+
+    async def _publish(self, resources: Tuple[str, ...]):
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": CACHE_CHANNEL, "payload": ",".join(resources)},
+                )
+                await conn.commit()
+        except Exception as e:
+            logger.warning(f"Mailcow cache invalidation broadcast failed: {e}")
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        # Our own broadcasts come back too; dropping again is harmless
+        self._drop([resource for resource in payload.split(",") if resource])
+
+    def start(self):
+        """Start listening for invalidations (the cache is bypassed until connected)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen(), name="mailcow-cache-listener")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._listening = False
+        if self._publishing:
+            await asyncio.wait(self._publishing)
+        self.clear()
+
+    async def _listen(self):
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver = raw.driver_connection
+                    await driver.add_listener(CACHE_CHANNEL, self._on_notify)
+                    # Writes made elsewhere before we were listening were never announced to us
+                    self.clear()
+                    self._listening = True
+                    logger.info("Mailcow cache listening for invalidations")
+                    try:
+                        while True:
+                            await asyncio.sleep(10)
+                            await driver.execute("SELECT 1")
+                    finally:
+                        self._listening = False
+                        self.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Mailcow cache listener disconnected, bypassing cache: {e}")
+                await asyncio.sleep(5)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+@dataclass
+class BulkItemResult:
+    """Outcome of a bulk operation for one item."""
+    item: str
+    success: bool
+    error: Optional[str] = None
+
+
+@dataclass
+class BulkResult:
+    """Per-item report of a bulk Mailcow operation."""
+    operation: str
+    items: List[BulkItemResult]
+    requests: int = 0
+    duration_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> List[str]:
+        return [r.item for r in self.items if r.success]
+
+    @property
+    def failed(self) -> List[BulkItemResult]:
+        return [r for r in self.items if not r.success]
+
+    def error_for(self, item: str) -> Optional[str]:
+        for r in self.items:
+            if r.item == item:
+                return r.error
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "total": len(self.items),
+            "succeeded": len(self.succeeded),
+            "failed": len(self.failed),
+            "requests": self.requests,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "results": {
+                "success": self.succeeded,
+                "failed": [{"email": r.item, "error": r.error} for r in self.failed],
+            },
+        }
+
+
 @dataclass
 class MailboxInfo:
     """Mailbox information from Mailcow."""
@@ -140,6 +504,21 @@ class MailcowService:
         self.api_url = (api_url or settings.MAILCOW_API_URL).rstrip("/")
         self.api_key = api_key or settings.MAILCOW_API_KEY
         self._client: Optional[httpx.AsyncClient] = None
+        self.cache = ReadCache(max_entries=settings.MAILCOW_CACHE_MAX_ENTRIES)
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.MAILCOW_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.MAILCOW_BREAKER_RESET_TIMEOUT,
+        )
+        # Reads and writes get separate budgets: a listing should come back
+        # quickly, while add/edit/delete may legitimately take longer.
+        self._read_timeout = httpx.Timeout(
+            settings.MAILCOW_READ_TIMEOUT,
+            connect=settings.MAILCOW_CONNECT_TIMEOUT,
+        )
+        self._write_timeout = httpx.Timeout(
+            settings.MAILCOW_WRITE_TIMEOUT,
+            connect=settings.MAILCOW_CONNECT_TIMEOUT,
+        )
 
     @property
     def is_configured(self) -> bool:
@@ -147,14 +526,28 @@ class MailcowService:
         return bool(self.api_url and self.api_key)
 
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create the HTTP client."""
+        """Get or create the pooled HTTP client."""
         if self._client is None or self._client.is_closed:
+            http2 = settings.MAILCOW_HTTP2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("MAILCOW_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+                    http2 = False
+
             self._client = httpx.AsyncClient(
                 base_url=self.api_url,
                 headers={
                     "X-API-Key": self.api_key,
                 },
-                timeout=30.0,
+                timeout=self._read_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.MAILCOW_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.MAILCOW_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.MAILCOW_KEEPALIVE_EXPIRY,
+                ),
+                http2=http2,
                 verify=True  # SSL verification
             )
         return self._client
@@ -164,6 +557,19 @@ class MailcowService:
         if self._client and not self._client.is_closed:
             await self._client.aclose()
             self._client = None
+        await self.cache.stop()
+
+    async def _cached(
+        self,
+        key: Tuple,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]],
+        use_cache: bool = True
+    ) -> Any:
+        """Serve a read through the cache unless caching is disabled or bypassed."""
+        if not (use_cache and self.cache.enabled and ttl > 0):
+            return await loader()
+        return await self.cache.get_or_load(key, ttl, loader)
 
     async def _request(
         self,
@@ -172,34 +578,89 @@ class MailcowService:
         data: Optional[Dict] = None,
         params: Optional[Dict] = None
     ) -> Dict[str, Any]:
-        """Make an API request to Mailcow."""
+        """
+        Make an API request to Mailcow.
+
+        GET requests are retried with jittered exponential backoff on
+        connection errors, timeouts and 5xx responses. All requests go through
+        the circuit breaker, which fails fast while Mailcow is down.
+        """
         if not self.is_configured:
             raise MailcowConnectionError("Mailcow API is not configured")
 
+        method = method.upper()
+        attempts = 1 + (settings.MAILCOW_RETRIES if method == "GET" else 0)
+
+        for attempt in range(attempts):
+            if not self.breaker.allow_request():
+                raise MailcowCircuitOpenError(
+                    "Mailcow API is unavailable (circuit breaker open)"
+                )
+
+            started = time.perf_counter()
+            try:
+                result = await self._send(method, endpoint, data, params)
+            except MailcowConnectionError as e:
+                observe_mailcow_call(method, endpoint, started, "connection")
+                self.breaker.record_failure(e.message)
+                if attempt + 1 >= attempts:
+                    raise
+                delay = random.uniform(0, settings.MAILCOW_RETRY_BACKOFF * (2 ** attempt))
+                logger.info(f"Retrying Mailcow {method} {endpoint} in {delay:.2f}s: {e.message}")
+                await asyncio.sleep(delay)
+                continue
+            except MailcowError as e:
+                # Mailcow answered (auth/validation/not-found): it is up
+                observe_mailcow_call(method, endpoint, started, type(e).__name__)
+                self.breaker.record_success()
+                raise
+            except BaseException:
+                # Cancelled or failed for an unrelated reason: no verdict on
+                # Mailcow, but don't leave a half-open probe claimed forever
+                self.breaker.release_probe()
+                raise
+
+            observe_mailcow_call(method, endpoint, started)
+            self.breaker.record_success()
+            return result
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Perform a single Mailcow API call and parse the response."""
         client = await self._get_client()
         # Note: MAILCOW_API_URL in .env already includes /api/v1, so we just add the endpoint
         url = f"/{endpoint.lstrip('/')}"
+        timeout = self._read_timeout if method == "GET" else self._write_timeout
 
         try:
-            if method.upper() == "GET":
-                response = await client.get(url, params=params)
-            elif method.upper() == "POST":
+            if method == "GET":
+                response = await client.get(url, params=params, timeout=timeout)
+            elif method == "POST":
                 response = await client.post(
                     url,
                     json=data,
-                    headers={"Content-Type": "application/json"} if data else None
+                    headers={"Content-Type": "application/json"} if data else None,
+                    timeout=timeout
                 )
-            elif method.upper() == "PUT":
+            elif method == "PUT":
                 response = await client.put(
                     url,
                     json=data,
-                    headers={"Content-Type": "application/json"} if data else None
+                    headers={"Content-Type": "application/json"} if data else None,
+                    timeout=timeout
                 )
-            elif method.upper() == "DELETE":
-                response = await client.delete(
+            elif method == "DELETE":
+                response = await client.request(
+                    "DELETE",
                     url,
                     json=data,
-                    headers={"Content-Type": "application/json"} if data else None
+                    headers={"Content-Type": "application/json"} if data else None,
+                    timeout=timeout
                 )
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
@@ -214,6 +675,12 @@ class MailcowService:
             if response.status_code == 404:
                 raise MailcowNotFoundError(f"Resource not found: {endpoint}")
 
+            if response.status_code >= 500:
+                raise MailcowConnectionError(
+                    f"Mailcow server error: HTTP {response.status_code}",
+                    status_code=response.status_code
+                )
+
             # Parse response
             try:
                 result = response.json()
@@ -247,6 +714,8 @@ class MailcowService:
             raise MailcowConnectionError(f"Failed to connect to Mailcow: {e}")
         except httpx.TimeoutException as e:
             raise MailcowConnectionError(f"Mailcow request timed out: {e}")
+        except httpx.TransportError as e:
+            raise MailcowConnectionError(f"Mailcow transport error: {e}")
         except MailcowError:
             raise
         except Exception as e:
@@ -270,8 +739,14 @@ class MailcowService:
 
     # ==================== Domain Management ====================
 
-    async def get_domains(self) -> List[DomainInfo]:
-        """Get all domains from Mailcow."""
+    async def get_domains(self, use_cache: bool = True) -> List[DomainInfo]:
+        """Get all domains from Mailcow (cached for MAILCOW_CACHE_TTL_DOMAINS)."""
+        domains = await self._cached(
+            ("domains",), settings.MAILCOW_CACHE_TTL_DOMAINS, self._fetch_domains, use_cache
+        )
+        return list(domains)
+
+    async def _fetch_domains(self) -> List[DomainInfo]:
         result = await self._request("GET", "get/domain/all")
         domains = []
 
@@ -351,7 +826,9 @@ class MailcowService:
             "gal": "1",  # Global Address List
         }
 
-        return await self._request("POST", "add/domain", data=data)
+        result = await self._request("POST", "add/domain", data=data)
+        self.cache.invalidate("domains")
+        return result
 
     async def update_domain(
         self,
@@ -382,16 +859,29 @@ class MailcowService:
         if active is not None:
             data["attr"]["active"] = "1" if active else "0"
 
-        return await self._request("POST", "edit/domain", data=data)
+        result = await self._request("POST", "edit/domain", data=data)
+        self.cache.invalidate("domains")
+        return result
 
     async def delete_domain(self, domain: str) -> Dict[str, Any]:
         """Delete a domain from Mailcow."""
-        return await self._request("POST", "delete/domain", data=[domain])
+        result = await self._request("POST", "delete/domain", data=[domain])
+        self.cache.invalidate("domains", "mailboxes", "mailbox", "aliases")
+        return result
 
     # ==================== Mailbox Management ====================
 
-    async def get_mailboxes(self, domain: Optional[str] = None) -> List[MailboxInfo]:
-        """Get all mailboxes, optionally filtered by domain."""
+    async def get_mailboxes(self, domain: Optional[str] = None, use_cache: bool = True) -> List[MailboxInfo]:
+        """Get all mailboxes, optionally filtered by domain (cached)."""
+        mailboxes = await self._cached(
+            ("mailboxes", domain),
+            settings.MAILCOW_CACHE_TTL_MAILBOXES,
+            lambda: self._fetch_mailboxes(domain),
+            use_cache
+        )
+        return list(mailboxes)
+
+    async def _fetch_mailboxes(self, domain: Optional[str] = None) -> List[MailboxInfo]:
         if domain:
             result = await self._request("GET", f"get/mailbox/{domain}")
         else:
@@ -419,8 +909,16 @@ class MailcowService:
 
         return mailboxes
 
-    async def get_mailbox(self, email: str) -> Optional[MailboxInfo]:
-        """Get a single mailbox by email address."""
+    async def get_mailbox(self, email: str, use_cache: bool = True) -> Optional[MailboxInfo]:
+        """Get a single mailbox by email address (cached)."""
+        return await self._cached(
+            ("mailbox", email.lower()),
+            settings.MAILCOW_CACHE_TTL_MAILBOX,
+            lambda: self._fetch_mailbox(email),
+            use_cache
+        )
+
+    async def _fetch_mailbox(self, email: str) -> Optional[MailboxInfo]:
         try:
             result = await self._request("GET", f"get/mailbox/{email}")
 
@@ -477,20 +975,14 @@ class MailcowService:
             tls_enforce_in: Enforce TLS for incoming mail
             tls_enforce_out: Enforce TLS for outgoing mail
         """
-        data = {
-            "local_part": local_part,
-            "domain": domain,
-            "name": name,
-            "password": password,
-            "password2": password,
-            "quota": quota // (1024 * 1024),  # Convert to MB
-            "active": "1" if active else "0",
-            "force_pw_update": "1" if force_password_update else "0",
-            "tls_enforce_in": "1" if tls_enforce_in else "0",
-            "tls_enforce_out": "1" if tls_enforce_out else "0",
-        }
+        data = _mailbox_payload(
+            local_part, domain, password, name, quota, active,
+            force_password_update, tls_enforce_in, tls_enforce_out
+        )
 
-        return await self._request("POST", "add/mailbox", data=data)
+        result = await self._request("POST", "add/mailbox", data=data)
+        self.cache.invalidate("mailboxes", "mailbox", "domains")
+        return result
 
     async def update_mailbox(
         self,
@@ -525,11 +1017,15 @@ class MailcowService:
         if tls_enforce_out is not None:
             data["attr"]["tls_enforce_out"] = "1" if tls_enforce_out else "0"
 
-        return await self._request("POST", "edit/mailbox", data=data)
+        result = await self._request("POST", "edit/mailbox", data=data)
+        self.cache.invalidate("mailboxes", "mailbox", "domains")
+        return result
 
     async def delete_mailbox(self, email: str) -> Dict[str, Any]:
         """Delete a mailbox from Mailcow."""
-        return await self._request("POST", "delete/mailbox", data=[email])
+        result = await self._request("POST", "delete/mailbox", data=[email])
+        self.cache.invalidate("mailboxes", "mailbox", "domains")
+        return result
 
     async def update_mailbox_quota(self, email: str, quota_bytes: int) -> Dict[str, Any]:
         """Update mailbox quota."""
@@ -547,10 +1043,183 @@ class MailcowService:
         """Deactivate a mailbox (soft disable)."""
         return await self.update_mailbox(email, active=False)
 
+    # ==================== Bulk Mailbox Operations ====================
+
+    async def bulk_activate_mailboxes(self, emails: List[str]) -> BulkResult:
+        """Activate many mailboxes."""
+        return await self._bulk_mailbox_call("activate", "edit/mailbox", emails, {"active": "1"})
+
+    async def bulk_deactivate_mailboxes(self, emails: List[str]) -> BulkResult:
+        """Deactivate many mailboxes."""
+        return await self._bulk_mailbox_call("deactivate", "edit/mailbox", emails, {"active": "0"})
+
+    async def bulk_update_mailbox_quota(self, emails: List[str], quota_bytes: int) -> BulkResult:
+        """Set the same quota on many mailboxes."""
+        return await self._bulk_mailbox_call(
+            "quota", "edit/mailbox", emails, {"quota": quota_bytes // (1024 * 1024)}
+        )
+
+    async def bulk_delete_mailboxes(self, emails: List[str]) -> BulkResult:
+        """Delete many mailboxes."""
+        return await self._bulk_mailbox_call("delete", "delete/mailbox", emails)
+
+    async def bulk_create_mailboxes(
+        self,
+        mailboxes: List[Dict[str, Any]],
+        exists_ok: bool = False
+    ) -> BulkResult:
+        """
+        Create many mailboxes.
+
+        add/mailbox takes one mailbox per request, so this fans out with at
+        most MAILCOW_BULK_CONCURRENCY requests in flight. Each entry holds
+        create_mailbox() keyword arguments plus "email". With exists_ok, a
+        mailbox Mailcow already has counts as created, so retrying an
+        interrupted batch is safe.
+        """
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(max(1, settings.MAILCOW_BULK_CONCURRENCY))
+
+        async def create(entry: Dict[str, Any]) -> BulkItemResult:
+            email = entry["email"]
+            local_part, _, domain = email.partition("@")
+            kwargs = {k: v for k, v in entry.items() if k != "email"}
+            async with semaphore:
+                try:
+                    result = await self._request("POST", "add/mailbox", data=_mailbox_payload(local_part, domain, **kwargs))
+                    _raise_for_item_errors(result)
+                except MailcowValidationError as e:
+                    if not (exists_ok and "object_exists" in e.message):
+                        return BulkItemResult(email, False, e.message)
+                except MailcowError as e:
+                    return BulkItemResult(email, False, e.message)
+            return BulkItemResult(email, True)
+
+        try:
+            items = await asyncio.gather(*(create(entry) for entry in mailboxes))
+        finally:
+            if mailboxes:
+                self.cache.invalidate("mailboxes", "mailbox", "domains")
+
+        return BulkResult(
+            operation="create",
+            items=list(items),
+            requests=len(mailboxes),
+            duration_seconds=time.perf_counter() - start,
+        )
+
+    async def _bulk_mailbox_call(
+        self,
+        operation: str,
+        endpoint: str,
+        emails: List[str],
+        attr: Optional[Dict[str, Any]] = None
+    ) -> BulkResult:
+        """
+        Apply one edit/delete to many mailboxes.
+
+        Mailcow's edit/mailbox and delete/mailbox accept an array of items, so
+        mailboxes are sent MAILCOW_BULK_CHUNK_SIZE at a time. If Mailcow
+        rejects part of a chunk, the per-item status objects decide each
+        mailbox's outcome; only mailboxes no status names are retried one by
+        one (a delete retry that fails because the mailbox is already gone
+        counts as deleted). Chunks and per-item retries share a
+        MAILCOW_BULK_CONCURRENCY limit. Connection failures fail the whole chunk without fan-out, and
+        the circuit breaker stops the remaining chunks once Mailcow is down.
+        """
+        start = time.perf_counter()
+        emails = list(dict.fromkeys(emails))
+        outcomes: Dict[str, BulkItemResult] = {}
+        semaphore = asyncio.Semaphore(max(1, settings.MAILCOW_BULK_CONCURRENCY))
+        requests = 0
+
+        def payload(items: List[str]):
+            return {"items": items, "attr": attr} if attr is not None else items
+
+        async def call(items: List[str]):
+            nonlocal requests
+            async with semaphore:
+                requests += 1
+                result = await self._request("POST", endpoint, data=payload(items))
+            _raise_for_item_errors(result)
+
+        async def run_single(email: str):
+            try:
+                await call([email])
+                outcomes[email] = BulkItemResult(email, True)
+            except MailcowError as e:
+                if (
+                    operation == "delete"
+                    and not isinstance(e, MailcowConnectionError)
+                    and await self._mailbox_gone(email)
+                ):
+                    outcomes[email] = BulkItemResult(email, True)
+                else:
+                    outcomes[email] = BulkItemResult(email, False, e.message)
+
+        async def run_chunk(chunk: List[str]):
+            try:
+                await call(chunk)
+            except MailcowConnectionError as e:
+                for email in chunk:
+                    outcomes[email] = BulkItemResult(email, False, e.message)
+                return
+            except MailcowError as e:
+                if len(chunk) == 1:
+                    outcomes[chunk[0]] = BulkItemResult(chunk[0], False, e.message)
+                    return
+                # Mailcow applies the items it accepted; trust its per-item
+                # statuses and only retry the items none of them names
+                reported = _item_outcomes(e.response_data, chunk)
+                for email, error in reported.items():
+                    outcomes[email] = BulkItemResult(email, error is None, error)
+                unknown = [email for email in chunk if email not in reported]
+                if unknown:
+                    logger.info(
+                        f"Mailcow rejected bulk {operation} chunk of {len(chunk)}, "
+                        f"retrying {len(unknown)} items one by one: {e.message}"
+                    )
+                    await asyncio.gather(*(run_single(email) for email in unknown))
+                return
+            for email in chunk:
+                outcomes[email] = BulkItemResult(email, True)
+
+        chunk_size = max(1, settings.MAILCOW_BULK_CHUNK_SIZE)
+        try:
+            await asyncio.gather(*(
+                run_chunk(emails[i:i + chunk_size]) for i in range(0, len(emails), chunk_size)
+            ))
+        finally:
+            if requests:
+                self.cache.invalidate("mailboxes", "mailbox", "domains")
+
+        return BulkResult(
+            operation=operation,
+            items=[outcomes[email] for email in emails],
+            requests=requests,
+            duration_seconds=time.perf_counter() - start,
+        )
+
+    async def _mailbox_gone(self, email: str) -> bool:
+        """Whether Mailcow confirms email has no mailbox (False if it can't tell)."""
+        try:
+            return await self._fetch_mailbox(email) is None
+        except MailcowError:
+            return False
+
     # ==================== Alias Management ====================
 
-    async def get_aliases(self, domain: Optional[str] = None) -> List[AliasInfo]:
-        """Get all aliases, optionally filtered by domain."""
+    async def get_aliases(self, domain: Optional[str] = None, use_cache: bool = True) -> List[AliasInfo]:
+        """Get all aliases, optionally filtered by domain (cached)."""
+        aliases = await self._cached(
+            ("aliases", domain),
+            settings.MAILCOW_CACHE_TTL_ALIASES,
+            lambda: self._fetch_aliases(domain),
+            use_cache
+        )
+        return list(aliases)
+
+    async def _fetch_aliases(self, domain: Optional[str] = None) -> List[AliasInfo]:
         if domain:
             result = await self._request("GET", f"get/alias/domain/{domain}")
         else:
@@ -619,7 +1288,9 @@ class MailcowService:
             "sogo_visible": "1" if sogo_visible else "0",
         }
 
-        return await self._request("POST", "add/alias", data=data)
+        result = await self._request("POST", "add/alias", data=data)
+        self.cache.invalidate("aliases", "domains")
+        return result
 
     async def update_alias(
         self,
@@ -644,11 +1315,15 @@ class MailcowService:
         if sogo_visible is not None:
             data["attr"]["sogo_visible"] = "1" if sogo_visible else "0"
 
-        return await self._request("POST", "edit/alias", data=data)
+        result = await self._request("POST", "edit/alias", data=data)
+        self.cache.invalidate("aliases", "domains")
+        return result
 
     async def delete_alias(self, alias_id: int) -> Dict[str, Any]:
         """Delete an alias from Mailcow."""
-        return await self._request("POST", "delete/alias", data=[str(alias_id)])
+        result = await self._request("POST", "delete/alias", data=[str(alias_id)])
+        self.cache.invalidate("aliases", "domains")
+        return result
 
     async def create_catch_all(self, domain: str, goto: str, active: bool = True) -> Dict[str, Any]:
         """Create a catch-all alias for a domain."""
@@ -779,7 +1454,7 @@ class MailcowService:
         from app.models.mailbox import MailboxMetadata
         from sqlalchemy import select
 
-        mailbox = await self.get_mailbox(email)
+        mailbox = await self.get_mailbox(email, use_cache=False)
         if not mailbox:
             return None
 
@@ -0,0 +1,301 @@
+"""
+Monthly range partitions for login_activity.
+
+login_activity is partitioned by RANGE (login_time) with one partition per
+calendar month (UTC), named login_activity_pYYYYMM, plus login_activity_default
+for rows outside every range so a missing partition never fails a login.
+
+maintain_partitions() is idempotent and serialised with a transaction-level
+advisory lock. It:
+
+- creates the partitions for the current month and the next
+  LOGIN_ACTIVITY_PARTITIONS_AHEAD months, first moving any matching rows out
+  of the default partition
+- drops whole partitions older than LOGIN_ACTIVITY_RETENTION_MONTHS instead
+  of DELETEing rows (0 keeps everything)
+
+init_db and scripts/run_migration.py call it directly; every app worker runs
+a PartitionMaintenanceWorker that calls it periodically, skipping the cycle
+when another worker holds the lock. run_migration.py also converts an
+existing unpartitioned table.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "login_activity"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+# Partition DDL takes strong locks on the parent; never queue behind long
+# queries (and block logins behind us) for longer than this.
+DDL_LOCK_TIMEOUT = "5s"
+
+
+# ==================== Month Arithmetic ====================
+
+def month_start(value: datetime) -> datetime:
+    """First instant of value's month, in UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+def retention_cutoff(now: Optional[datetime] = None) -> Optional[datetime]:
+    """Partitions for months before this are dropped (None keeps everything)."""
+    if settings.LOGIN_ACTIVITY_RETENTION_MONTHS <= 0:
+        return None
+    now = now or datetime.now(timezone.utc)
+    return add_months(month_start(now), -settings.LOGIN_ACTIVITY_RETENTION_MONTHS)
+
+
+# ==================== Catalog ====================
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    result = await conn.execute(
+        text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": PARENT_TABLE},
+    )
+    return result.scalar() == "p"
+
+
+async def list_partitions(conn: AsyncConnection) -> Dict[str, datetime]:
+    """Monthly partitions of login_activity, by name, with their month."""
+    result = await conn.execute(
+        text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:table)
+        """),
+        {"table": PARENT_TABLE},
+    )
+    partitions = {}
+    for (name,) in result:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[name] = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+    return partitions
+
+
+# ==================== Maintenance ====================
+
+async def create_partition(conn: AsyncConnection, month: datetime):
+    """Create month's partition, moving its rows out of the default partition."""
+    name = partition_name(month)
+    lower, upper = month, add_months(month, 1)
+    bounds = f"FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    params = {"lower": lower, "upper": upper}
+
+    result = await conn.execute(
+        text(f"""
+            SELECT EXISTS (
+                SELECT 1 FROM {DEFAULT_PARTITION}
+                WHERE login_time >= :lower AND login_time < :upper
+            )
+        """),
+        params,
+    )
+    if result.scalar():
+        # The default partition may not hold rows belonging to a new
+        # partition, so build it standalone, move them, then attach it.
+        await conn.execute(text(
+            f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        await conn.execute(
+            text(f"""
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE login_time >= :lower AND login_time < :upper
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            """),
+            params,
+        )
+        await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+    else:
+        await conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} FOR VALUES {bounds}"))
+
+
+async def ensure_partitions(
+    conn: AsyncConnection,
+    now: Optional[datetime] = None,
+    since: Optional[datetime] = None,
+) -> List[str]:
+    """Create missing partitions from since's month (default: this month) to the look-ahead."""
+    current = month_start(now or datetime.now(timezone.utc))
+    month = month_start(since) if since and since < current else current
+    last = add_months(current, settings.LOGIN_ACTIVITY_PARTITIONS_AHEAD)
+
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"
+    ))
+    existing = await list_partitions(conn)
+    created = []
+    while month <= last:
+        if partition_name(month) not in existing:
+            await create_partition(conn, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+async def drop_expired_partitions(conn: AsyncConnection, now: Optional[datetime] = None) -> List[str]:
+    """Drop partitions for months before the retention cutoff."""
+    cutoff = retention_cutoff(now)
+    if cutoff is None:
+        return []
+
+    dropped = []
+    for name, month in sorted((await list_partitions(conn)).items(), key=lambda item: item[1]):
+        if month < cutoff:
+            await conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+    # Stray rows outside every monthly range; the default partition is small
+    await conn.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE login_time < :cutoff"),
+        {"cutoff": cutoff},
+    )
+    return dropped
+
+
+async def maintain_partitions(
+    conn: AsyncConnection,
+    now: Optional[datetime] = None,
+    wait: bool = True,
+) -> Optional[Dict[str, List[str]]]:
+    """
+    Create upcoming partitions and drop expired ones in conn's transaction.
+
+    Returns None without doing anything if login_activity is not partitioned
+    yet, or if wait is False and another worker holds the maintenance lock.
+    """
+    if not await is_partitioned(conn):
+        logger.warning(
+            f"{PARENT_TABLE} is not partitioned; run scripts/run_migration.py to convert it"
+        )
+        return None
+
+    lock = "pg_advisory_xact_lock" if wait else "pg_try_advisory_xact_lock"
+    result = await conn.execute(
+        text(f"SELECT {lock}(:key)"), {"key": settings.PARTITION_MAINTENANCE_LOCK_KEY}
+    )
+    if not wait and not result.scalar():
+        return None
+
+    await conn.execute(text(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT}'"))
+    created = await ensure_partitions(conn, now)
+    dropped = await drop_expired_partitions(conn, now)
+    if created or dropped:
+        logger.info(f"{PARENT_TABLE} partitions created: {created or 'none'}; dropped: {dropped or 'none'}")
+    return {"created": created, "dropped": dropped}
+
+
+# ==================== Worker ====================
+
+class PartitionMaintenanceWorker:
+    """Periodic partition maintenance; one worker at a time does the work."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.last_run_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.last_created: List[str] = []
+        self.last_dropped: List[str] = []
+
+    def start(self):
+        """Start the background loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="partition-maintenance")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Partition maintenance failed: {e}")
+
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self):
+        async with engine.begin() as conn:
+            result = await maintain_partitions(conn, wait=False)
+        if result is None:
+            return
+        self.last_run_at = datetime.now(timezone.utc)
+        self.last_error = None
+        self.last_created = result["created"]
+        self.last_dropped = result["dropped"]
+
+    async def report(self) -> Dict[str, Any]:
+        """Worker status and the current partitions with estimated row counts."""
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text("""
+                    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bounds,
+                           GREATEST(c.reltuples, 0)::bigint AS estimated_rows,
+                           pg_total_relation_size(c.oid) AS size_bytes
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = to_regclass(:table)
+                    ORDER BY c.relname
+                """),
+                {"table": PARENT_TABLE},
+            )
+            partitions = [dict(row._mapping) for row in result]
+
+        cutoff = retention_cutoff()
+        return {
+            "enabled": settings.PARTITION_MAINTENANCE_ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "months_ahead": settings.LOGIN_ACTIVITY_PARTITIONS_AHEAD,
+            "retention_months": settings.LOGIN_ACTIVITY_RETENTION_MONTHS,
+            "retention_cutoff": cutoff.isoformat() if cutoff else None,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_error": self.last_error,
+            "last_created": self.last_created,
+            "last_dropped": self.last_dropped,
+            "partitions": partitions,
+        }
+
+
+# Global worker instance
+partition_maintenance_worker = PartitionMaintenanceWorker(
+    interval=settings.PARTITION_MAINTENANCE_INTERVAL,
+)
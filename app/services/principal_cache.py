@@ -0,0 +1,233 @@
+"""
+Authenticated principal cache.
+
+get_current_user/get_current_admin look the token subject up on every
+request. This per-process cache keeps a snapshot of the row's columns for
+PRINCIPAL_CACHE_TTL seconds; on a hit the snapshot is attached to the
+request's session as a persistent instance without a SELECT, so routes can
+still modify and commit it.
+
+Invalidation:
+- A session hook collects every User/AdminUser row changed or deleted in a
+  flush and issues pg_notify on the principal_cache channel in the same
+  transaction, so other workers hear about it exactly when it commits.
+- Every worker LISTENs on a dedicated connection and drops the entries it is
+  told about. While that connection is down the cache is bypassed.
+- A load only fills the cache if no invalidation happened while it ran
+  (generation counter), so a slow read cannot cache a pre-commit row.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple, Type
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.admin import AdminUser
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "principal_cache"
+
+PRINCIPAL_KINDS: Dict[Type, str] = {User: "user", AdminUser: "admin"}
+
+NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+_PENDING_KEY = "principal_cache_pending"
+
+
+class PrincipalCache:
+    """TTL + LRU cache of principal column snapshots, keyed by (kind, email)."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.generation = 0
+        self._listening = False
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.PRINCIPAL_CACHE_ENABLED and self._listening
+
+    # ==================== Lookup ====================
+
+    def get(self, kind: str, email: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh snapshot, or None on miss/expiry/bypass."""
+        if not self.enabled:
+            return None
+        key = (kind, email)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, kind: str, email: str, instance: Any, generation: int):
+        """Cache a loaded instance unless something was invalidated since `generation`."""
+        if not self.enabled or generation != self.generation:
+            return
+        snapshot = {
+            attr.key: getattr(instance, attr.key)
+            for attr in inspect(type(instance)).column_attrs
+        }
+        self._entries[(kind, email)] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end((kind, email))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def attach(db: AsyncSession, model: Type, snapshot: Dict[str, Any]) -> Any:
+        """Materialize a snapshot as a persistent instance of `db` without a query."""
+        instance = model.__mapper__.class_manager.new_instance()
+        for key, value in snapshot.items():
+            set_committed_value(instance, key, copy.deepcopy(value))
+        make_transient_to_detached(instance)
+        db.add(instance)
+        return instance
+
+    # ==================== Invalidation ====================
+
+    def invalidate(self, kind: Optional[str] = None, email: Optional[str] = None):
+        """Drop one entry, or everything when kind/email are omitted."""
+        self.generation += 1
+        self.invalidations += 1
+        if kind is None or email is None:
+            self._entries.clear()
+        else:
+            self._entries.pop((kind, email), None)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        kind, _, email = payload.partition(":")
+        if kind == "*" or not email:
+            self.invalidate()
+        else:
+            self.invalidate(kind, email)
+
+    # ==================== Listener ====================
+
+    def start(self):
+        """Start listening for invalidations (the cache is bypassed until connected)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen(), name="principal-cache-listener")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._listening = False
+        self._entries.clear()
+
+    async def _listen(self):
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver = raw.driver_connection
+                    await driver.add_listener(CHANNEL, self._on_notify)
+                    # Changes made before we were listening were never announced to us
+                    self.invalidate()
+                    self._listening = True
+                    logger.info("Principal cache listening for invalidations")
+                    try:
+                        while True:
+                            await asyncio.sleep(10)
+                            await driver.execute("SELECT 1")
+                    finally:
+                        self._listening = False
+                        self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Principal cache listener disconnected, bypassing cache: {e}")
+                await asyncio.sleep(5)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global cache instance
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
+
+
+# ==================== Session Hooks ====================
+
+def _changed_principals(session: Session) -> Set[Tuple[str, str]]:
+    changed = set()
+    for instance in list(session.dirty) + list(session.deleted):
+        kind = PRINCIPAL_KINDS.get(type(instance))
+        if kind is None:
+            continue
+        history = inspect(instance).attrs.email.history
+        emails = [
+            email for email in
+            list(history.unchanged or ()) + list(history.added or ()) + list(history.deleted or ())
+            if email
+        ]
+        if not emails:
+            # Email not loaded on this instance; can't tell which entry, drop them all
+            changed.add(("*", ""))
+        for email in emails:
+            changed.add((kind, email))
+    return changed
+
+
+@event.listens_for(Session, "after_flush")
+def _notify_principal_changes(session: Session, flush_context):
+    changed = _changed_principals(session)
+    if not changed:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    new = changed - pending
+    pending.update(new)
+    connection = session.connection()
+    for kind, email in new:
+        # Delivered to every listener (including this process) on commit
+        connection.execute(NOTIFY_SQL, {"channel": CHANNEL, "payload": f"{kind}:{email}"})
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session: Session):
+    # Don't wait for our own NOTIFY to come back
+    for kind, email in session.info.pop(_PENDING_KEY, ()):
+        if kind == "*":
+            principal_cache.invalidate()
+        else:
+            principal_cache.invalidate(kind, email)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_principals(session: Session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,181 @@
+"""
+Background mailbox quota sync.
+
+Every gunicorn worker starts a QuotaSyncWorker from app.main.lifespan, but
+only the worker holding the Postgres advisory lock QUOTA_SYNC_LOCK_KEY runs
+the sync. The lock is session-level and held on a dedicated connection, so it
+is released automatically if that worker dies and another one takes over on
+its next attempt.
+
+Each cycle refreshes mailbox_metadata one domain at a time through the bulk
+upsert engine in app.services.mailbox_sync.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.services.mailcow import mailcow_service, MailcowError
+from app.services.mailbox_sync import sync_mailboxes_from_mailcow
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaSyncWorker:
+    """Periodic, leader-elected mailbox quota refresher."""
+
+    def __init__(self, interval: float, lock_key: int):
+        self.interval = interval
+        self.lock_key = lock_key
+        self._task: Optional[asyncio.Task] = None
+        self._lock_conn: Optional[AsyncConnection] = None
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.domains_synced = 0
+        self.mailboxes_synced = 0
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_conn is not None
+
+    def start(self):
+        """Start the background loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="quota-sync")
+
+    async def stop(self):
+        """Stop the loop and give up leadership."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release_leadership()
+
+    # ==================== Leader Election ====================
+
+    async def _try_acquire_leadership(self) -> bool:
+        """Take the advisory lock on a dedicated connection if it is free."""
+        if self._lock_conn is not None:
+            # Confirm the lock-holding session is still alive
+            try:
+                await self._lock_conn.execute(text("SELECT 1"))
+                await self._lock_conn.commit()
+                return True
+            except Exception as e:
+                logger.warning(f"Quota sync lost its lock connection: {e}")
+                await self._release_leadership()
+
+        conn = await engine.connect()
+        try:
+            result = await conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+            )
+            acquired = bool(result.scalar())
+            # The lock is session-level; end the transaction so the
+            # connection does not sit idle in transaction.
+            await conn.commit()
+        except Exception:
+            await conn.close()
+            raise
+
+        if not acquired:
+            await conn.close()
+            return False
+
+        self._lock_conn = conn
+        logger.info("Quota sync: this worker is now the leader")
+        return True
+
+    async def _release_leadership(self):
+        if self._lock_conn is None:
+            return
+        conn, self._lock_conn = self._lock_conn, None
+        try:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+            await conn.commit()
+        except Exception:
+            # Closing the session releases the lock anyway
+            pass
+        finally:
+            try:
+                await conn.close()
+            except Exception:
+                await conn.invalidate()
+
+    # ==================== Sync Loop ====================
+
+    async def _run(self):
+        # Stagger workers so they don't all race for the lock at boot
+        await asyncio.sleep(random.uniform(0, min(self.interval, 10)))
+
+        while True:
+            try:
+                if await self._try_acquire_leadership():
+                    await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Quota sync cycle failed: {e}")
+
+            await asyncio.sleep(self.interval)
+
+    async def sync_once(self):
+        """Refresh mailbox_metadata for every Mailcow domain."""
+        start = time.perf_counter()
+        domains = await mailcow_service.get_domains(use_cache=False)
+        synced_domains = 0
+        synced_mailboxes = 0
+        errors = []
+
+        for domain in domains:
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await sync_mailboxes_from_mailcow(db, domain=domain.domain)
+                synced_domains += 1
+                synced_mailboxes += result.total
+            except MailcowError as e:
+                errors.append(f"{domain.domain}: {e.message}")
+                logger.warning(f"Quota sync skipped domain {domain.domain}: {e.message}")
+
+        self.last_run_at = datetime.now(timezone.utc)
+        self.last_duration = round(time.perf_counter() - start, 3)
+        self.last_error = "; ".join(errors) or None
+        self.domains_synced = synced_domains
+        self.mailboxes_synced = synced_mailboxes
+        logger.info(
+            f"Quota sync: {synced_mailboxes} mailboxes across {synced_domains} domains "
+            f"in {self.last_duration:.2f}s"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.QUOTA_SYNC_ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "is_leader": self.is_leader,
+            "interval_seconds": self.interval,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_duration_seconds": self.last_duration,
+            "last_error": self.last_error,
+            "domains_synced": self.domains_synced,
+            "mailboxes_synced": self.mailboxes_synced,
+        }
+
+
+# Global worker instance
+quota_sync_worker = QuotaSyncWorker(
+    interval=settings.QUOTA_SYNC_INTERVAL,
+    lock_key=settings.QUOTA_SYNC_LOCK_KEY,
+)
@@ -0,0 +1,238 @@
+"""
+Sliding-window rate limiting.
+
+Each rule (limit per window) keeps two fixed-window counters per key: the
+current window and the previous one. A hit is allowed while
+
+    previous * (1 - elapsed / window) + current < limit
+
+which approximates a true sliding window at O(1) cost and memory per key.
+
+Backends:
+- memory: counters live in this process; decisions take microseconds but
+  limits apply per worker (N workers allow N times the limit) and reset on
+  restart.
+- postgres (default): counters live in the unlogged rate_limit_counters
+  table and are read and bumped in one statement, so limits hold across
+  workers. Denials are remembered locally until Retry-After, so a client
+  that is already blocked costs no further round trips.
+
+Denied hits are not counted, so a blocked client recovers on schedule.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """At most `limit` hits per `window` seconds."""
+    limit: int
+    window: int
+    message: str = "Too many requests. Please try again later."
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    retry_after: int = 0
+    rule: Optional[RateLimitRule] = None
+
+
+def _window_state(rule: RateLimitRule, now: float) -> Tuple[int, float]:
+    """Start of the current window and the weight of the previous one."""
+    window_start = int(now // rule.window) * rule.window
+    return window_start, 1.0 - (now - window_start) / rule.window
+
+
+def _retry_after(rule: RateLimitRule, now: float, current: int, previous: int) -> int:
+    """Seconds until one more hit would fit under `rule`."""
+    window_start, weight = _window_state(rule, now)
+    remaining = window_start + rule.window - now
+    if current < rule.limit and previous:
+        # The previous window's share decays linearly: wait until enough has gone
+        needed_weight = (rule.limit - current) / previous
+        wait = (weight - needed_weight) * rule.window
+        return max(1, math.ceil(min(wait, remaining)))
+    # The current window is full by itself: wait for it to become the previous one
+    next_weight = rule.limit / current if current else 1.0
+    return max(1, math.ceil(remaining + max(0.0, 1.0 - next_weight) * rule.window))
+
+
+class MemoryRateLimitBackend:
+    """Per-process counters: {(key, window, window_start): count}."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._counters: Dict[Tuple[str, int, int], int] = {}
+        self._next_prune = 0.0
+
+    async def hit(self, key: str, rules: Sequence[RateLimitRule], now: float) -> RateLimitResult:
+        self._prune(now)
+        states = []
+        for rule in rules:
+            window_start, weight = _window_state(rule, now)
+            current = self._counters.get((key, rule.window, window_start), 0)
+            previous = self._counters.get((key, rule.window, window_start - rule.window), 0)
+            if previous * weight + current >= rule.limit:
+                return RateLimitResult(False, _retry_after(rule, now, current, previous), rule)
+            states.append((rule, window_start))
+
+        for rule, window_start in states:
+            counter = (key, rule.window, window_start)
+            self._counters[counter] = self._counters.get(counter, 0) + 1
+        return RateLimitResult(True)
+
+    def _prune(self, now: float):
+        if now < self._next_prune and len(self._counters) < self.max_keys:
+            return
+        self._next_prune = now + 60
+        # Anything older than the previous window no longer counts
+        self._counters = {
+            counter: count for counter, count in self._counters.items()
+            if counter[2] + 2 * counter[1] > now
+        }
+        if len(self._counters) >= self.max_keys:
+            # Evict down to 90%, oldest windows first and the least-hit within
+            # a window, so a flood of one-hit keys (e.g. rotated client IPs)
+            # can't wipe the counters of clients close to their limits
+            excess = len(self._counters) - int(self.max_keys * 0.9)
+            logger.warning(f"Rate limiter holds {len(self._counters)} live counters; evicting {excess}")
+            by_age = sorted(self._counters.items(), key=lambda item: (item[0][2] + item[0][1], item[1]))
+            for counter, _ in by_age[:excess]:
+                del self._counters[counter]
+
+
+# Reads both windows of every rule, then bumps the current windows only if
+# every rule allows the hit. Concurrent hits on one key may both pass at the
+# boundary; that overshoot is accepted in exchange for a single round trip.
+HIT_SQL = text("""
+    WITH input AS (
+        SELECT *
+        FROM unnest(
+            CAST(:keys AS text[]), CAST(:window_starts AS bigint[]),
+            CAST(:windows AS bigint[]), CAST(:limits AS integer[]),
+            CAST(:weights AS float8[])
+        ) AS i(key, window_start, window_size, max_hits, weight)
+    ),
+    state AS (
+        SELECT input.*,
+               COALESCE(cur.count, 0) AS current_hits,
+               COALESCE(prev.count, 0) AS previous_hits
+        FROM input
+        LEFT JOIN rate_limit_counters cur
+            ON cur.key = input.key AND cur.window_start = input.window_start
+        LEFT JOIN rate_limit_counters prev
+            ON prev.key = input.key AND prev.window_start = input.window_start - input.window_size
+    ),
+    decision AS (
+        SELECT bool_and(previous_hits * weight + current_hits < max_hits) AS allowed FROM state
+    ),
+    bump AS (
+        INSERT INTO rate_limit_counters (key, window_start, count, expires_at)
+        SELECT key, window_start, 1, window_start + 2 * window_size
+        FROM input
+        WHERE (SELECT allowed FROM decision)
+        ON CONFLICT (key, window_start)
+        DO UPDATE SET count = rate_limit_counters.count + 1
+    )
+    SELECT key, current_hits, previous_hits, (SELECT allowed FROM decision) AS allowed
+    FROM state
+""")
+
+CLEANUP_SQL = text("DELETE FROM rate_limit_counters WHERE expires_at < :now")
+
+
+class PostgresRateLimitBackend:
+    """Counters shared by all workers through rate_limit_counters."""
+
+    def __init__(self, cleanup_interval: float):
+        self.cleanup_interval = cleanup_interval
+        self._next_cleanup = 0.0
+
+    async def hit(self, key: str, rules: Sequence[RateLimitRule], now: float) -> RateLimitResult:
+        # One counter key per rule, so rules with different windows don't collide
+        keys, window_starts, weights = [], [], []
+        for rule in rules:
+            window_start, weight = _window_state(rule, now)
+            keys.append(f"{key}:{rule.window}")
+            window_starts.append(window_start)
+            weights.append(weight)
+
+        async with engine.begin() as conn:
+            result = await conn.execute(HIT_SQL, {
+                "keys": keys,
+                "window_starts": window_starts,
+                "windows": [rule.window for rule in rules],
+                "limits": [rule.limit for rule in rules],
+                "weights": weights,
+            })
+            rows = {row.key: row for row in result}
+
+            if now >= self._next_cleanup:
+                self._next_cleanup = now + self.cleanup_interval
+                await conn.execute(CLEANUP_SQL, {"now": int(now)})
+
+        for rule, counter_key, weight in zip(rules, keys, weights):
+            row = rows[counter_key]
+            if row.allowed:
+                break
+            if row.previous_hits * weight + row.current_hits >= rule.limit:
+                retry_after = _retry_after(rule, now, row.current_hits, row.previous_hits)
+                return RateLimitResult(False, retry_after, rule)
+        return RateLimitResult(True)
+
+
+class RateLimiter:
+    """Checks hits against named rule sets using the configured backend."""
+
+    def __init__(self):
+        self.memory = MemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+        self.postgres = PostgresRateLimitBackend(cleanup_interval=settings.RATE_LIMIT_CLEANUP_INTERVAL)
+        # key -> (blocked_until, rule); lets the shared backend skip known denials
+        self._blocked: Dict[str, Tuple[float, RateLimitRule]] = {}
+
+    @property
+    def backend(self):
+        return self.postgres if settings.RATE_LIMIT_BACKEND == "postgres" else self.memory
+
+    async def hit(self, scope: str, identifier: str, rules: Sequence[RateLimitRule]) -> RateLimitResult:
+        """Record a hit for `identifier` under `scope` unless a rule is exhausted."""
+        if not settings.RATE_LIMIT_ENABLED or not rules:
+            return RateLimitResult(True)
+
+        key = f"{scope}:{identifier}"
+        now = time.time()
+
+        blocked = self._blocked.get(key)
+        if blocked:
+            if blocked[0] > now:
+                return RateLimitResult(False, max(1, math.ceil(blocked[0] - now)), blocked[1])
+            del self._blocked[key]
+
+        try:
+            result = await self.backend.hit(key, rules, now)
+        except Exception as e:
+            # Fail open: an unavailable counter store must not lock everyone out
+            logger.error(f"Rate limit check failed for {scope}, allowing request: {e}")
+            return RateLimitResult(True)
+
+        if not result.allowed and self.backend is self.postgres:
+            if len(self._blocked) >= settings.RATE_LIMIT_MAX_KEYS:
+                self._blocked = {k: v for k, v in self._blocked.items() if v[0] > now}
+            self._blocked[key] = (now + result.retry_after, result.rule)
+        return result
+
+
+# Global limiter instance
+rate_limiter = RateLimiter()
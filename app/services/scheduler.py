@@ -0,0 +1,447 @@
+"""
+Scheduled action runner.
+
+Every app worker runs a ScheduledActionRunner (started from app.main.lifespan)
+that claims due rows from scheduled_actions with FOR UPDATE SKIP LOCKED and
+executes them against their target users.
+
+- A claimed action is leased to one worker (locked_by/lease_expires_at); a
+  heartbeat extends the lease while it runs. If the worker dies, another one
+  takes the action over once the lease expires.
+- Targets are processed in batches of SCHEDULER_BATCH_SIZE; each batch's
+  Mailcow changes go through the bulk executor in MailcowService.
+- Each batch commits its local changes, audit logs and per-target results in
+  one transaction, fenced on locked_by. A worker that lost its lease cannot
+  commit, and a takeover skips targets that already have a result, so local
+  changes are never applied twice. Mailcow calls for an uncommitted batch may
+  be repeated, which is safe because they set absolute state.
+- Actions that keep losing their worker are failed after
+  SCHEDULER_MAX_ATTEMPTS claims.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.models.admin import AdminUser
+from app.models.group import UserGroup, UserGroupMember
+from app.models.mailbox import MailboxMetadata
+from app.models.user import User
+from app.services.log_sink import log_sink
+from app.services.mailcow import mailcow_service
+
+logger = logging.getLogger(__name__)
+
+# Accepted action_type values, mapped to the canonical name
+ACTION_TYPES = {
+    "suspend": "suspend",
+    "unsuspend": "unsuspend",
+    "delete": "delete",
+    "quota_change": "quota_change",
+    "quota": "quota_change",
+    "update_quota": "quota_change",
+    "group_add": "group_add",
+    "add_to_group": "group_add",
+}
+
+CLAIM_SQL = text("""
+    WITH due AS (
+        SELECT id
+        FROM scheduled_actions
+        WHERE (status = 'pending' AND scheduled_for <= now())
+           OR (status = 'running' AND lease_expires_at < now())
+        ORDER BY scheduled_for
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE scheduled_actions s
+    SET status = 'running',
+        locked_by = :worker,
+        lease_expires_at = now() + make_interval(secs => :lease),
+        attempts = coalesce(s.attempts, 0) + 1,
+        started_at = coalesce(s.started_at, now())
+    FROM due
+    WHERE s.id = due.id
+    RETURNING s.id, s.action_type, s.target_type, s.target_ids, s.action_data,
+              s.created_by, s.attempts, coalesce(s.results, '{}'::jsonb) AS results
+""")
+
+HEARTBEAT_SQL = text("""
+    UPDATE scheduled_actions
+    SET lease_expires_at = now() + make_interval(secs => :lease)
+    WHERE id = :id AND locked_by = :worker AND status = 'running'
+""")
+
+RECORD_RESULTS_SQL = text("""
+    UPDATE scheduled_actions
+    SET results = coalesce(results, '{}'::jsonb) || CAST(:results AS jsonb),
+        lease_expires_at = now() + make_interval(secs => :lease)
+    WHERE id = :id AND locked_by = :worker AND status = 'running'
+""")
+
+FINISH_SQL = text("""
+    UPDATE scheduled_actions
+    SET status = :status,
+        error = :error,
+        executed_at = now(),
+        locked_by = NULL,
+        lease_expires_at = NULL
+    WHERE id = :id AND locked_by = :worker AND status = 'running'
+""")
+
+
+def normalize_action_type(action_type: str) -> Optional[str]:
+    """Return the canonical action type, or None if it is not supported."""
+    return ACTION_TYPES.get((action_type or "").strip().lower())
+
+
+def validate_action_data(action_type: str, action_data: Dict[str, Any]) -> Optional[str]:
+    """Return an error message if action_data is missing what the action needs."""
+    action_data = action_data or {}
+    if action_type == "quota_change":
+        quota_bytes = action_data.get("quota_bytes")
+        if not isinstance(quota_bytes, int) or isinstance(quota_bytes, bool) or quota_bytes < 0:
+            return "quota_change requires a non-negative integer action_data.quota_bytes"
+    if action_type == "group_add":
+        try:
+            uuid.UUID(str(action_data.get("group_id")))
+        except ValueError:
+            return "group_add requires action_data.group_id"
+    return None
+
+
+class LeaseLost(Exception):
+    """Another worker owns the action now; stop without writing anything."""
+
+
+class ScheduledActionRunner:
+    """Claims due scheduled actions and executes them in batches."""
+
+    def __init__(
+        self,
+        poll_interval: float,
+        batch_size: int,
+        lease_timeout: float,
+        max_attempts: int
+    ):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the polling loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="scheduled-actions")
+
+    async def stop(self):
+        """Stop the loop; an interrupted action is resumed after its lease expires."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ==================== Polling Loop ====================
+
+    async def _run(self):
+        while True:
+            claimed = None
+            try:
+                claimed = await self._claim()
+                if claimed:
+                    await self._process(claimed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scheduled action runner failed: {e}")
+
+            # Drain due actions back to back; otherwise wait for the next poll
+            if not claimed:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        async with engine.begin() as conn:
+            result = await conn.execute(CLAIM_SQL, {
+                "worker": self.worker_id,
+                "lease": self.lease_timeout,
+            })
+            row = result.mappings().first()
+        return dict(row) if row else None
+
+    async def _finish(self, action_id, status: str, error: Optional[str] = None):
+        async with engine.begin() as conn:
+            await conn.execute(FINISH_SQL, {
+                "id": action_id,
+                "worker": self.worker_id,
+                "status": status,
+                "error": error[:1000] if error else None,
+            })
+
+    async def _process(self, action: Dict[str, Any]):
+        action_id = action["id"]
+
+        if action["attempts"] > self.max_attempts:
+            logger.error(f"Scheduled action {action_id} abandoned after {action['attempts'] - 1} attempts")
+            await self._finish(action_id, "failed", f"Gave up after {action['attempts'] - 1} interrupted attempts")
+            return
+
+        action_type = normalize_action_type(action["action_type"])
+        if action_type is None:
+            await self._finish(action_id, "failed", f"Unsupported action type: {action['action_type']}")
+            return
+
+        error = validate_action_data(action_type, action["action_data"])
+        if error:
+            await self._finish(action_id, "failed", error)
+            return
+
+        lease_lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(action_id, lease_lost))
+        try:
+            results = await self._execute(action, action_type, lease_lost)
+        except LeaseLost:
+            logger.warning(f"Scheduled action {action_id} lease lost; leaving it to its new owner")
+            return
+        except Exception as e:
+            # Lease expiry retries the remaining targets on any worker
+            logger.error(f"Scheduled action {action_id} interrupted: {e}")
+            return
+        finally:
+            heartbeat.cancel()
+            try:
+                await heartbeat
+            except asyncio.CancelledError:
+                pass
+
+        succeeded = sum(1 for r in results.values() if r["status"] == "succeeded")
+        failed = len(results) - succeeded
+        if failed == 0:
+            status = "completed"
+        elif succeeded == 0:
+            status = "failed"
+        else:
+            status = "partial"
+        await self._finish(action_id, status, f"{failed} of {len(results)} targets failed" if failed else None)
+        logger.info(
+            f"Scheduled action {action_id} ({action_type}) {status}: "
+            f"{succeeded} succeeded, {failed} failed"
+        )
+
+    async def _heartbeat(self, action_id, lease_lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.lease_timeout / 3)
+            try:
+                async with engine.begin() as conn:
+                    result = await conn.execute(HEARTBEAT_SQL, {
+                        "id": action_id,
+                        "worker": self.worker_id,
+                        "lease": self.lease_timeout,
+                    })
+                if result.rowcount == 0:
+                    lease_lost.set()
+                    return
+            except Exception as e:
+                logger.warning(f"Scheduled action {action_id} heartbeat failed: {e}")
+
+    # ==================== Execution ====================
+
+    async def _execute(
+        self,
+        action: Dict[str, Any],
+        action_type: str,
+        lease_lost: asyncio.Event
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run every target without a recorded result; return all results."""
+        results: Dict[str, Dict[str, Any]] = dict(action["results"] or {})
+        targets = list(dict.fromkeys(str(t) for t in (action["target_ids"] or [])))
+        remaining = [t for t in targets if t not in results]
+
+        async with AsyncSessionLocal() as db:
+            admin_email = "scheduler"
+            if action["created_by"]:
+                admin = await db.get(AdminUser, action["created_by"])
+                if admin:
+                    admin_email = admin.email
+
+            if action_type == "group_add":
+                group = await db.get(UserGroup, uuid.UUID(str(action["action_data"]["group_id"])))
+                if not group:
+                    for target in remaining:
+                        results[target] = {"status": "failed", "error": "Group not found"}
+                    await self._record(db, action["id"], {t: results[t] for t in remaining})
+                    await db.commit()
+                    return results
+
+        for start in range(0, len(remaining), self.batch_size):
+            if lease_lost.is_set():
+                raise LeaseLost()
+            batch = remaining[start:start + self.batch_size]
+            async with AsyncSessionLocal() as db:
+                batch_results = await self._run_batch(
+                    db, action, action_type, batch, admin_email
+                )
+                await self._record(db, action["id"], batch_results)
+                await db.commit()
+            results.update(batch_results)
+
+        return results
+
+    async def _record(self, db: AsyncSession, action_id, batch_results: Dict[str, Dict[str, Any]]):
+        """Write batch results, fenced on this worker still owning the lease."""
+        result = await db.execute(RECORD_RESULTS_SQL, {
+            "id": action_id,
+            "worker": self.worker_id,
+            "lease": self.lease_timeout,
+            "results": json.dumps(batch_results),
+        })
+        if result.rowcount == 0:
+            await db.rollback()
+            raise LeaseLost()
+
+    async def _load_users(self, db: AsyncSession, targets: List[str]) -> Dict[str, User]:
+        """Resolve targets given as user ids or email addresses."""
+        ids, emails = [], []
+        for target in targets:
+            try:
+                ids.append(uuid.UUID(target))
+            except ValueError:
+                emails.append(target.lower())
+
+        conditions = []
+        if ids:
+            conditions.append(User.id.in_(ids))
+        if emails:
+            conditions.append(User.email.in_(emails))
+        result = await db.execute(select(User).where(or_(*conditions)))
+
+        by_key: Dict[str, User] = {}
+        for user in result.scalars().all():
+            by_key[str(user.id)] = user
+            by_key[user.email.lower()] = user
+        return {t: by_key[t.lower()] for t in targets if t.lower() in by_key}
+
+    async def _run_batch(
+        self,
+        db: AsyncSession,
+        action: Dict[str, Any],
+        action_type: str,
+        batch: List[str],
+        admin_email: str
+    ) -> Dict[str, Dict[str, Any]]:
+        action_data = action["action_data"] or {}
+        users = await self._load_users(db, batch)
+        results: Dict[str, Dict[str, Any]] = {
+            t: {"status": "failed", "error": "User not found"}
+            for t in batch if t not in users
+        }
+
+        # Mailcow first, in bulk; local changes follow in this transaction
+        mailcow_errors: Dict[str, str] = {}
+        if action_type in ("suspend", "unsuspend", "quota_change") and mailcow_service.is_configured and users:
+            emails = [u.email for u in users.values()]
+            if action_type == "suspend":
+                report = await mailcow_service.bulk_deactivate_mailboxes(emails)
+            elif action_type == "unsuspend":
+                report = await mailcow_service.bulk_activate_mailboxes(emails)
+            else:
+                report = await mailcow_service.bulk_update_mailbox_quota(emails, action_data["quota_bytes"])
+            errors_by_email = {r.item: r.error for r in report.failed}
+            mailcow_errors = {
+                t: errors_by_email[u.email] for t, u in users.items() if u.email in errors_by_email
+            }
+
+        members = set()
+        if action_type == "group_add" and users:
+            group_id = uuid.UUID(str(action_data["group_id"]))
+            member_result = await db.execute(
+                select(UserGroupMember.user_id).where(
+                    UserGroupMember.group_id == group_id,
+                    UserGroupMember.user_id.in_([u.id for u in users.values()])
+                )
+            )
+            members = set(member_result.scalars().all())
+
+        quota_rows: Dict[str, MailboxMetadata] = {}
+        if action_type == "quota_change" and users:
+            quota_result = await db.execute(
+                select(MailboxMetadata).where(MailboxMetadata.email.in_([u.email for u in users.values()]))
+            )
+            quota_rows = {m.email: m for m in quota_result.scalars().all()}
+
+        details = {"scheduled_action_id": str(action["id"])}
+        for target, user in users.items():
+            error = mailcow_errors.get(target)
+            outcome: Dict[str, Any] = {"status": "succeeded"}
+            details_extra: Dict[str, Any] = {}
+
+            if action_type == "suspend":
+                # Same as the manual endpoint: suspend locally even if Mailcow fails
+                user.is_suspended = True
+                log_type = "user_suspended"
+            elif action_type == "unsuspend":
+                user.is_suspended = False
+                log_type = "user_unsuspended"
+            elif action_type == "quota_change":
+                if error:
+                    results[target] = {"status": "failed", "error": error}
+                    continue
+                quota_bytes = action_data["quota_bytes"]
+                mailbox = quota_rows.get(user.email)
+                if mailbox:
+                    mailbox.quota_bytes = quota_bytes
+                else:
+                    db.add(MailboxMetadata(email=user.email, user_id=user.id, quota_bytes=quota_bytes, usage_bytes=0))
+                log_type = "quota_updated"
+                details_extra = {"quota_bytes": quota_bytes, "quota_gb": quota_bytes / 1073741824}
+            elif action_type == "group_add":
+                if user.id in members:
+                    results[target] = {"status": "succeeded", "note": "Already a member"}
+                    continue
+                db.add(UserGroupMember(
+                    user_id=user.id,
+                    group_id=group_id,
+                    added_by=action["created_by"]
+                ))
+                log_type = "group_member_added"
+                details_extra = {"group_id": str(group_id)}
+            else:
+                log_type = "user_deleted"
+                details_extra = {"user_id": str(user.id), "first_name": user.first_name, "last_name": user.last_name}
+
+            if error:
+                outcome["warning"] = f"Mailcow: {error}"
+            log_sink.audit(
+                db,
+                action_type=log_type,
+                admin_email=admin_email,
+                target_user_email=user.email,
+                details={**details, **details_extra}
+            )
+            if action_type == "delete":
+                await db.delete(user)
+            results[target] = outcome
+
+        return results
+
+
+# Global runner instance
+scheduled_action_runner = ScheduledActionRunner(
+    poll_interval=settings.SCHEDULER_POLL_INTERVAL,
+    batch_size=settings.SCHEDULER_BATCH_SIZE,
+    lease_timeout=settings.SCHEDULER_LEASE_TIMEOUT,
+    max_attempts=settings.SCHEDULER_MAX_ATTEMPTS,
+)
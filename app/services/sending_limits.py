@@ -0,0 +1,448 @@
+"""
+Per-user sending quota enforcement.
+
+check_and_consume(user_id, n) decides from two in-memory token buckets per
+user, one holding up to hourly_limit tokens refilled over an hour and one
+holding up to daily_limit tokens refilled over a day. A decision for a user
+already in memory touches no database and takes microseconds.
+
+Every SENDING_LIMITS_RECONCILE_INTERVAL seconds the engine reconciles with
+email_sending_limits in batches:
+
+- sends counted since the last cycle are added to emails_sent_today /
+  emails_sent_this_hour with one upsert per batch (rolling the fixed
+  windows over via last_reset_date / last_reset_hour)
+- limits and is_sending_enabled are read back, and each bucket is capped at
+  what the shared counters leave, so sends through other workers count too
+- denials are written as SendingLimitViolation rows, at most one per user,
+  limit and window
+
+Workers enforce independently between cycles, so a user can overshoot by
+what the other workers still had in their buckets over one interval. Users
+idle for SENDING_LIMITS_IDLE_TTL are dropped from memory; admin changes are
+applied at once on the worker that made them (forget) and within one cycle
+elsewhere.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Union
+from uuid import UUID
+
+from sqlalchemy import insert, text
+
+from app.core.config import settings
+from app.db.session import engine
+from app.models.sending import SendingLimitViolation
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+
+# Model defaults, used for users without an email_sending_limits row
+DEFAULT_DAILY_LIMIT = 50
+DEFAULT_HOURLY_LIMIT = 10
+
+MAX_PENDING_VIOLATIONS = 10000
+
+SENDING_DISABLED = "sending_disabled"
+HOURLY_LIMIT = "hourly_limit"
+DAILY_LIMIT = "daily_limit"
+
+
+@dataclass
+class SendingDecision:
+    allowed: bool
+    reason: Optional[str] = None
+    retry_after: int = 0  # seconds until the request would fit; 0 if it never will
+
+
+class TokenBucket:
+    """Up to `capacity` tokens, refilled evenly over `window` seconds."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: int, window: int, tokens: float, now: float):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = min(max(tokens, 0.0), capacity)
+        self.updated = now
+
+    def refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def retry_after(self, n: int) -> int:
+        if n > self.capacity or self.rate <= 0:
+            return 0
+        return max(1, math.ceil((n - self.tokens) / self.rate))
+
+    def resize(self, capacity: int, window: int):
+        """Apply a new limit, keeping the tokens already used."""
+        if capacity != self.capacity:
+            self.tokens = min(max(self.tokens + capacity - self.capacity, 0.0), capacity)
+            self.capacity = capacity
+            self.rate = capacity / window
+
+    def cap(self, available: float):
+        self.tokens = min(self.tokens, max(available, 0.0))
+
+
+class _UserQuota:
+    __slots__ = ("enabled", "hourly", "daily", "pending", "last_used", "reported")
+
+    def __init__(self, enabled: bool, hourly: TokenBucket, daily: TokenBucket, now: float):
+        self.enabled = enabled
+        self.hourly = hourly
+        self.daily = daily
+        self.pending = 0  # sends not yet added to the shared counters
+        self.last_used = now
+        self.reported: Dict[str, int] = {}  # violation type -> window last reported
+
+
+# Window-adjusted view of one or more users' rows
+LOAD_SQL = text("""
+    SELECT user_id, daily_limit, hourly_limit, is_sending_enabled,
+           CASE WHEN last_reset_date = CURRENT_DATE THEN emails_sent_today ELSE 0 END AS sent_today,
+           CASE WHEN last_reset_hour >= date_trunc('hour', NOW()) THEN emails_sent_this_hour ELSE 0 END
+               AS sent_this_hour
+    FROM email_sending_limits
+    WHERE user_id = ANY(CAST(:user_ids AS uuid[]))
+""")
+
+# Adds a batch of send counts, starting new windows where the stored ones
+# have ended, and returns the same view as LOAD_SQL.
+RECONCILE_SQL = text("""
+    INSERT INTO email_sending_limits AS l (
+        id, user_id, daily_limit, hourly_limit, emails_sent_today, emails_sent_this_hour,
+        last_reset_date, last_reset_hour
+    )
+    SELECT uuid_generate_v4(), d.user_id, CAST(:default_daily AS integer),
+           CAST(:default_hourly AS integer), d.sent, d.sent,
+           CURRENT_DATE, date_trunc('hour', NOW())
+    FROM unnest(CAST(:user_ids AS uuid[]), CAST(:counts AS integer[])) AS d(user_id, sent)
+    ON CONFLICT (user_id) DO UPDATE SET
+        emails_sent_today = CASE WHEN l.last_reset_date = CURRENT_DATE
+                                 THEN l.emails_sent_today ELSE 0 END + EXCLUDED.emails_sent_today,
+        emails_sent_this_hour = CASE WHEN l.last_reset_hour >= date_trunc('hour', NOW())
+                                     THEN l.emails_sent_this_hour ELSE 0 END + EXCLUDED.emails_sent_this_hour,
+        last_reset_date = CURRENT_DATE,
+        last_reset_hour = date_trunc('hour', NOW()),
+        updated_at = NOW()
+    RETURNING l.user_id, l.daily_limit, l.hourly_limit, l.is_sending_enabled,
+              l.emails_sent_today AS sent_today, l.emails_sent_this_hour AS sent_this_hour
+""")
+
+# Zero counters whose window has ended, for users who stopped sending
+RESET_HOUR_SQL = text("""
+    UPDATE email_sending_limits
+    SET emails_sent_this_hour = 0, last_reset_hour = date_trunc('hour', NOW())
+    WHERE last_reset_hour < date_trunc('hour', NOW()) AND emails_sent_this_hour <> 0
+""")
+RESET_DAY_SQL = text("""
+    UPDATE email_sending_limits
+    SET emails_sent_today = 0, last_reset_date = CURRENT_DATE
+    WHERE last_reset_date < CURRENT_DATE AND emails_sent_today <> 0
+""")
+
+
+class SendingLimitEngine:
+    """In-memory token buckets reconciled to email_sending_limits."""
+
+    def __init__(self, reconcile_interval: float, batch_size: int, idle_ttl: float, lock_key: int):
+        self.reconcile_interval = reconcile_interval
+        self.batch_size = batch_size
+        self.idle_ttl = idle_ttl
+        self.lock_key = lock_key
+        self._users: Dict[UUID, _UserQuota] = {}
+        self._touched: Set[UUID] = set()
+        self._loading: Dict[UUID, asyncio.Task] = {}
+        self._violations: List[Dict[str, Any]] = []
+        self._reconcile_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._last_reset_hour: Optional[int] = None
+        self.allowed = 0
+        self.denied = 0
+        self.last_reconciled_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        """Start the background reconcile loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="sending-limits")
+
+    async def stop(self):
+        """Stop the loop and write out counts not yet reconciled."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if not (self._touched or self._violations):
+            return
+        try:
+            await self.reconcile()
+        except Exception as e:
+            logger.error(f"Final sending limit reconcile failed: {e}")
+
+    # ==================== Decisions ====================
+
+    async def check_and_consume(self, user_id: Union[UUID, str], n: int = 1) -> SendingDecision:
+        """Take n sends from the user's hourly and daily allowance, or refuse them all."""
+        if not isinstance(user_id, UUID):
+            user_id = UUID(str(user_id))
+        state = self._users.get(user_id)
+        if state is None:
+            state = await self._load(user_id)
+
+        now = time.monotonic()
+        state.last_used = now
+        self._touched.add(user_id)
+
+        if not state.enabled:
+            return self._deny(user_id, state, n, SENDING_DISABLED, None)
+
+        hourly, daily = state.hourly, state.daily
+        hourly.refill(now)
+        daily.refill(now)
+        if hourly.tokens < n:
+            return self._deny(user_id, state, n, HOURLY_LIMIT, hourly)
+        if daily.tokens < n:
+            return self._deny(user_id, state, n, DAILY_LIMIT, daily)
+
+        hourly.tokens -= n
+        daily.tokens -= n
+        state.pending += n
+        self.allowed += n
+        return SendingDecision(True)
+
+    def forget(self, user_id: Union[UUID, str]):
+        """Drop a user's state so the next decision reloads their row."""
+        user_id = UUID(str(user_id))
+        state = self._users.get(user_id)
+        if state is None:
+            return
+        if state.pending:
+            # Keep the unreconciled count; limits are refreshed next cycle
+            self._touched.add(user_id)
+        else:
+            del self._users[user_id]
+
+    def _deny(
+        self,
+        user_id: UUID,
+        state: _UserQuota,
+        n: int,
+        reason: str,
+        bucket: Optional[TokenBucket],
+    ) -> SendingDecision:
+        self.denied += n
+        window = int(time.time() // (HOUR if reason == HOURLY_LIMIT else DAY))
+        if state.reported.get(reason) != window and len(self._violations) < MAX_PENDING_VIOLATIONS:
+            state.reported[reason] = window
+            limit = bucket.capacity if bucket else 0
+            used = round(bucket.capacity - bucket.tokens) if bucket else 0
+            self._violations.append({
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "violation_type": reason,
+                "attempted_count": used + n,
+                "limit_at_time": limit,
+                "violation_details": {"requested": n, "worker_pid": os.getpid()},
+                "action_taken": "blocked",
+                "is_resolved": False,
+                "created_at": datetime.now(timezone.utc),
+            })
+        return SendingDecision(False, reason, bucket.retry_after(n) if bucket else 0)
+
+    # ==================== Loading ====================
+
+    async def _load(self, user_id: UUID) -> _UserQuota:
+        """Load a user's row once, however many requests are waiting for it."""
+        task = self._loading.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch([user_id]))
+            self._loading[user_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(user_id, None))
+
+        try:
+            rows = await asyncio.shield(task)
+        except Exception as e:
+            # Don't stop mail over a database hiccup; the next cycle corrects it
+            logger.warning(f"Sending limits for {user_id} unavailable, using defaults: {e}")
+            rows = {}
+
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._new_state(rows.get(user_id))
+            self._users[user_id] = state
+        return state
+
+    @staticmethod
+    async def _fetch(user_ids: List[UUID]) -> Dict[UUID, Any]:
+        async with engine.connect() as conn:
+            result = await conn.execute(LOAD_SQL, {"user_ids": user_ids})
+            return {row.user_id: row for row in result}
+
+    @staticmethod
+    def _limits(row) -> tuple:
+        if row is None:
+            return True, DEFAULT_HOURLY_LIMIT, DEFAULT_DAILY_LIMIT, 0, 0
+        return (
+            row.is_sending_enabled is not False,
+            DEFAULT_HOURLY_LIMIT if row.hourly_limit is None else row.hourly_limit,
+            DEFAULT_DAILY_LIMIT if row.daily_limit is None else row.daily_limit,
+            row.sent_this_hour or 0,
+            row.sent_today or 0,
+        )
+
+    def _new_state(self, row) -> _UserQuota:
+        enabled, hourly_limit, daily_limit, sent_hour, sent_day = self._limits(row)
+        now = time.monotonic()
+        return _UserQuota(
+            enabled,
+            TokenBucket(hourly_limit, HOUR, hourly_limit - sent_hour, now),
+            TokenBucket(daily_limit, DAY, daily_limit - sent_day, now),
+            now,
+        )
+
+    def _apply(self, state: _UserQuota, row):
+        """Adopt the shared limits and cap the buckets at what the counters leave."""
+        enabled, hourly_limit, daily_limit, sent_hour, sent_day = self._limits(row)
+        now = time.monotonic()
+        state.enabled = enabled
+        for bucket, limit, window, sent in (
+            (state.hourly, hourly_limit, HOUR, sent_hour),
+            (state.daily, daily_limit, DAY, sent_day),
+        ):
+            bucket.refill(now)
+            bucket.resize(limit, window)
+            # Sends made here since the snapshot are already off the bucket
+            bucket.cap(limit - sent - state.pending)
+
+    # ==================== Reconciliation ====================
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Sending limit reconcile failed: {e}")
+
+    async def reconcile(self):
+        """Write counts and violations, refresh touched users, evict idle ones."""
+        async with self._reconcile_lock:
+            touched, self._touched = self._touched, set()
+            try:
+                await self._sync_users(touched)
+                await self._write_violations()
+                await self._reset_expired_windows()
+            except BaseException:
+                self._touched |= touched
+                raise
+            self._evict_idle()
+            self.last_reconciled_at = datetime.now(timezone.utc)
+            self.last_error = None
+
+    async def _sync_users(self, touched: Set[UUID]):
+        user_ids = [user_id for user_id in touched if user_id in self._users]
+        for start in range(0, len(user_ids), self.batch_size):
+            batch = user_ids[start:start + self.batch_size]
+            deltas = {
+                user_id: self._users[user_id].pending
+                for user_id in batch if self._users[user_id].pending > 0
+            }
+            async with engine.begin() as conn:
+                rows = {}
+                if deltas:
+                    result = await conn.execute(RECONCILE_SQL, {
+                        "user_ids": list(deltas),
+                        "counts": list(deltas.values()),
+                        "default_daily": DEFAULT_DAILY_LIMIT,
+                        "default_hourly": DEFAULT_HOURLY_LIMIT,
+                    })
+                    rows.update((row.user_id, row) for row in result)
+                idle = [user_id for user_id in batch if user_id not in deltas]
+                if idle:
+                    result = await conn.execute(LOAD_SQL, {"user_ids": idle})
+                    rows.update((row.user_id, row) for row in result)
+
+            # Committed: those sends are now in the shared counters
+            for user_id in batch:
+                state = self._users.get(user_id)
+                if state is None:
+                    continue
+                state.pending -= deltas.get(user_id, 0)
+                self._apply(state, rows.get(user_id))
+
+    async def _write_violations(self):
+        if not self._violations:
+            return
+        violations, self._violations = self._violations, []
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(insert(SendingLimitViolation.__table__), violations)
+        except BaseException:
+            self._violations = (violations + self._violations)[:MAX_PENDING_VIOLATIONS]
+            raise
+
+    async def _reset_expired_windows(self):
+        """Once an hour, zero counters left over from ended windows (one worker does it)."""
+        hour = int(time.time() // HOUR)
+        if hour == self._last_reset_hour:
+            return
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": self.lock_key}
+            )
+            if result.scalar():
+                await conn.execute(RESET_HOUR_SQL)
+                await conn.execute(RESET_DAY_SQL)
+        self._last_reset_hour = hour
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        idle = [
+            user_id for user_id, state in self._users.items()
+            if state.last_used < cutoff and state.pending == 0
+        ]
+        for user_id in idle:
+            del self._users[user_id]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.SENDING_LIMITS_ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "worker_pid": os.getpid(),
+            "users_tracked": len(self._users),
+            "unreconciled_sends": sum(state.pending for state in self._users.values()),
+            "pending_violations": len(self._violations),
+            "allowed": self.allowed,
+            "denied": self.denied,
+            "reconcile_interval_seconds": self.reconcile_interval,
+            "last_reconciled_at": self.last_reconciled_at.isoformat() if self.last_reconciled_at else None,
+            "last_error": self.last_error,
+        }
+
+
+# Global engine instance
+sending_limit_engine = SendingLimitEngine(
+    reconcile_interval=settings.SENDING_LIMITS_RECONCILE_INTERVAL,
+    batch_size=settings.SENDING_LIMITS_BATCH_SIZE,
+    idle_ttl=settings.SENDING_LIMITS_IDLE_TTL,
+    lock_key=settings.SENDING_LIMITS_LOCK_KEY,
+)
@@ -0,0 +1,201 @@
+"""
+Admin dashboard statistics.
+
+Each dashboard is computed in a single statement: per-table counts use
+count(*) FILTER (WHERE ...) so the table is scanned once, and counts from
+other tables are folded in as scalar subqueries. Results are cached
+per-process for STATS_CACHE_TTL seconds; after that they are served stale for
+up to STATS_CACHE_STALE_TTL more seconds while one background task refreshes
+them, so dashboard polling never waits on the database once warm.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select, func, and_, true
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.models.mailbox import MailboxMetadata
+from app.models.support import SupportTicket
+from app.models.sending import EmailSendingLimit, SendingLimitViolation
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidateCache:
+    """Per-process TTL cache that serves stale values while refreshing."""
+
+    def __init__(self):
+        # key -> (fresh_until, stale_until, value)
+        self._entries: Dict[str, Tuple[float, float, Any]] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    async def get(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None
+    ) -> Any:
+        ttl = settings.STATS_CACHE_TTL if ttl is None else ttl
+        stale_ttl = settings.STATS_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        if ttl <= 0:
+            return await loader()
+
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            fresh_until, stale_until, value = entry
+            if now < fresh_until:
+                return value
+            if now < stale_until:
+                self._refresh(key, loader, ttl, stale_ttl)
+                return value
+
+        # Nothing usable cached: wait for the (shared) refresh
+        return await asyncio.shield(self._refresh(key, loader, ttl, stale_ttl))
+
+    def _refresh(self, key, loader, ttl, stale_ttl) -> asyncio.Task:
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, ttl, stale_ttl))
+            # Background refreshes may have no awaiter; their errors are logged in _load
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._refreshing[key] = task
+        return task
+
+    async def _load(self, key, loader, ttl, stale_ttl) -> Any:
+        try:
+            value = await loader()
+        except Exception as e:
+            logger.warning(f"Stats refresh for {key} failed: {e}")
+            raise
+        finally:
+            self._refreshing.pop(key, None)
+        now = time.monotonic()
+        self._entries[key] = (now + ttl, now + ttl + stale_ttl, value)
+        return value
+
+    def invalidate(self, key: Optional[str] = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+stats_cache = StaleWhileRevalidateCache()
+
+
+# ==================== Queries ====================
+
+async def _fetch_one(query) -> Any:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(query)
+        return result.one()
+
+
+def _count_where(*conditions):
+    return func.count().filter(and_(*conditions))
+
+
+async def _load_activity_stats() -> Dict[str, int]:
+    now = datetime.utcnow()
+    seven_days_ago = now - timedelta(days=7)
+    thirty_days_ago = now - timedelta(days=30)
+    sixty_days_ago = now - timedelta(days=60)
+    ninety_days_ago = now - timedelta(days=90)
+
+    row = await _fetch_one(
+        select(
+            func.count().label("total_users"),
+            _count_where(User.last_login >= seven_days_ago).label("active_last_7_days"),
+            _count_where(User.last_login >= thirty_days_ago).label("active_last_30_days"),
+            _count_where(
+                User.last_login < thirty_days_ago, User.last_login >= sixty_days_ago
+            ).label("inactive_30_days"),
+            _count_where(
+                User.last_login < sixty_days_ago, User.last_login >= ninety_days_ago
+            ).label("inactive_60_days"),
+            _count_where(User.last_login < ninety_days_ago).label("inactive_90_days"),
+            _count_where(User.last_login.is_(None)).label("never_logged_in"),
+        ).select_from(User)
+    )
+    return dict(row._mapping)
+
+
+async def _load_admin_stats() -> Dict[str, int]:
+    now = datetime.utcnow()
+    today_start = datetime.combine(now.date(), datetime.min.time())
+    week_ago = now - timedelta(days=7)
+
+    users = select(
+        func.count().label("total_users"),
+        _count_where(User.is_suspended == False).label("active_users"),
+        _count_where(User.created_at >= today_start).label("new_users_today"),
+        _count_where(User.created_at >= week_ago).label("new_users_this_week"),
+    ).select_from(User).subquery()
+    storage = select(
+        func.coalesce(func.sum(MailboxMetadata.usage_bytes), 0).label("total_storage_used"),
+        func.coalesce(func.sum(MailboxMetadata.quota_bytes), 0).label("total_storage_allocated"),
+    ).subquery()
+    pending_tickets = (
+        select(func.count())
+        .select_from(SupportTicket)
+        .where(SupportTicket.status == "pending")
+        .scalar_subquery()
+    )
+
+    # Both subqueries return exactly one row, so the cross join is one row
+    row = await _fetch_one(
+        select(users, storage, pending_tickets.label("pending_tickets"))
+        .select_from(users.join(storage, true()))
+    )
+    stats = dict(row._mapping)
+    stats["suspended_users"] = stats["total_users"] - stats["active_users"]
+    return stats
+
+
+async def _load_sending_stats() -> Dict[str, int]:
+    sent = EmailSendingLimit.emails_sent_today
+    limit = EmailSendingLimit.daily_limit
+
+    active_violations = (
+        select(func.count())
+        .select_from(SendingLimitViolation)
+        .where(SendingLimitViolation.is_resolved == False)
+        .scalar_subquery()
+    )
+
+    row = await _fetch_one(
+        select(
+            func.coalesce(func.sum(sent), 0).label("total_sent_today"),
+            _count_where(sent >= limit).label("users_at_limit"),
+            _count_where(sent >= limit * 0.8, sent < limit).label("users_near_limit"),
+            active_violations.label("active_violations"),
+            func.count(EmailSendingLimit.id).label("total_users"),
+            _count_where(EmailSendingLimit.tier_name == "free").label("revenue_opportunity_count"),
+        ).select_from(EmailSendingLimit)
+    )
+    return dict(row._mapping)
+
+
+# ==================== Public API ====================
+
+async def get_activity_stats() -> Dict[str, int]:
+    """User login activity buckets for /admin/activity/stats."""
+    return await stats_cache.get("activity", _load_activity_stats)
+
+
+async def get_admin_stats() -> Dict[str, int]:
+    """Headline numbers for the admin dashboard (/admin/stats)."""
+    return await stats_cache.get("admin", _load_admin_stats)
+
+
+async def get_sending_stats() -> Dict[str, int]:
+    """Sending limit overview for /admin/sending/stats."""
+    return await stats_cache.get("sending", _load_sending_stats)
@@ -0,0 +1,103 @@
+"""
+Ranked fuzzy user search.
+
+Backed by pg_trgm GIN indexes on users_extended.email/first_name/last_name
+(see scripts/run_migration.py). Candidates are selected with the trigram
+similarity operator so the indexes are used, then ranked by the best
+similarity across fields with a boost for email local parts that start with
+the search term.
+
+Terms shorter than MIN_TRIGRAM_TERM_LENGTH yield no trigrams, so they are
+served as prefix matches from the lower(email) COLLATE "C" btree in email
+order instead; only the returned rows are scored.
+"""
+
+from typing import List, Dict, Any
+
+from sqlalchemy import select, func, or_, case, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+
+# Score added when the email local part starts with the term, so that
+# "jo" ranks john@... above a similar-looking last name.
+LOCAL_PART_PREFIX_BOOST = 1.0
+
+# Trigram matching needs at least this many characters to be selective;
+# shorter terms only match as email prefixes.
+MIN_TRIGRAM_TERM_LENGTH = 3
+
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE wildcards in user input."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_user_search_query(term: str, limit: int = 20):
+    """Build the ranked search query for a normalized, non-empty term."""
+    prefix = f"{_escape_like(term)}%"
+    local_part = func.split_part(User.email, "@", 1)
+    full_name = User.first_name + literal(" ") + User.last_name
+
+    score = (
+        func.greatest(
+            func.similarity(User.email, term),
+            func.similarity(User.first_name, term),
+            func.similarity(User.last_name, term),
+            func.similarity(full_name, term),
+        )
+        + case((local_part.ilike(prefix, escape="\\"), LOCAL_PART_PREFIX_BOOST), else_=0.0)
+    ).label("score")
+
+    email_lower = func.lower(User.email).collate("C")
+    email_prefix = email_lower.like(prefix, escape="\\")
+    query = select(
+        User.id,
+        User.email,
+        User.first_name,
+        User.last_name,
+        User.is_suspended,
+        score,
+    )
+
+    if len(term) < MIN_TRIGRAM_TERM_LENGTH:
+        # Walk the pattern index in order and stop at `limit` rows
+        return (
+            query
+            .where(email_prefix)
+            .order_by(email_lower)
+            .limit(limit)
+        )
+
+    return (
+        query
+        .where(or_(
+            email_prefix,
+            User.email.op("%")(term),
+            User.first_name.op("%")(term),
+            User.last_name.op("%")(term),
+        ))
+        .order_by(score.desc(), User.email)
+        .limit(limit)
+    )
+
+
+async def search_users(db: AsyncSession, term: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Return the top `limit` users matching `term`, best match first."""
+    term = term.strip().lower()
+    if not term:
+        return []
+
+    result = await db.execute(build_user_search_query(term, limit))
+
+    return [
+        {
+            "id": str(row.id),
+            "email": row.email,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "is_suspended": row.is_suspended,
+            "score": round(float(row.score), 4),
+        }
+        for row in result.all()
+    ]
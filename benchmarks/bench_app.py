@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Load-test the application end to end against a fake Mailcow.
+
+Boots the app in-process with uvicorn (or targets an already running one
+with --url), backed by the database from .env and a FakeMailcowServer, and
+drives scripted scenarios, reporting throughput and p50/p95/p99 latency:
+
+    login      concurrent user logins (bcrypt bound)
+    dashboard  admin dashboard, stats, user list and audit log reads
+    suspend    bulk suspend then unsuspend jobs, polled until finished
+    sync       full Mailcow -> local mailbox sync
+
+--seed-users seeds users (all sharing one password), their mailbox metadata
+and --logins-per-user rows of login history under load.afrimail.test, plus
+a bench admin. Results can be saved and compared against a baseline, which
+exits non-zero on regressions.
+
+Run against a disposable database (DATABASE_URL from .env):
+    python benchmarks/bench_app.py --seed-users 100000 --logins-per-user 5
+    python benchmarks/bench_app.py --scenarios login,dashboard --concurrency 32 --save baseline.json
+    python benchmarks/bench_app.py --compare baseline.json --tolerance 0.2
+    python benchmarks/bench_app.py --cleanup
+
+With --url the fake Mailcow listens on --mailcow-port; start the app with
+MAILCOW_API_URL=http://127.0.0.1:<port>/api/v1, MAILCOW_API_KEY=bench and
+RATE_LIMIT_ENABLED=false.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_mailcow import FakeMailcowServer
+
+BENCH_DOMAIN = "load.afrimail.test"
+BENCH_PASSWORD = "Bench-password-1"
+BENCH_ADMIN = f"admin@{BENCH_DOMAIN}"
+SEED_BATCH = 100_000
+
+SCENARIOS = ("login", "dashboard", "suspend", "sync")
+DASHBOARD_PATHS = [
+    "/admin/stats",
+    "/admin/activity/stats",
+    "/admin/sending-limits/stats",
+    "/admin/users?page_size=50",
+    "/admin/audit-logs?limit=50",
+]
+
+FIRST_NAMES = [
+    "amara", "kwame", "chidi", "zanele", "thabo", "fatima", "kofi", "ayodele",
+    "nia", "tendai", "sipho", "abena", "jabari", "imani", "lindiwe", "oluwaseun",
+]
+LAST_NAMES = [
+    "okafor", "mensah", "ndlovu", "diallo", "mwangi", "abebe", "banda", "kamara",
+    "nkosi", "otieno", "adeyemi", "traore", "moyo", "asante", "keita", "dlamini",
+]
+
+
+def bench_email(n: int) -> str:
+    return f"user{n}@{BENCH_DOMAIN}"
+
+
+# ==================== Seeding ====================
+
+async def seed(users: int, logins_per_user: int):
+    """Seed users, mailbox metadata, login history and the bench admin."""
+    from sqlalchemy import text
+    from app.core.security import get_password_hash
+    from app.db.session import engine
+
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    print(f"Seeding {users:,} users, {users * logins_per_user:,} logins under {BENCH_DOMAIN}...")
+    start = time.perf_counter()
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("""
+                INSERT INTO admin_users (id, email, password_hash, name, is_active)
+                VALUES (gen_random_uuid(), :email, :hash, 'Bench Admin', TRUE)
+                ON CONFLICT (email) DO UPDATE SET password_hash = EXCLUDED.password_hash, is_active = TRUE
+            """),
+            {"email": BENCH_ADMIN, "hash": password_hash}
+        )
+
+    for first in range(1, users + 1, SEED_BATCH):
+        last = min(users, first + SEED_BATCH - 1)
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("""
+                    INSERT INTO users_extended (id, email, first_name, last_name, is_suspended,
+                                                failed_login_attempts, password_hash, created_at, updated_at)
+                    SELECT
+                        gen_random_uuid(),
+                        'user' || n || '@' || :domain,
+                        initcap(f[1 + n % cardinality(f)]),
+                        initcap(l[1 + (n / 16) % cardinality(l)]),
+                        FALSE,
+                        0,
+                        :hash,
+                        now() - make_interval(secs => n),
+                        now()
+                    FROM generate_series(CAST(:first AS int), CAST(:last AS int)) AS n,
+                         (SELECT CAST(:first_names AS text[]) AS f, CAST(:last_names AS text[]) AS l) AS names
+                    ON CONFLICT (email) DO NOTHING
+                """),
+                {
+                    "domain": BENCH_DOMAIN, "hash": password_hash, "first": first, "last": last,
+                    "first_names": FIRST_NAMES, "last_names": LAST_NAMES,
+                }
+            )
+            await conn.execute(
+                text("""
+                    INSERT INTO mailbox_metadata (id, email, user_id, quota_bytes, usage_bytes)
+                    SELECT gen_random_uuid(), u.email, u.id, 5368709120, (random() * 1073741824)::bigint
+                    FROM users_extended u
+                    WHERE u.email IN (
+                        SELECT 'user' || n || '@' || :domain
+                        FROM generate_series(CAST(:first AS int), CAST(:last AS int)) AS n
+                    )
+                    ON CONFLICT (email) DO NOTHING
+                """),
+                {"domain": BENCH_DOMAIN, "first": first, "last": last}
+            )
+            if logins_per_user:
+                await conn.execute(
+                    text("""
+                        INSERT INTO login_activity (id, user_email, login_time, ip_address,
+                                                    user_agent, success, created_at)
+                        SELECT
+                            gen_random_uuid(),
+                            'user' || n || '@' || :domain,
+                            now() - random() * interval '90 days',
+                            '10.' || (n % 250) || '.' || (k % 250) || '.' || (n * k % 250),
+                            'bench',
+                            random() > 0.1,
+                            now()
+                        FROM generate_series(CAST(:first AS int), CAST(:last AS int)) AS n,
+                             generate_series(1, CAST(:per_user AS int)) AS k
+                    """),
+                    {"domain": BENCH_DOMAIN, "first": first, "last": last, "per_user": logins_per_user}
+                )
+        print(f"  {last:,} / {users:,}")
+
+    async with engine.begin() as conn:
+        for table in ("users_extended", "mailbox_metadata", "login_activity"):
+            await conn.execute(text(f"ANALYZE {table}"))
+    print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+
+async def cleanup():
+    """Remove everything seeded or created by the scenarios."""
+    from sqlalchemy import text
+    from app.db.session import engine
+
+    pattern = f"%@{BENCH_DOMAIN}"
+    async with engine.begin() as conn:
+        for statement in (
+            "DELETE FROM login_activity WHERE user_email LIKE :pattern",
+            "DELETE FROM audit_logs WHERE admin_email LIKE :pattern",
+            "DELETE FROM bulk_jobs WHERE admin_email LIKE :pattern",
+            "DELETE FROM mailbox_metadata WHERE email LIKE :pattern",
+            "DELETE FROM users_extended WHERE email LIKE :pattern",
+            "DELETE FROM admin_users WHERE email LIKE :pattern",
+        ):
+            result = await conn.execute(text(statement), {"pattern": pattern})
+            print(f"{statement.split(' WHERE')[0]}: {result.rowcount:,} rows")
+
+
+async def seeded_user_count() -> int:
+    from sqlalchemy import text
+    from app.db.session import engine
+
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text("SELECT count(*) FROM users_extended WHERE email LIKE :pattern"),
+            {"pattern": f"user%@{BENCH_DOMAIN}"}
+        )
+        return result.scalar()
+
+
+async def seeded_user_ids(limit: int) -> List[str]:
+    from sqlalchemy import text
+    from app.db.session import engine
+
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text("SELECT id FROM users_extended WHERE email LIKE :pattern ORDER BY created_at DESC LIMIT :limit"),
+            {"pattern": f"user%@{BENCH_DOMAIN}", "limit": limit}
+        )
+        return [str(row[0]) for row in result]
+
+
+# ==================== Load Driver ====================
+
+@dataclass
+class ScenarioResult:
+    name: str
+    timings: List[float] = field(default_factory=list)  # milliseconds
+    errors: int = 0
+    elapsed: float = 0.0
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, float]:
+        timings = sorted(self.timings) or [0.0]
+        if len(timings) >= 2:
+            q = statistics.quantiles(timings, n=100)
+            p50, p95, p99 = q[49], q[94], q[98]
+        else:
+            p50 = p95 = p99 = timings[0]
+        return {
+            "requests": len(self.timings),
+            "errors": self.errors,
+            "throughput": len(self.timings) / self.elapsed if self.elapsed else 0.0,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "max_ms": timings[-1],
+            **self.extra,
+        }
+
+
+async def drive(
+    name: str,
+    call: Callable[[int], Awaitable[httpx.Response]],
+    total: int,
+    concurrency: int,
+) -> ScenarioResult:
+    """Run `total` calls with at most `concurrency` in flight."""
+    result = ScenarioResult(name)
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await call(index)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            result.timings.append((time.perf_counter() - started) * 1000)
+            if not ok:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def admin_token(client: httpx.AsyncClient) -> str:
+    response = await client.post("/admin/auth/login", json={"email": BENCH_ADMIN, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["token"]
+
+
+# ==================== Scenarios ====================
+
+async def scenario_login(client, args, users: int) -> ScenarioResult:
+    async def call(_):
+        email = bench_email(random.randint(1, users))
+        return await client.post("/api/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+    return await drive("login", call, args.requests, args.concurrency)
+
+
+async def scenario_dashboard(client, args, users: int) -> ScenarioResult:
+    headers = {"Authorization": f"Bearer {await admin_token(client)}"}
+
+    async def call(index):
+        return await client.get(DASHBOARD_PATHS[index % len(DASHBOARD_PATHS)], headers=headers)
+    return await drive("dashboard", call, args.requests, args.concurrency)
+
+
+async def _run_job(client, headers, path: str, ids: List[str]) -> Optional[float]:
+    """Queue a bulk job and wait for it; returns its duration or None on failure."""
+    started = time.perf_counter()
+    response = await client.post(path, json={"user_ids": ids}, headers=headers)
+    if response.status_code >= 400:
+        return None
+    job_id = response.json()["job_id"]
+    while True:
+        await asyncio.sleep(0.2)
+        job = (await client.get(f"/admin/jobs/{job_id}?errors_limit=0", headers=headers)).json()
+        if job["status"] in ("completed", "partial", "failed", "cancelled"):
+            elapsed = time.perf_counter() - started
+            return elapsed if job["status"] in ("completed", "partial") else None
+
+
+async def scenario_suspend(client, args, users: int) -> ScenarioResult:
+    headers = {"Authorization": f"Bearer {await admin_token(client)}"}
+    ids = await seeded_user_ids(args.bulk_size)
+    result = ScenarioResult("suspend")
+    processed = 0
+
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for path in ("/admin/users/bulk/suspend", "/admin/users/bulk/unsuspend"):
+            duration = await _run_job(client, headers, path, ids)
+            if duration is None:
+                result.errors += 1
+                continue
+            result.timings.append(duration * 1000)
+            processed += len(ids)
+    result.elapsed = time.perf_counter() - started
+    result.extra["items_per_sec"] = processed / result.elapsed if result.elapsed else 0.0
+    return result
+
+
+async def scenario_sync(client, args, users: int) -> ScenarioResult:
+    headers = {"Authorization": f"Bearer {await admin_token(client)}"}
+
+    async def call(_):
+        return await client.post("/admin/mailcow/sync/mailboxes", headers=headers, timeout=600)
+    result = await drive("sync", call, args.rounds, 1)
+    result.extra["mailboxes"] = args.mailcow_mailboxes
+    return result
+
+
+SCENARIO_FUNCS = {
+    "login": scenario_login,
+    "dashboard": scenario_dashboard,
+    "suspend": scenario_suspend,
+    "sync": scenario_sync,
+}
+
+
+# ==================== Reporting ====================
+
+def report(results: List[ScenarioResult]) -> Dict[str, Dict[str, float]]:
+    summaries = {}
+    for result in results:
+        s = summaries[result.name] = result.summary()
+        extra = "  ".join(f"{k} {v:,.1f}" for k, v in result.extra.items())
+        print(
+            f"{result.name:<10} {s['requests']:>6} calls  {s['throughput']:8.1f}/s  "
+            f"p50 {s['p50_ms']:8.1f}ms  p95 {s['p95_ms']:8.1f}ms  p99 {s['p99_ms']:8.1f}ms  "
+            f"max {s['max_ms']:8.1f}ms  errors {s['errors']}  {extra}"
+        )
+    return summaries
+
+
+def compare(summaries: Dict[str, Dict[str, float]], baseline_path: str, tolerance: float) -> bool:
+    """Print regressions against a saved baseline; returns False if any."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    ok = True
+    for name, current in summaries.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            print(f"REGRESSION {name}: p95 {base['p95_ms']:.1f}ms -> {current['p95_ms']:.1f}ms")
+            ok = False
+        if base["throughput"] and current["throughput"] < base["throughput"] * (1 - tolerance):
+            print(f"REGRESSION {name}: throughput {base['throughput']:.1f}/s -> {current['throughput']:.1f}/s")
+            ok = False
+        if current["errors"] > base["errors"]:
+            print(f"REGRESSION {name}: errors {base['errors']} -> {current['errors']}")
+            ok = False
+    print("No regressions against baseline" if ok else f"Regressions beyond {tolerance:.0%} tolerance")
+    return ok
+
+
+# ==================== Main ====================
+
+async def start_app():
+    """Serve app.main:app in this process, lifespan included."""
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", help="Target a running app instead of booting one in-process")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset to run")
+    parser.add_argument("--seed-users", type=int, default=0, help="Seed this many users first")
+    parser.add_argument("--logins-per-user", type=int, default=0, help="Login history rows seeded per user")
+    parser.add_argument("--requests", type=int, default=500, help="Calls per login/dashboard scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Calls in flight")
+    parser.add_argument("--bulk-size", type=int, default=1000, help="Users per bulk suspend job")
+    parser.add_argument("--rounds", type=int, default=3, help="Bulk job / sync repetitions")
+    parser.add_argument("--mailcow-mailboxes", type=int, default=0,
+                        help="Mailboxes served by the fake Mailcow (default: all seeded users)")
+    parser.add_argument("--mailcow-port", type=int, default=0, help="Fake Mailcow port (0: any free port)")
+    parser.add_argument("--mailcow-latency", type=float, default=0.02, help="Seconds per fake Mailcow call")
+    parser.add_argument("--mailcow-jitter", type=float, default=0.01)
+    parser.add_argument("--mailcow-failure-rate", type=float, default=0.0)
+    parser.add_argument("--mailcow-error-rate", type=float, default=0.0)
+    parser.add_argument("--save", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95/throughput regression")
+    parser.add_argument("--cleanup", action="store_true", help="Delete seeded data and exit")
+    args = parser.parse_args()
+
+    selected = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    mailcow = FakeMailcowServer(
+        port=args.mailcow_port or (8081 if args.url else 0),
+        latency=args.mailcow_latency,
+        jitter=args.mailcow_jitter,
+        failure_rate=args.mailcow_failure_rate,
+        error_rate=args.mailcow_error_rate,
+    )
+    mailcow.start_in_thread()
+
+    # Settings are read on import: point the app at the fake before importing it
+    os.environ["MAILCOW_API_URL"] = mailcow.api_url
+    os.environ["MAILCOW_API_KEY"] = mailcow.api_key
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ.setdefault("MAILCOW_CACHE_ENABLED", "false")
+    from app.db.session import engine
+
+    server = task = None
+    exit_code = 0
+    try:
+        if args.cleanup:
+            await cleanup()
+            return 0
+        if args.seed_users:
+            await seed(args.seed_users, args.logins_per_user)
+
+        users = await seeded_user_count()
+        if not users:
+            print("No seeded users; run with --seed-users first")
+            return 1
+        args.mailcow_mailboxes = min(args.mailcow_mailboxes or users, users)
+        mailcow.seed_mailboxes([bench_email(n) for n in range(1, args.mailcow_mailboxes + 1)])
+        print(f"{users:,} seeded users; fake Mailcow at {mailcow.api_url} serving {args.mailcow_mailboxes:,} mailboxes")
+
+        if args.url:
+            base_url = args.url
+        else:
+            server, task, base_url = await start_app()
+
+        results = []
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            for name in selected:
+                results.append(await SCENARIO_FUNCS[name](client, args, users))
+
+        summaries = report(results)
+        print(f"Fake Mailcow calls: {dict(mailcow.calls.most_common())}")
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(summaries, f, indent=2)
+            print(f"Saved results to {args.save}")
+        if args.compare and not compare(summaries, args.compare, args.tolerance):
+            exit_code = 1
+    finally:
+        if server:
+            server.should_exit = True
+            await task
+        await engine.dispose()
+        mailcow.stop_thread()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
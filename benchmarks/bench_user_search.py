@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark ranked fuzzy user search against a seeded users_extended table.
+
+Seeds synthetic users (domain bench.afrimail.test) with generate_series,
+ensures the pg_trgm indexes exist, then times app.services.user_search for a
+set of realistic terms and reports p50/p95/p99 latency.
+
+Run against a disposable database (DATABASE_URL from .env):
+    python benchmarks/bench_user_search.py --rows 1000000
+    python benchmarks/bench_user_search.py --cleanup
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import engine, AsyncSessionLocal
+from app.services.user_search import search_users
+
+BENCH_DOMAIN = "bench.afrimail.test"
+
+FIRST_NAMES = [
+    "amara", "kwame", "chidi", "zanele", "thabo", "fatima", "kofi", "ayodele",
+    "nia", "tendai", "sipho", "abena", "jabari", "imani", "lindiwe", "oluwaseun",
+]
+LAST_NAMES = [
+    "okafor", "mensah", "ndlovu", "diallo", "mwangi", "abebe", "banda", "kamara",
+    "nkosi", "otieno", "adeyemi", "traore", "moyo", "asante", "keita", "dlamini",
+]
+
+SEARCH_TERMS = ["amara", "okaf", "kwame mensah", "ndlov", "th", "zanele.d", "okafor12345", "mwangi"]
+
+
+async def seed(rows: int):
+    """Insert synthetic users in a single set-based statement."""
+    print(f"Seeding {rows:,} users into users_extended...")
+    start = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(
+            text("""
+                INSERT INTO users_extended (id, email, first_name, last_name, is_suspended,
+                                            failed_login_attempts, created_at, updated_at)
+                SELECT
+                    gen_random_uuid(),
+                    f[1 + n % cardinality(f)] || '.' || l[1 + (n / 16) % cardinality(l)]
+                        || n || '@' || :domain,
+                    initcap(f[1 + n % cardinality(f)]),
+                    initcap(l[1 + (n / 16) % cardinality(l)]),
+                    n % 50 = 0,
+                    0,
+                    now() - make_interval(secs => n),
+                    now()
+                FROM generate_series(1, :rows) AS n,
+                     (SELECT CAST(:first AS text[]) AS f, CAST(:last AS text[]) AS l) AS names
+                ON CONFLICT (email) DO NOTHING
+            """),
+            {"first": FIRST_NAMES, "last": LAST_NAMES, "domain": BENCH_DOMAIN, "rows": rows}
+        )
+        for column in ("email", "first_name", "last_name"):
+            await conn.execute(text(f"""
+                CREATE INDEX IF NOT EXISTS idx_users_extended_{column}_trgm
+                ON users_extended USING GIN ({column} gin_trgm_ops)
+            """))
+        await conn.execute(text("ANALYZE users_extended"))
+    print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+
+async def cleanup():
+    """Remove seeded users."""
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text("DELETE FROM users_extended WHERE email LIKE :pattern"),
+            {"pattern": f"%@{BENCH_DOMAIN}"}
+        )
+    print(f"Removed {result.rowcount:,} seeded users")
+
+
+async def run(iterations: int, limit: int):
+    timings = []
+    async with AsyncSessionLocal() as db:
+        # Warm the connection and index pages
+        for term in SEARCH_TERMS:
+            await search_users(db, term, limit)
+
+        for _ in range(iterations):
+            for term in SEARCH_TERMS:
+                start = time.perf_counter()
+                await search_users(db, term, limit)
+                timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    quantiles = statistics.quantiles(timings, n=100)
+    print(
+        f"{len(timings)} searches: p50 {quantiles[49]:.2f}ms  "
+        f"p95 {quantiles[94]:.2f}ms  p99 {quantiles[98]:.2f}ms  max {timings[-1]:.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=0, help="Seed this many users first")
+    parser.add_argument("--iterations", type=int, default=50, help="Passes over the term list")
+    parser.add_argument("--limit", type=int, default=20, help="Top-N results per search")
+    parser.add_argument("--cleanup", action="store_true", help="Delete seeded users and exit")
+    args = parser.parse_args()
+
+    try:
+        if args.cleanup:
+            await cleanup()
+            return
+        if args.rows:
+            await seed(args.rows)
+        await run(args.iterations, args.limit)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Mailcow API.
+
+Serves the /api/v1 endpoints app.services.mailcow uses from in-memory state:
+get/status/containers, get/domain/all, get/mailbox/{all,<domain>,<email>},
+add/edit/delete mailbox and get/add/edit/delete alias. Every request waits
+--latency seconds (plus up to --jitter), a --failure-rate fraction of
+requests get HTTP 500, and an --error-rate fraction of write items are
+rejected with a Mailcow "danger" message.
+
+Usage:
+    python benchmarks/fake_mailcow.py --port 8081 --mailboxes 10000 --latency 0.02
+    # then run the app with MAILCOW_API_URL=http://127.0.0.1:8081/api/v1
+
+or in-process:
+    server = FakeMailcowServer(latency=0.02)
+    server.seed_mailboxes(emails)
+    server.start_in_thread()
+    ...
+    server.stop_thread()
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+DEFAULT_QUOTA_MB = 5120
+
+
+class FakeMailcowServer:
+    """In-memory Mailcow API with configurable latency and failures."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        error_rate: float = 0.0,
+        api_key: str = "bench",
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.error_rate = error_rate
+        self.api_key = api_key
+        self.mailboxes: Dict[str, Dict[str, Any]] = {}
+        self.aliases: Dict[int, Dict[str, Any]] = {}
+        self.calls: Counter = Counter()
+        self._next_alias_id = 1
+        self._server: Optional[uvicorn.Server] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.app = Starlette(routes=[
+            Route("/api/v1/{path:path}", self._dispatch, methods=["GET", "POST"]),
+        ])
+
+    @property
+    def api_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/v1"
+
+    # ==================== State ====================
+
+    def seed_mailboxes(self, emails: List[str], quota_mb: int = DEFAULT_QUOTA_MB):
+        """Create mailboxes with random usage."""
+        now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        for email in emails:
+            local_part, domain = email.split("@", 1)
+            self.mailboxes[email] = {
+                "username": email,
+                "local_part": local_part,
+                "domain": domain,
+                "name": local_part.replace(".", " ").title(),
+                "quota": quota_mb * 1024 * 1024,
+                "quota_used": random.randint(0, quota_mb * 1024 * 1024 // 4),
+                "messages": random.randint(0, 5000),
+                "active": 1,
+                "last_imap_login": 0,
+                "last_smtp_login": 0,
+                "last_pop3_login": 0,
+                "created": now,
+                "modified": now,
+            }
+
+    # ==================== Lifecycle ====================
+
+    async def start(self):
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                self._task.result()
+            await asyncio.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.should_exit = True
+            await self._task
+            self._server = None
+
+    def start_in_thread(self):
+        """Run the server on its own event loop in a daemon thread."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="fake-mailcow", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop_thread(self):
+        if self._thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    # ==================== Request Handling ====================
+
+    async def _dispatch(self, request: Request) -> Response:
+        if request.headers.get("X-API-Key") != self.api_key:
+            return JSONResponse({"type": "error", "msg": "authentication failed"}, status_code=401)
+
+        path = request.path_params["path"].strip("/")
+        parts = path.split("/")
+        self.calls["/".join(parts[:2])] += 1
+
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.failure_rate and random.random() < self.failure_rate:
+            return JSONResponse({"type": "error", "msg": "internal error"}, status_code=500)
+
+        if request.method == "GET":
+            return JSONResponse(self._get(parts))
+
+        body = await request.body()
+        data = json.loads(body) if body else {}
+        handler = {
+            "add/mailbox": self._add_mailbox,
+            "edit/mailbox": self._edit_mailbox,
+            "delete/mailbox": self._delete_mailbox,
+            "add/alias": self._add_alias,
+            "edit/alias": self._edit_alias,
+            "delete/alias": self._delete_alias,
+        }.get("/".join(parts[:2]))
+        if handler is None:
+            return JSONResponse({"type": "error", "msg": f"unknown endpoint {path}"}, status_code=404)
+        return JSONResponse(handler(data))
+
+    def _get(self, parts: List[str]) -> Any:
+        kind = parts[1] if len(parts) > 1 else ""
+        arg = parts[2] if len(parts) > 2 else "all"
+
+        if kind == "status":
+            return {"postfix-mailcow": {"state": "running"}, "dovecot-mailcow": {"state": "running"}}
+        if kind == "domain":
+            domains = Counter(mb["domain"] for mb in self.mailboxes.values())
+            rows = [{"domain_name": d, "mboxes_in_domain": n, "active": 1} for d, n in domains.items()]
+            return rows if arg == "all" else next((r for r in rows if r["domain_name"] == arg), {})
+        if kind == "mailbox":
+            if arg == "all":
+                return list(self.mailboxes.values())
+            if "@" in arg:
+                return self.mailboxes.get(arg, {})
+            return [mb for mb in self.mailboxes.values() if mb["domain"] == arg]
+        if kind == "alias":
+            if arg == "all":
+                return list(self.aliases.values())
+            if arg == "domain" and len(parts) > 3:
+                return [a for a in self.aliases.values() if a["domain"] == parts[3]]
+            return self.aliases.get(int(arg), {}) if arg.isdigit() else {}
+        return []
+
+    def _item_result(self, ok: bool, msg: str, item: Any) -> Dict[str, Any]:
+        if ok and self.error_rate and random.random() < self.error_rate:
+            ok, msg = False, "simulated_failure"
+        return {"type": "success" if ok else "danger", "msg": [msg, item]}
+
+    def _add_mailbox(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        email = f"{data.get('local_part')}@{data.get('domain')}"
+        if email in self.mailboxes:
+            return [self._item_result(False, "object_exists", email)]
+        result = self._item_result(True, "mailbox_added", email)
+        if result["type"] == "success":
+            self.seed_mailboxes([email], int(data.get("quota") or DEFAULT_QUOTA_MB))
+            self.mailboxes[email]["active"] = int(data.get("active", "1"))
+        return [result]
+
+    def _edit_mailbox(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        attr = data.get("attr", {})
+        results = []
+        for email in data.get("items", []):
+            mailbox = self.mailboxes.get(email)
+            result = self._item_result(mailbox is not None, "mailbox_modified" if mailbox else "access_denied", email)
+            if mailbox is not None and result["type"] == "success":
+                if "active" in attr:
+                    mailbox["active"] = int(attr["active"])
+                if "quota" in attr:
+                    mailbox["quota"] = int(attr["quota"]) * 1024 * 1024
+            results.append(result)
+        return results
+
+    def _delete_mailbox(self, data: List[str]) -> List[Dict[str, Any]]:
+        results = []
+        for email in data:
+            result = self._item_result(email in self.mailboxes, "mailbox_removed", email)
+            if result["type"] == "success":
+                self.mailboxes.pop(email, None)
+            results.append(result)
+        return results
+
+    def _add_alias(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        address = data.get("address", "")
+        result = self._item_result(True, "alias_added", address)
+        if result["type"] == "success":
+            alias_id = self._next_alias_id
+            self._next_alias_id += 1
+            self.aliases[alias_id] = {
+                "id": alias_id,
+                "address": address,
+                "goto": data.get("goto", ""),
+                "domain": address.split("@")[-1],
+                "active": int(data.get("active", 1)),
+            }
+        return [result]
+
+    def _edit_alias(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        results = []
+        for alias_id in data.get("items", []):
+            alias = self.aliases.get(int(alias_id))
+            result = self._item_result(alias is not None, "alias_modified", alias_id)
+            if alias is not None and result["type"] == "success":
+                alias.update(data.get("attr", {}))
+            results.append(result)
+        return results
+
+    def _delete_alias(self, data: List[str]) -> List[Dict[str, Any]]:
+        results = []
+        for alias_id in data:
+            result = self._item_result(int(alias_id) in self.aliases, "alias_removed", alias_id)
+            if result["type"] == "success":
+                self.aliases.pop(int(alias_id), None)
+            results.append(result)
+        return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--api-key", default="bench")
+    parser.add_argument("--mailboxes", type=int, default=0, help="Seed this many mailboxes")
+    parser.add_argument("--domain", default="load.afrimail.test", help="Matches bench_app.py seeding")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay, up to this many seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of write items rejected")
+    args = parser.parse_args()
+
+    server = FakeMailcowServer(
+        args.host, args.port, latency=args.latency, jitter=args.jitter,
+        failure_rate=args.failure_rate, error_rate=args.error_rate, api_key=args.api_key
+    )
+    server.seed_mailboxes([f"user{n}@{args.domain}" for n in range(1, args.mailboxes + 1)])
+    await server.start()
+    print(f"Fake Mailcow API at {server.api_url} with {len(server.mailboxes)} mailboxes (Ctrl+C to stop)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        print(", ".join(f"{endpoint}: {count}" for endpoint, count in server.calls.most_common()))
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Local stand-in SMTP server for exercising the email transport.
+
+Speaks just enough plaintext ESMTP for smtplib and aiosmtplib: EHLO/HELO,
+AUTH PLAIN/LOGIN (any credentials accepted), MAIL, RCPT, DATA, RSET, NOOP
+and QUIT. Delivered messages are counted (and optionally kept in memory),
+and --latency adds a delay before every reply to simulate network round
+trips.
+
+Usage:
+    python benchmarks/fake_smtp.py --port 2525 --latency 0.01
+
+or in-process:
+    server = FakeSMTPServer(latency=0.01)
+    await server.start()
+    ...
+    await server.stop()
+
+Use start_in_thread()/stop_thread() instead when the client under test
+blocks the calling event loop (e.g. plain smtplib).
+"""
+
+import argparse
+import asyncio
+import threading
+from typing import List, Optional, Tuple
+
+
+class FakeSMTPServer:
+    """Minimal asyncio SMTP sink."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, keep_messages: bool = False):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.keep_messages = keep_messages
+        self.connections = 0
+        self.messages_received = 0
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self):
+        """Run the server on its own event loop in a daemon thread."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="fake-smtp", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop_thread(self):
+        if self._thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    async def _reply(self, writer: asyncio.StreamWriter, line: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(line.encode() + b"\r\n")
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        sender, recipients = None, []
+        try:
+            await self._reply(writer, "220 fake-smtp ESMTP ready")
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode(errors="replace").rstrip("\r\n")
+                command = line[:4].upper()
+
+                if command == "EHLO":
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    writer.write(b"250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n250 SIZE 10485760\r\n")
+                    await writer.drain()
+                elif command == "HELO":
+                    await self._reply(writer, "250 fake-smtp")
+                elif command == "AUTH":
+                    parts = line.split()
+                    if len(parts) >= 2 and parts[1].upper() == "LOGIN":
+                        await self._reply(writer, "334 VXNlcm5hbWU6")
+                        await reader.readline()
+                        await self._reply(writer, "334 UGFzc3dvcmQ6")
+                        await reader.readline()
+                    elif len(parts) == 2:
+                        await self._reply(writer, "334 ")
+                        await reader.readline()
+                    await self._reply(writer, "235 2.7.0 Authentication successful")
+                elif command == "MAIL":
+                    sender, recipients = line.split(":", 1)[1].strip(), []
+                    await self._reply(writer, "250 2.1.0 OK")
+                elif command == "RCPT":
+                    recipients.append(line.split(":", 1)[1].strip())
+                    await self._reply(writer, "250 2.1.5 OK")
+                elif command == "DATA":
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    body = []
+                    while True:
+                        data_line = await reader.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        body.append(data_line)
+                    self.messages_received += 1
+                    if self.keep_messages:
+                        self.messages.append((sender, recipients, b"".join(body)))
+                    sender, recipients = None, []
+                    await self._reply(writer, "250 2.0.0 Queued")
+                elif command == "RSET":
+                    sender, recipients = None, []
+                    await self._reply(writer, "250 2.0.0 OK")
+                elif command == "NOOP":
+                    await self._reply(writer, "250 2.0.0 OK")
+                elif command == "QUIT":
+                    await self._reply(writer, "221 2.0.0 Bye")
+                    break
+                else:
+                    await self._reply(writer, "502 5.5.2 Command not recognized")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each reply")
+    args = parser.parse_args()
+
+    server = FakeSMTPServer(args.host, args.port, latency=args.latency)
+    await server.start()
+    print(f"Fake SMTP server listening on {server.host}:{server.port} (Ctrl+C to stop)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        print(f"{server.messages_received} messages over {server.connections} connections")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,32 @@
+"""
+Gunicorn settings shared by all workers.
+
+Prometheus metrics run in multiprocess mode: every worker writes its samples
+to PROMETHEUS_MULTIPROC_DIR and /metrics merges them. The directory is set
+here, in the master, so workers inherit it; it is emptied on start so
+samples from a previous run don't leak in, and a dead worker's gauge files
+are dropped when it exits.
+"""
+
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "afrimail-prometheus")
+)
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -5,6 +5,9 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Enable trigram matching (fuzzy user search)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- ============================================
 -- Core User Tables
 -- ============================================
@@ -30,6 +33,12 @@ CREATE TABLE IF NOT EXISTS users_extended (
 
 CREATE INDEX IF NOT EXISTS idx_users_extended_email ON users_extended(email);
 CREATE INDEX IF NOT EXISTS idx_users_extended_created_at ON users_extended(created_at);
+CREATE INDEX IF NOT EXISTS idx_users_extended_created_at_id ON users_extended(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_users_extended_last_login ON users_extended(last_login) WHERE last_login IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_users_extended_email_trgm ON users_extended USING GIN (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_extended_first_name_trgm ON users_extended USING GIN (first_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_extended_last_name_trgm ON users_extended USING GIN (last_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_extended_email_lower_c ON users_extended (lower(email) COLLATE "C");
 
 -- ============================================
 -- Admin Tables
@@ -78,6 +87,13 @@ CREATE TABLE IF NOT EXISTS mailbox_metadata (
 
 CREATE INDEX IF NOT EXISTS idx_mailbox_metadata_email ON mailbox_metadata(email);
 CREATE INDEX IF NOT EXISTS idx_mailbox_metadata_user_id ON mailbox_metadata(user_id);
+CREATE INDEX IF NOT EXISTS idx_mailbox_metadata_usage_bytes ON mailbox_metadata(usage_bytes DESC NULLS LAST);
+
+-- When each domain was last read from Mailcow (mailbox rows only change with their values)
+CREATE TABLE IF NOT EXISTS mailbox_sync_state (
+    domain TEXT PRIMARY KEY,
+    synced_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
 
 -- ============================================
 -- Audit & Activity Tables
@@ -97,18 +113,31 @@ CREATE TABLE IF NOT EXISTS audit_logs (
 CREATE INDEX IF NOT EXISTS idx_audit_logs_admin_email ON audit_logs(admin_email);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp ON audit_logs(timestamp);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_action_type ON audit_logs(action_type);
-
--- Login activity
+CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp_id ON audit_logs(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_details ON audit_logs USING GIN (details jsonb_path_ops);
+-- Full-text search; must match AUDIT_LOG_SEARCH_VECTOR in app/models/audit.py
+CREATE INDEX IF NOT EXISTS idx_audit_logs_search ON audit_logs USING GIN ((
+    to_tsvector('simple'::regconfig, coalesce(action_type, '') || ' ' || coalesce(target_user_email, ''))
+    || to_tsvector('simple'::regconfig, coalesce(details, '{}'::jsonb))
+));
+
+-- Login activity, partitioned by month on login_time. Monthly partitions
+-- (login_activity_pYYYYMM) are created ahead and dropped after the retention
+-- period by the app (app/services/partitions.py); rows outside them land in
+-- the default partition. Convert an existing table with scripts/run_migration.py.
 CREATE TABLE IF NOT EXISTS login_activity (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     user_email TEXT NOT NULL,
-    login_time TIMESTAMPTZ DEFAULT NOW(),
+    login_time TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     ip_address TEXT,
     user_agent TEXT,
     success BOOLEAN NOT NULL,
     failure_reason TEXT,
-    created_at TIMESTAMPTZ DEFAULT NOW()
-);
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (id, login_time)
+) PARTITION BY RANGE (login_time);
+
+CREATE TABLE IF NOT EXISTS login_activity_default PARTITION OF login_activity DEFAULT;
 
 CREATE INDEX IF NOT EXISTS idx_login_activity_user_email ON login_activity(user_email);
 CREATE INDEX IF NOT EXISTS idx_login_activity_login_time ON login_activity(login_time DESC);
@@ -140,6 +169,7 @@ CREATE TABLE IF NOT EXISTS support_tickets (
 CREATE INDEX IF NOT EXISTS idx_support_tickets_status ON support_tickets(status);
 CREATE INDEX IF NOT EXISTS idx_support_tickets_user_email ON support_tickets(user_email);
 CREATE INDEX IF NOT EXISTS idx_support_tickets_created_at ON support_tickets(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_support_tickets_pending_created_at ON support_tickets(created_at) WHERE status = 'pending';
 
 -- Announcements
 CREATE TABLE IF NOT EXISTS announcements (
@@ -269,11 +299,19 @@ CREATE TABLE IF NOT EXISTS scheduled_actions (
     action_data JSONB DEFAULT '{}',
     created_by UUID REFERENCES admin_users(id),
     executed_at TIMESTAMPTZ,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    results JSONB DEFAULT '{}',
+    attempts INTEGER DEFAULT 0,
+    locked_by TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    started_at TIMESTAMPTZ,
+    error TEXT
 );
 
 CREATE INDEX IF NOT EXISTS idx_scheduled_actions_status ON scheduled_actions(status);
 CREATE INDEX IF NOT EXISTS idx_scheduled_actions_scheduled_for ON scheduled_actions(scheduled_for);
+CREATE INDEX IF NOT EXISTS idx_scheduled_actions_due ON scheduled_actions(scheduled_for) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_scheduled_actions_lease ON scheduled_actions(lease_expires_at) WHERE status = 'running';
 
 -- Bulk import logs
 CREATE TABLE IF NOT EXISTS bulk_import_logs (
@@ -387,6 +425,17 @@ CREATE INDEX IF NOT EXISTS idx_signup_attempts_ip_address ON signup_attempts(ip_
 CREATE INDEX IF NOT EXISTS idx_signup_attempts_created_at ON signup_attempts(created_at);
 CREATE INDEX IF NOT EXISTS idx_signup_attempts_ip_created ON signup_attempts(ip_address, created_at);
 
+-- Shared rate limit counters (disposable, so unlogged)
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_counters (
+    key TEXT NOT NULL,
+    window_start BIGINT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    expires_at BIGINT NOT NULL,
+    PRIMARY KEY (key, window_start)
+);
+
+CREATE INDEX IF NOT EXISTS ix_rate_limit_counters_expires_at ON rate_limit_counters(expires_at);
+
 -- Password resets
 CREATE TABLE IF NOT EXISTS password_resets (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -401,6 +450,67 @@ CREATE TABLE IF NOT EXISTS password_resets (
 CREATE INDEX IF NOT EXISTS idx_password_resets_email ON password_resets(email);
 CREATE INDEX IF NOT EXISTS idx_password_resets_expires_at ON password_resets(expires_at);
 
+-- ============================================
+-- Outbound Mail Queue
+-- ============================================
+
+-- Durable outbound email queue (claimed with FOR UPDATE SKIP LOCKED)
+CREATE TABLE IF NOT EXISTS outbound_emails (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind TEXT NOT NULL DEFAULT 'generic',
+    to_email TEXT NOT NULL,
+    recipient_domain TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body_text TEXT NOT NULL,
+    body_html TEXT,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 6,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_error TEXT,
+    locked_by TEXT,
+    locked_at TIMESTAMPTZ,
+    sent_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbound_emails_status ON outbound_emails(status);
+CREATE INDEX IF NOT EXISTS idx_outbound_emails_recipient_domain ON outbound_emails(recipient_domain);
+CREATE INDEX IF NOT EXISTS idx_outbound_emails_due ON outbound_emails(next_attempt_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_outbound_emails_sending_locked_at ON outbound_emails(locked_at) WHERE status = 'sending';
+
+-- Background bulk jobs (claimed with FOR UPDATE SKIP LOCKED, progress checkpointed per chunk)
+CREATE TABLE IF NOT EXISTS bulk_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_type TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'completed', 'partial', 'failed', 'cancelled')),
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    params JSONB DEFAULT '{}',
+    total INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    next_index INTEGER NOT NULL DEFAULT 0,
+    errors JSONB DEFAULT '[]',
+    summary JSONB DEFAULT '{}',
+    admin_email TEXT,
+    created_by UUID REFERENCES admin_users(id) ON DELETE SET NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    locked_by TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_bulk_jobs_job_type ON bulk_jobs(job_type);
+CREATE INDEX IF NOT EXISTS idx_bulk_jobs_status ON bulk_jobs(status);
+CREATE INDEX IF NOT EXISTS idx_bulk_jobs_created_at ON bulk_jobs(created_at);
+CREATE INDEX IF NOT EXISTS idx_bulk_jobs_due ON bulk_jobs(created_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_bulk_jobs_lease ON bulk_jobs(lease_expires_at) WHERE status = 'running';
+
 -- ============================================
 -- System Settings Table
 -- ============================================
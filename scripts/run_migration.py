@@ -17,6 +17,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import text
 from app.db.session import engine
+from app.services.partitions import ensure_partitions, maintain_partitions
 
 
 async def run_migrations():
@@ -25,7 +26,7 @@ async def run_migrations():
 
     async with engine.begin() as conn:
         # Migration 1: Add mailcow_id to email_aliases
-        print("\n[1/1] Checking email_aliases.mailcow_id column...")
+        print("\n[1/10] Checking email_aliases.mailcow_id column...")
         result = await conn.execute(text("""
             SELECT column_name FROM information_schema.columns
             WHERE table_name = 'email_aliases' AND column_name = 'mailcow_id'
@@ -42,6 +43,170 @@ async def run_migrations():
         else:
             print("  -> Column already exists, skipping.")
 
+        # Migration 2: Keyset pagination index for the admin user list
+        print("\n[2/10] Ensuring users_extended (created_at, id) index...")
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_users_extended_created_at_id
+            ON users_extended(created_at, id)
+        """))
+        print("  -> Done!")
+
+        # Migration 3: Trigram indexes for fuzzy user search
+        print("\n[3/10] Ensuring search indexes on users_extended...")
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for column in ("email", "first_name", "last_name"):
+            await conn.execute(text(f"""
+                CREATE INDEX IF NOT EXISTS idx_users_extended_{column}_trgm
+                ON users_extended USING GIN ({column} gin_trgm_ops)
+            """))
+        # 1-2 character terms are prefix-only; trigram indexes can't serve them
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_users_extended_email_lower_c
+            ON users_extended (lower(email) COLLATE "C")
+        """))
+        print("  -> Done!")
+
+        # Migration 4: Top-N by usage for storage stats
+        print("\n[4/10] Ensuring mailbox_metadata usage_bytes index...")
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_mailbox_metadata_usage_bytes
+            ON mailbox_metadata(usage_bytes DESC NULLS LAST)
+        """))
+        print("  -> Done!")
+
+        # Migration 5: Partial indexes for dashboard stats
+        print("\n[5/10] Ensuring partial indexes for dashboard stats...")
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_users_extended_last_login
+            ON users_extended(last_login) WHERE last_login IS NOT NULL
+        """))
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_support_tickets_pending_created_at
+            ON support_tickets(created_at) WHERE status = 'pending'
+        """))
+        print("  -> Done!")
+
+        # Migration 6: Execution state for the scheduled action runner
+        print("\n[6/10] Checking scheduled_actions execution columns...")
+        await conn.execute(text("""
+            ALTER TABLE scheduled_actions
+                ADD COLUMN IF NOT EXISTS results JSONB DEFAULT '{}',
+                ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0,
+                ADD COLUMN IF NOT EXISTS locked_by TEXT,
+                ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ,
+                ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ,
+                ADD COLUMN IF NOT EXISTS error TEXT
+        """))
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_scheduled_actions_due
+            ON scheduled_actions(scheduled_for) WHERE status = 'pending'
+        """))
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_scheduled_actions_lease
+            ON scheduled_actions(lease_expires_at) WHERE status = 'running'
+        """))
+        print("  -> Done!")
+
+        # Migration 7: Monthly partitions for login_activity
+        print("\n[7/10] Checking login_activity partitioning...")
+        result = await conn.execute(text("""
+            SELECT relkind::text FROM pg_class WHERE oid = to_regclass('login_activity')
+        """))
+        if result.scalar() == "r":
+            print("  -> Converting login_activity to a partitioned table...")
+            await conn.execute(text("ALTER TABLE login_activity RENAME TO login_activity_legacy"))
+            await conn.execute(text("""
+                ALTER TABLE login_activity_legacy
+                RENAME CONSTRAINT login_activity_pkey TO login_activity_legacy_pkey
+            """))
+            await conn.execute(text("""
+                CREATE TABLE login_activity (
+                    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+                    user_email TEXT NOT NULL,
+                    login_time TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    ip_address TEXT,
+                    user_agent TEXT,
+                    success BOOLEAN NOT NULL,
+                    failure_reason TEXT,
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (id, login_time)
+                ) PARTITION BY RANGE (login_time)
+            """))
+
+            # Copy every row; retention only drops partitions once an
+            # operator sets LOGIN_ACTIVITY_RETENTION_MONTHS
+            result = await conn.execute(text("""
+                SELECT MIN(COALESCE(login_time, created_at)) FROM login_activity_legacy
+            """))
+            created = await ensure_partitions(conn, since=result.scalar())
+            print(f"  -> Created {len(created)} monthly partitions")
+
+            result = await conn.execute(text("""
+                INSERT INTO login_activity (
+                    id, user_email, login_time, ip_address, user_agent,
+                    success, failure_reason, created_at
+                )
+                SELECT id, user_email, COALESCE(login_time, created_at, NOW()), ip_address,
+                       user_agent, success, failure_reason, created_at
+                FROM login_activity_legacy
+            """))
+            print(f"  -> Copied {result.rowcount} rows")
+            await conn.execute(text("DROP TABLE login_activity_legacy"))
+
+            # Indexes on the parent cascade to every partition, present and future
+            await conn.execute(text("""
+                CREATE INDEX idx_login_activity_user_email ON login_activity(user_email)
+            """))
+            await conn.execute(text("""
+                CREATE INDEX idx_login_activity_login_time ON login_activity(login_time DESC)
+            """))
+            await conn.execute(text("""
+                CREATE INDEX idx_login_activity_success ON login_activity(success)
+            """))
+
+        if await maintain_partitions(conn) is None:
+            print("  -> login_activity does not exist yet, skipping.")
+        else:
+            print("  -> Done!")
+
+        # Migration 8: Audit log paging, JSONB containment and full-text search
+        print("\n[8/10] Ensuring audit_logs search indexes...")
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp_id
+            ON audit_logs(timestamp, id)
+        """))
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_audit_logs_details
+            ON audit_logs USING GIN (details jsonb_path_ops)
+        """))
+        # Must match AUDIT_LOG_SEARCH_VECTOR in app/models/audit.py
+        await conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_audit_logs_search
+            ON audit_logs USING GIN ((
+                to_tsvector('simple'::regconfig, coalesce(action_type, '') || ' ' || coalesce(target_user_email, ''))
+                || to_tsvector('simple'::regconfig, coalesce(details, '{}'::jsonb))
+            ))
+        """))
+        print("  -> Done!")
+
+        # Migration 9: Cooperative cancellation of running bulk jobs
+        print("\n[9/10] Checking bulk_jobs.cancel_requested column...")
+        await conn.execute(text("""
+            ALTER TABLE bulk_jobs
+                ADD COLUMN IF NOT EXISTS cancel_requested BOOLEAN NOT NULL DEFAULT FALSE
+        """))
+        print("  -> Done!")
+
+        # Migration 10: Per-domain mailbox sync freshness
+        print("\n[10/10] Ensuring mailbox_sync_state table...")
+        await conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS mailbox_sync_state (
+                domain TEXT PRIMARY KEY,
+                synced_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """))
+        print("  -> Done!")
+
     print("\nAll migrations completed successfully!")
 
 
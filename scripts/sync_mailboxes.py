@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Sync mailbox quota/usage from Mailcow into mailbox_metadata.
+Run with: python scripts/sync_mailboxes.py [--domain example.com] [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import AsyncSessionLocal, engine
+from app.services.mailcow import mailcow_service, MailcowError
+from app.services.mailbox_sync import sync_mailboxes_from_mailcow
+
+
+async def run_sync(batch_size: int = None, domain: str = None) -> int:
+    if not mailcow_service.is_configured:
+        print("Mailcow API is not configured (MAILCOW_API_URL / MAILCOW_API_KEY)")
+        return 1
+
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await sync_mailboxes_from_mailcow(session, batch_size=batch_size, domain=domain)
+    except MailcowError as e:
+        print(f"Sync failed: {e.message}")
+        return 1
+    finally:
+        await mailcow_service.close()
+        await engine.dispose()
+
+    print(f"Mailboxes:  {result.total}")
+    print(f"Inserted:   {result.inserted}")
+    print(f"Updated:    {result.updated}")
+    print(f"Unchanged:  {result.unchanged}")
+    print(f"Orphaned:   {result.orphaned}")
+    print(f"Batches:    {result.batches}")
+    print(f"Duration:   {result.duration_seconds:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync Mailcow mailboxes into mailbox_metadata")
+    parser.add_argument("--domain", help="Only sync mailboxes in this domain")
+    parser.add_argument("--batch-size", type=int, help="Rows per upsert statement")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run_sync(batch_size=args.batch_size, domain=args.domain)))